@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the ChimeraX MCP server.
+
+Runs the MCP tools against fake_chimerax_server.py, with a configurable
+per-request latency and query response size, so the numbers measure the
+server itself rather than a ChimeraX installation. Tools are called both
+directly (in process) and over stdio the way Claude Desktop calls them.
+
+Each scenario reports throughput, p50/p99 latency and peak memory. Results
+are written as JSON; pass an earlier results file with --compare to flag
+regressions (exit status 1 if any).
+
+Usage:
+    python benchmark.py [--latency 0.002] [--response-bytes 20000]
+                        [--iterations 200] [--clients 8] [--no-stdio]
+                        [--output benchmark_results.json] [--compare FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, InstancePool, ResultCache
+from fake_chimerax_server import FakeChimeraXServer
+
+try:
+    import resource
+except ImportError:
+    # Windows: no peak RSS for the stdio server process
+    resource = None
+
+# Commands sent per run_commands call in the batch scenario
+BATCH_SIZE = 10
+
+# Relative change in a latency percentile or throughput counted as a regression
+DEFAULT_TOLERANCE = 0.2
+
+# Settings used while the benchmarks run, keeping the in-process server off
+# the network and free of background work
+BENCHMARK_SETTINGS = {"structure_cache_mb": 0, "scene_sync_interval": 0}
+
+
+def summarize(name: str, latencies: List[float], elapsed: float, ops: int,
+              peak_kb: Optional[float] = None) -> Dict[str, Any]:
+    """Turn per-call latencies (seconds) into a scenario result."""
+    ordered = sorted(latencies)
+
+    def percentile(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+    return {
+        "scenario": name,
+        "calls": len(latencies),
+        "ops": ops,
+        "seconds": round(elapsed, 4),
+        "ops_per_sec": round(ops / elapsed, 1) if elapsed else None,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": percentile(0.5),
+        "p99_ms": percentile(0.99),
+        "peak_kb": peak_kb,
+    }
+
+
+async def timed_calls(call: Callable[[], Awaitable[Any]], count: int,
+                      clients: int = 1) -> tuple:
+    """Make count calls spread over concurrent clients; return (latencies, elapsed)."""
+    latencies: List[float] = []
+
+    async def client(calls: int):
+        for _ in range(calls):
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    share, extra = divmod(count, clients)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(share + (i < extra)) for i in range(clients)))
+    return latencies, time.perf_counter() - start
+
+
+async def peak_memory_kb(call: Callable[[], Awaitable[Any]], count: int) -> float:
+    """Peak Python memory allocated while making count calls."""
+    tracemalloc.start()
+    try:
+        for _ in range(count):
+            await call()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def use_fake_server(url: str, cache_size: int) -> None:
+    """Point the MCP tools at the fake server with a fresh client."""
+    if chimerax_mcp_server._executor is not None:
+        chimerax_mcp_server._executor.shutdown()
+    chimerax_mcp_server._pool = InstancePool([
+        ChimeraXClient(url, cache=ResultCache(cache_size))
+    ])
+    chimerax_mcp_server._coalescer = None
+    chimerax_mcp_server._executor = None
+
+
+async def run_direct(server: FakeChimeraXServer, iterations: int,
+                     clients: int) -> List[Dict[str, Any]]:
+    """Scenarios calling the tool functions in process."""
+    m = chimerax_mcp_server
+    batch = [f"color #1 red target {t}" for t in ("a", "c", "s", "r", "p")] * (BATCH_SIZE // 5)
+    scenarios = [
+        # name, call, calls, ops per call, concurrent clients, cache size
+        ("single_call", lambda: m.run_command("echo ping"), iterations, 1, 1, 0),
+        ("cached_query", lambda: m.get_model_info("#1"), iterations, 1, 1, 128),
+        ("large_response", lambda: m.run_command("info"), iterations, 1, 1, 0),
+        ("batch", lambda: m.run_commands(batch), max(iterations // BATCH_SIZE, 1),
+         BATCH_SIZE, 1, 0),
+        ("concurrent", lambda: m.run_command("echo ping"), iterations, 1, clients, 0),
+    ]
+
+    results = []
+    for name, call, calls, ops, concurrency, cache_size in scenarios:
+        use_fake_server(server.url, cache_size)
+        await call()  # warm up the connection and executor
+        latencies, elapsed = await timed_calls(call, calls, concurrency)
+        peak = await peak_memory_kb(call, min(calls, 50))
+        results.append(summarize(name, latencies, elapsed, calls * ops, peak))
+    return results
+
+
+async def run_stdio(server: FakeChimeraXServer, iterations: int,
+                    clients: int) -> List[Dict[str, Any]]:
+    """Scenarios starting a server subprocess and calling its tools over stdio."""
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    # A throwaway home keeps the server's journal, checkpoints and structure
+    # cache out of the user's ~/.chimerax_mcp
+    home = tempfile.TemporaryDirectory()
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[str(Path(__file__).parent / "chimerax_mcp_server.py")],
+        env=dict(os.environ, CHIMERAX_URL=server.url, HOME=home.name, USERPROFILE=home.name),
+    )
+    results = []
+    with home, open(os.devnull, "w") as errlog:
+        start = time.perf_counter()
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                await session.list_tools()
+                # Launch to list_tools reply, which MCP clients wait for
+                startup = time.perf_counter() - start
+                results.append(summarize("stdio_startup", [startup], startup, 1))
+
+                async def call():
+                    await session.call_tool("run_command", {"command": "echo ping"})
+
+                await call()
+                for name, concurrency in (("stdio_single_call", 1),
+                                          ("stdio_concurrent", clients)):
+                    latencies, elapsed = await timed_calls(call, iterations, concurrency)
+                    results.append(summarize(name, latencies, elapsed, iterations))
+
+    # The subprocess has exited, so its peak RSS is in the children's usage
+    peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        if sys.platform == "darwin":
+            peak //= 1024
+    for result in results:
+        result["peak_kb"] = peak
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compare results with a baseline run.
+
+    Returns:
+        One message per scenario whose p50/p99 latency grew, or whose
+        throughput fell, by more than tolerance
+    """
+    previous = {r["scenario"]: r for r in baseline.get("scenarios", [])}
+    regressions = []
+    for result in results["scenarios"]:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            if before[key] and result[key] > before[key] * (1 + tolerance):
+                regressions.append(
+                    f"{result['scenario']}: {key} {before[key]} -> {result[key]}"
+                )
+        rate, previous_rate = result["ops_per_sec"], before["ops_per_sec"]
+        if previous_rate and rate < previous_rate * (1 - tolerance):
+            regressions.append(f"{result['scenario']}: ops_per_sec {previous_rate} -> {rate}")
+    return regressions
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).parent, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(latency: float = 0.002, response_bytes: int = 20000,
+                   iterations: int = 200, clients: int = 8,
+                   stdio: bool = True) -> Dict[str, Any]:
+    """
+    Run all scenarios against a fresh fake ChimeraX server.
+
+    Returns:
+        Dictionary with the run settings and one result per scenario
+    """
+    m = chimerax_mcp_server
+    saved_config = {key: m.DEFAULT_CONFIG[key] for key in BENCHMARK_SETTINGS}
+    saved_state = (m._pool, m._coalescer, m._executor)
+    m.DEFAULT_CONFIG.update(BENCHMARK_SETTINGS)
+    m._executor = None
+
+    server = FakeChimeraXServer(latency=latency).start()
+    line = "#1/A:1 ALA CA 1.000 2.000 3.000\n"
+    server.responses["info"] = (line * (response_bytes // len(line) + 1))[:response_bytes]
+    try:
+        scenarios = asyncio.run(run_direct(server, iterations, clients))
+        if stdio:
+            scenarios += asyncio.run(run_stdio(server, iterations, clients))
+    finally:
+        server.stop()
+        if m._executor is not None:
+            m._executor.shutdown()
+        m._pool, m._coalescer, m._executor = saved_state
+        m.DEFAULT_CONFIG.update(saved_config)
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "latency": latency, "response_bytes": response_bytes,
+            "iterations": iterations, "clients": clients,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def print_table(results: Dict[str, Any]) -> None:
+    print(f"{'scenario':<20} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak KB':>10}")
+    for r in results["scenarios"]:
+        print(f"{r['scenario']:<20} {r['ops_per_sec']:>10} {r['p50_ms']:>9} "
+              f"{r['p99_ms']:>9} {r['peak_kb'] if r['peak_kb'] is not None else '-':>10}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ChimeraX MCP server")
+    parser.add_argument("--latency", type=float, default=0.002,
+                        help="seconds the fake server waits per request")
+    parser.add_argument("--response-bytes", type=int, default=20000,
+                        help="size of the large_response query output")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per scenario")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--no-stdio", action="store_true", help="skip the stdio scenarios")
+    parser.add_argument("--output", default="benchmark_results.json", help="results file")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative slowdown counted as a regression")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.latency, args.response_bytes, args.iterations,
+                             args.clients, not args.no_stdio)
+    print_table(results)
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"[REGRESSION] {message}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
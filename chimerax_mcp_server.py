@@ -16,52 +16,225 @@ Prerequisites:
 - Start ChimeraX REST server: `remotecontrol rest start`
 """
 
-import requests
 import os
 import json
-from typing import Optional, Dict, Any
-from urllib.parse import quote
-from mcp.server.fastmcp import FastMCP
+import re
+import asyncio
+import atexit
+import bisect
+import functools
+import gzip
+import hashlib
+import math
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+import uuid
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
+from urllib.parse import quote, urlparse
+from mcp.server.fastmcp import FastMCP, Context, Image
 from pathlib import Path
 
+if TYPE_CHECKING:
+    # Only for annotations; requests itself is loaded on first use by _requests()
+    import requests
+
 # Initialize MCP server
 mcp = FastMCP("ChimeraX")
 
 # ChimeraX REST API configuration
-CHIMERAX_URL = None  # Will be loaded from config
+CHIMERAX_URL = None  # Resolved from the environment or config on first use
 
+# Default configuration values (overridable in chimerax_mcp_config.json)
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "port": 5900,
+    "pool_size": 4,          # Max keep-alive connections to the REST server
+    "connect_timeout": 5.0,  # Seconds to establish a TCP connection
+    "read_timeout": 30.0,    # Seconds to wait for a command to finish
+    "cache_size": 128,       # Max cached read-only query results (0 disables)
+    "cache_ttl": 60.0,       # Seconds a cached query result stays valid
+    "coalesce_window": 0.0,  # Seconds to buffer visual commands (0 disables)
+    "endpoints": [],         # Extra ChimeraX instances (ports or URLs) for jobs
+    "job_timeout": 600.0,    # Seconds a background job's command may take
+    "progress_interval": 2.0,  # Seconds between progress notifications
+    "max_output_chars": 8000,  # Longer tool output is stored and paged
+    "output_store_chars": 10000000,  # Total size of stored outputs (LRU)
+    "structure_cache_dir": "",  # Local structure file cache ("" = ~/.chimerax_mcp)
+    "structure_cache_mb": 1024,  # Size cap of the structure cache (0 disables)
+    "archive_urls": {},      # Per-source download URL overrides, see ARCHIVE_SOURCES
+    "prefetch_concurrency": 2,  # Background structure downloads running at once
+    "preview_max_dimension": 1024,  # Longest side of preview_image images
+    "preview_format": "png",  # preview_image format: png or jpg
+    "preview_quality": 85,   # JPEG quality of preview images
+    "preview_cache_size": 8,  # Previews of unchanged scenes kept in memory
+    "scene_sync_interval": 30.0,  # Seconds between scene model syncs (0 disables)
+    "trace_file": "",        # Append every command and tool call here as JSON lines
+    "verb_timeouts": {       # Read timeouts for particular verbs (others: read_timeout)
+        "version": 5.0, "echo": 5.0, "usage": 5.0, "info": 15.0, "sequence": 15.0,
+        "open": 300.0, "save": 300.0, "clashes": 120.0, "hbonds": 120.0,
+        "matchmaker": 120.0, "surface": 120.0, "molmap": 120.0,
+    },
+    "adaptive_timeouts": False,  # Derive verb timeouts from recent durations
+    "adaptive_timeout_factor": 4.0,  # Adaptive timeout = factor x recent p99
+    "adaptive_min_timeout": 2.0,  # Lower bound of adaptive timeouts
+    "adaptive_max_timeout": 600.0,  # Upper bound of adaptive timeouts
+    "retry_attempts": 2,     # Retries of read-only commands after connection errors
+    "retry_backoff": 0.2,    # Base seconds of the jittered exponential retry backoff
+    "breaker_threshold": 3,  # Connection errors in a row before failing fast
+    "breaker_probe_interval": 1.0,  # First seconds between health probes while down
+    "auto_start_chimerax": False,  # Launch ChimeraX and restart it when it fails
+    "chimerax_path": "",     # ChimeraX executable ("" = look in the usual places)
+    "chimerax_args": [],     # Extra ChimeraX command-line arguments, e.g. ["--nogui"]
+    "health_check_interval": 10.0,  # Seconds between supervisor health checks
+    "health_check_failures": 2,  # Failed health checks in a row before a restart
+    "standby_port": 0,       # Port of a pre-started standby ChimeraX (0 disables)
+    "startup_timeout": 60.0,  # Seconds ChimeraX may take to start answering
+    "checkpoint_interval": 300.0,  # Seconds between session checkpoints (0 disables)
+    "checkpoint_max_commands": 200,  # Logged changes that trigger an early checkpoint
+    "checkpoint_dir": "",    # Where checkpoints are saved ("" = ~/.chimerax_mcp)
+    "restore_after_restart": True,  # Restore the session after a supervisor restart
+    "journal": True,         # Journal every command sent, for compile_journal
+    "journal_file": "",      # Command journal ("" = ~/.chimerax_mcp/journal.jsonl)
+    "journal_max_mb": 64,    # Size at which the journal is rotated to <file>.1
+    "config_watch_interval": 2.0,  # Seconds between checks for config changes (0 disables)
+}
 
-def load_config() -> Dict[str, Any]:
-    """
-    Load configuration from config file.
-    Looks for config file in same directory as executable.
+# Remote archives the structure cache can download from. URLs take the
+# normalized identifier as {id}; .gz downloads are decompressed when stored.
+ARCHIVE_SOURCES: Dict[str, Dict[str, str]] = {
+    "pdb": {
+        "url": "https://files.rcsb.org/download/{id}.cif",
+        "format": "mmcif",
+        "suffix": ".cif",
+    },
+    "alphafold": {
+        "url": "https://alphafold.ebi.ac.uk/files/AF-{id}-F1-model_v4.cif",
+        "format": "mmcif",
+        "suffix": ".cif",
+    },
+    "emdb": {
+        "url": "https://files.wwpdb.org/pub/emdb/structures/EMD-{id}/map/emd_{id}.map.gz",
+        "format": "ccp4",
+        "suffix": ".map",
+    },
+}
 
-    Returns:
-        Configuration dictionary with port number
-    """
-    # Find config file - look in same directory as this script/executable
+# Commands whose output only depends on the scene, so results can be cached
+READ_ONLY_VERBS = {"info", "sequence", "version", "usage"}
+
+# Commands that neither change the scene nor produce query output; these
+# are the only other commands that do not invalidate cached query results.
+# Camera verbs count only while they move the camera (see is_camera_command)
+CACHE_NEUTRAL_VERBS = {
+    "view", "turn", "move", "zoom", "roll", "camera", "lighting", "graphics",
+    "windowsize", "echo", "log", "wait", "save",
+}
+
+# Commands that cannot change what a rendered image looks like
+SCENE_NEUTRAL_VERBS = READ_ONLY_VERBS | {"echo", "log", "save", "wait"}
+
+# Commands that are safe to send again after a connection error
+RETRYABLE_VERBS = READ_ONLY_VERBS | {"echo"}
+
+# Visual commands whose effect is fully replaced by a later command of the
+# same kind on the same spec, so they can be buffered and coalesced
+COALESCE_VERBS = {"color", "show", "hide", "style"}
+
+# Color schemes that only recolor some of the atoms (e.g. byhetero leaves
+# carbons alone), so they do not supersede an earlier color
+PARTIAL_COLOR_SCHEMES = {
+    "byhetero", "byelement", "bypolarity", "byattribute", "bynucleotide",
+    "fromatoms", "fromcartoons", "fromribbons", "frommodels",
+}
+
+# Commands that only move the camera, unless told to move models instead
+CAMERA_VERBS = {"view", "turn", "move", "zoom"}
+
+# Commands that never add, remove or rename models; any other command marks
+# the scene model stale so it is synced again before it is next read
+SCENE_MODEL_NEUTRAL_VERBS = READ_ONLY_VERBS | CACHE_NEUTRAL_VERBS | COALESCE_VERBS | {
+    "select", "cartoon", "transparency", "set", "size", "matchmaker", "align",
+}
+
+
+def config_path() -> Path:
+    """Path of chimerax_mcp_config.json, next to the executable or script."""
     if getattr(sys, 'frozen', False):
         # Running as compiled executable
         app_dir = Path(sys.executable).parent
     else:
         # Running as script
         app_dir = Path(__file__).parent
+    return app_dir / "chimerax_mcp_config.json"
 
-    config_file = app_dir / "chimerax_mcp_config.json"
+
+def check_config_file() -> None:
+    """
+    Check that the config file, if there is one, can be loaded.
+
+    load_config() falls back to the defaults for a broken file; use this
+    before applying a changed file so a half-saved edit is not applied.
+
+    Raises:
+        ValueError: If the file is not a JSON object or a known setting has
+            the wrong type
+    """
+    config_file = config_path()
+    if not config_file.exists():
+        return
+    try:
+        with open(config_file, 'r') as f:
+            file_config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Cannot read {config_file.name}: {e}")
+    if not isinstance(file_config, dict):
+        raise ValueError(f"{config_file.name} must hold a JSON object")
+    for key, value in file_config.items():
+        if key not in DEFAULT_CONFIG:
+            continue
+        expected = type(DEFAULT_CONFIG[key])
+        # Whole numbers are fine for float settings, but true/false is not a number
+        allowed = (int, float) if expected is float else (expected,)
+        if not isinstance(value, allowed) or (isinstance(value, bool) and expected is not bool):
+            raise ValueError(
+                f"{config_file.name}: {key} must be {expected.__name__}, "
+                f"not {type(value).__name__}"
+            )
+
+
+def load_config() -> Dict[str, Any]:
+    """
+    Load configuration from config file.
+    Looks for config file in same directory as executable.
+
+    Returns:
+        Configuration dictionary (see DEFAULT_CONFIG for the known keys)
+    """
+    config_file = config_path()
 
     # Default configuration
-    default_port = 5900
+    config = dict(DEFAULT_CONFIG)
 
     # Try to load from file
     if config_file.exists():
         try:
             with open(config_file, 'r') as f:
-                config = json.load(f)
-                return {"port": config.get("port", default_port)}
+                file_config = json.load(f)
+                config.update({
+                    key: value for key, value in file_config.items()
+                    if key in DEFAULT_CONFIG
+                })
         except Exception:
             pass
 
-    return {"port": default_port}
+    return config
 
 
 def get_chimerax_url() -> str:
@@ -78,537 +251,5138 @@ def get_chimerax_url() -> str:
 
     # 2. Configuration file
     config = load_config()
-    port = config.get("port", 5900)
+    port = config.get("port", DEFAULT_CONFIG["port"])
     return f"http://127.0.0.1:{port}"
 
 
 # Import sys for executable path detection
 import sys
 
-# Load ChimeraX URL from config
-CHIMERAX_URL = get_chimerax_url()
-
 
 class ChimeraXError(Exception):
     """Custom exception for ChimeraX communication errors"""
     pass
 
 
-def execute_chimerax_command(command: str) -> str:
+class ChimeraXCommandError(ChimeraXError):
+    """ChimeraX answered but reported an error for the command"""
+
+    def __init__(self, message: str, output: str = ""):
+        super().__init__(message)
+        self.output = output
+
+
+class ChimeraXConnectionError(ChimeraXError):
+    """The ChimeraX REST server could not be reached"""
+    pass
+
+
+class ChimeraXUnavailableError(ChimeraXError):
+    """ChimeraX is known to be down; raised without contacting it"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SpecError(ChimeraXError):
+    """An atom specifier failed local validation and was not sent"""
+    pass
+
+
+def command_verb(command: str) -> str:
+    """Get the lowercased first word of a ChimeraX command."""
+    return command.strip().split(" ", 1)[0].lower()
+
+
+def split_command_line(command: str) -> List[str]:
+    """Split a `;`-separated ChimeraX command line into single commands."""
+    return [part.strip() for part in command.split(";") if part.strip()]
+
+
+class ResultCache:
     """
-    Execute a command in ChimeraX via REST API.
+    LRU cache of read-only ChimeraX query results.
 
-    Args:
-        command: ChimeraX command to execute
+    Results of commands in READ_ONLY_VERBS are kept, keyed by the command
+    text with whitespace normalized. Any command outside READ_ONLY_VERBS and
+    CACHE_NEUTRAL_VERBS, or a camera verb that moves models, may change what
+    a query returns, so it clears the cache. A generation counter stops
+    queries that were in flight during such a command from storing stale
+    results.
+    """
 
-    Returns:
-        Response text from ChimeraX
+    def __init__(self, max_size: int = DEFAULT_CONFIG["cache_size"],
+                 ttl: float = DEFAULT_CONFIG["cache_ttl"]):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
 
-    Raises:
-        ChimeraXError: If command execution fails
+    @staticmethod
+    def normalize(command: str) -> str:
+        return " ".join(command.split())
+
+    @staticmethod
+    def is_cacheable(command: str) -> bool:
+        parts = split_command_line(command)
+        return len(parts) == 1 and command_verb(parts[0]) in READ_ONLY_VERBS
+
+    @staticmethod
+    def invalidates(command: str) -> bool:
+        for part in split_command_line(command):
+            verb = command_verb(part)
+            if verb in CAMERA_VERBS:
+                # `move x 10 models #1` or `view <saved name>` move atoms
+                if not is_camera_command(part):
+                    return True
+            elif verb not in READ_ONLY_VERBS | CACHE_NEUTRAL_VERBS:
+                return True
+        return False
+
+    def lookup(self, command: str) -> tuple:
+        """
+        Look up a cached result.
+
+        Returns:
+            (result or None, generation) - pass the generation to store()
+        """
+        with self._lock:
+            generation = self._generation
+            if self.max_size <= 0 or not self.is_cacheable(command):
+                return None, generation
+
+            key = self.normalize(command)
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], generation
+
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None, generation
+
+    def store(self, command: str, result: str, generation: int) -> None:
+        """Cache a query result unless the scene changed since lookup()."""
+        with self._lock:
+            if (self.max_size <= 0 or generation != self._generation
+                    or not self.is_cacheable(command)):
+                return
+            self._entries[self.normalize(command)] = (result, time.monotonic())
+            self._entries.move_to_end(self.normalize(command))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._generation += 1
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class LatencyHistogram:
     """
-    try:
-        # URL encode the command
-        encoded_command = quote(command)
-        url = f"{CHIMERAX_URL}/run?command={encoded_command}"
+    Latency histogram over LATENCY_BUCKETS.
 
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+    Also keeps a window of recent samples, which percentiles are taken
+    from so they follow current behavior rather than the whole uptime.
+    """
 
-        return response.text.strip()
-    except requests.exceptions.ConnectionError:
-        raise ChimeraXError(
-            "Cannot connect to ChimeraX. Please ensure ChimeraX is running "
-            "and the REST server is enabled with 'remotecontrol rest start'"
-        )
-    except requests.exceptions.Timeout:
-        raise ChimeraXError("ChimeraX command timed out after 30 seconds")
-    except requests.exceptions.RequestException as e:
-        raise ChimeraXError(f"Error communicating with ChimeraX: {str(e)}")
+    def __init__(self, window: int = 512):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: deque = deque(maxlen=window)
 
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
 
-@mcp.tool()
-def run_command(command: str) -> str:
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 2) if seconds is not None else None
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total / self.count) if self.count else None,
+            "p50_ms": ms(self.percentile(0.5)),
+            "p90_ms": ms(self.percentile(0.9)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "max_ms": ms(self.max),
+        }
+
+
+class ServerMetrics:
     """
-    Execute any ChimeraX command directly.
+    Timing and size metrics for ChimeraX commands and MCP tool calls.
 
-    This is the most flexible tool - it allows execution of any valid ChimeraX
-    command. Use this for advanced operations or commands not covered by other tools.
+    Commands are grouped by verb (command lines holding several commands
+    under "batch"). Each group has histograms of total time, connection
+    setup and server time (until the response headers arrived), plus byte,
+    error, timeout and new-connection counts. Tool calls are timed end to
+    end. If trace_file is set, every command and tool call is also
+    appended to it as one JSON line.
+    """
 
-    Args:
-        command: Any valid ChimeraX command (e.g., "open 1ubq", "color red", "save image.png")
+    def __init__(self, trace_file: str = ""):
+        self.trace_file = trace_file
+        self._lock = threading.Lock()
+        self._trace = None
+        self._trace_path = None
+        self.reset()
 
-    Returns:
-        Output from ChimeraX command execution
+    def reset(self) -> None:
+        """Forget all recorded metrics."""
+        with self._lock:
+            self.started = time.time()
+            self.commands: Dict[str, Dict[str, Any]] = {}
+            self.tools: Dict[str, Dict[str, Any]] = {}
 
-    Examples:
-        - run_command("version")
-        - run_command("open 1ubq from pdb")
-        - run_command("color #1 bychain")
+    def record_command(self, command: str, url: str, status: str, total: float,
+                       connect: float, server: float, sent: int, received: int) -> None:
+        """
+        Record one REST request.
+
+        Args:
+            status: 'ok', 'error' or 'timeout'
+            total, connect, server: Seconds spent overall, connecting and
+                                    waiting for the response headers
+            sent, received: Request and response body bytes
+        """
+        parts = split_command_line(command)
+        verb = command_verb(parts[0]) if len(parts) == 1 else "batch"
+        with self._lock:
+            entry = self.commands.get(verb)
+            if entry is None:
+                entry = self.commands[verb] = {
+                    "total": LatencyHistogram(), "connect": LatencyHistogram(),
+                    "server": LatencyHistogram(), "bytes_sent": 0, "bytes_received": 0,
+                    "errors": 0, "timeouts": 0, "connections_opened": 0,
+                }
+            entry["total"].observe(total)
+            entry["server"].observe(server)
+            if connect > 0:
+                entry["connect"].observe(connect)
+                entry["connections_opened"] += 1
+            entry["bytes_sent"] += sent
+            entry["bytes_received"] += received
+            if status == "error":
+                entry["errors"] += 1
+            elif status == "timeout":
+                entry["timeouts"] += 1
+            self._write_trace({
+                "type": "command", "verb": verb, "command": command[:200], "url": url,
+                "status": status, "total_ms": round(total * 1000, 3),
+                "connect_ms": round(connect * 1000, 3), "server_ms": round(server * 1000, 3),
+                "bytes_sent": sent, "bytes_received": received,
+            })
+
+    def record_tool(self, name: str, seconds: float, failed: bool) -> None:
+        """Record one MCP tool call."""
+        with self._lock:
+            entry = self.tools.get(name)
+            if entry is None:
+                entry = self.tools[name] = {"total": LatencyHistogram(), "errors": 0}
+            entry["total"].observe(seconds)
+            entry["errors"] += int(failed)
+            self._write_trace({
+                "type": "tool", "tool": name, "status": "error" if failed else "ok",
+                "total_ms": round(seconds * 1000, 3),
+            })
+
+    def command_history(self, verb: str) -> List[float]:
+        """Recent total durations of commands with this verb, in seconds."""
+        with self._lock:
+            entry = self.commands.get(verb)
+            return list(entry["total"].recent) if entry else []
+
+    def _write_trace(self, record: Dict[str, Any]) -> None:
+        # Called with the lock held
+        if not self.trace_file:
+            return
+        try:
+            if self._trace is None or self._trace_path != self.trace_file:
+                if self._trace is not None:
+                    self._trace.close()
+                self._trace = open(self.trace_file, "a", encoding="utf-8")
+                self._trace_path = self.trace_file
+            record["ts"] = round(time.time(), 6)
+            self._trace.write(json.dumps(record) + "\n")
+            self._trace.flush()
+        except OSError:
+            # Tracing must never break command execution
+            self.trace_file = ""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the metrics as a JSON-serializable dictionary."""
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started, 1),
+                "commands": {
+                    verb: {
+                        "latency": entry["total"].to_dict(),
+                        "connect": entry["connect"].to_dict(),
+                        "server": entry["server"].to_dict(),
+                        "bytes_sent": entry["bytes_sent"],
+                        "bytes_received": entry["bytes_received"],
+                        "errors": entry["errors"],
+                        "timeouts": entry["timeouts"],
+                        "connections_opened": entry["connections_opened"],
+                    }
+                    for verb, entry in sorted(self.commands.items())
+                },
+                "tools": {
+                    name: dict(entry["total"].to_dict(), errors=entry["errors"])
+                    for name, entry in sorted(self.tools.items())
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def histogram(name: str, label: str, groups: Dict[str, Any], key: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for value, entry in sorted(groups.items()):
+                hist = entry[key]
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), hist.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{name}_bucket{{{label}="{value}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label}="{value}"}} {hist.total:.6f}')
+                lines.append(f'{name}_count{{{label}="{value}"}} {hist.count}')
+
+        def counter(name: str, label: str, groups: Dict[str, Any], key: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for value, entry in sorted(groups.items()):
+                lines.append(f'{name}{{{label}="{value}"}} {entry[key]}')
+
+        with self._lock:
+            histogram("chimerax_mcp_command_seconds", "verb", self.commands, "total",
+                      "Time to run a ChimeraX command over REST")
+            seconds = {
+                verb: {key: round(entry[key].total, 6) for key in ("connect", "server")}
+                for verb, entry in self.commands.items()
+            }
+            counter("chimerax_mcp_command_connect_seconds_total", "verb", seconds, "connect",
+                    "Time spent opening new connections to the REST server")
+            counter("chimerax_mcp_command_server_seconds_total", "verb", seconds, "server",
+                    "Time spent waiting for ChimeraX to send the response headers")
+            counter("chimerax_mcp_command_bytes_sent_total", "verb", self.commands,
+                    "bytes_sent", "Request bytes sent")
+            counter("chimerax_mcp_command_bytes_received_total", "verb", self.commands,
+                    "bytes_received", "Response bytes received")
+            counter("chimerax_mcp_command_errors_total", "verb", self.commands,
+                    "errors", "Commands that failed")
+            counter("chimerax_mcp_command_timeouts_total", "verb", self.commands,
+                    "timeouts", "Commands that timed out")
+            histogram("chimerax_mcp_tool_seconds", "tool", self.tools, "total",
+                      "Time to handle an MCP tool call")
+            counter("chimerax_mcp_tool_errors_total", "tool", self.tools,
+                    "errors", "Tool calls that returned an error")
+        return "\n".join(lines) + "\n"
+
+
+server_metrics = ServerMetrics()
+
+# Recent durations a verb needs before adaptive timeouts replace its budget
+ADAPTIVE_MIN_SAMPLES = 20
+
+
+class TimeoutPolicy:
     """
-    try:
-        result = execute_chimerax_command(command)
-        return result if result else "Command executed successfully (no output)"
-    except ChimeraXError as e:
-        return f"Error: {str(e)}"
+    Read timeouts per command verb.
 
+    Verbs in verb_timeouts get that budget and all others the default. In
+    adaptive mode, once a verb has ADAPTIVE_MIN_SAMPLES recent durations
+    in the server metrics, its budget becomes factor times their p99,
+    kept between min_timeout and max_timeout. Quick queries then fail fast
+    when ChimeraX hangs, and commands that are always slow get room. A
+    verb_timeouts entry is a floor: adaptive budgets only raise it, since a
+    large download or render may take far longer than the recent ones.
+    A command line holding several commands gets the sum of their budgets.
+    """
 
-@mcp.tool()
-def open_structure(
-    identifier: str,
-    source: str = "pdb",
-    format: Optional[str] = None,
-    model_id: Optional[str] = None
-) -> str:
+    def __init__(self, default: float = DEFAULT_CONFIG["read_timeout"],
+                 verb_timeouts: Optional[Dict[str, float]] = None,
+                 adaptive: bool = False,
+                 factor: float = DEFAULT_CONFIG["adaptive_timeout_factor"],
+                 min_timeout: float = DEFAULT_CONFIG["adaptive_min_timeout"],
+                 max_timeout: float = DEFAULT_CONFIG["adaptive_max_timeout"],
+                 metrics: Optional[ServerMetrics] = None):
+        self.default = default
+        self.verb_timeouts = {verb: float(t) for verb, t in (verb_timeouts or {}).items()}
+        self.adaptive = adaptive
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.metrics = metrics if metrics is not None else server_metrics
+
+    def configured(self, verb: str) -> float:
+        """The budget from configuration alone."""
+        return self.verb_timeouts.get(verb, self.default)
+
+    def for_verb(self, verb: str) -> float:
+        """The budget for one command with this verb."""
+        if self.adaptive:
+            history = self.metrics.command_history(verb)
+            if len(history) >= ADAPTIVE_MIN_SAMPLES:
+                ordered = sorted(history)
+                p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+                floor = self.verb_timeouts.get(verb, self.min_timeout)
+                return min(max(self.factor * p99, floor), max(self.max_timeout, floor))
+        return self.configured(verb)
+
+    def for_command(self, command: str) -> float:
+        """The budget for a command line; batch `echo` markers are free."""
+        parts = split_command_line(command)
+        if len(parts) == 1:
+            return self.for_verb(command_verb(parts[0]))
+        budgets = [self.for_verb(command_verb(p)) for p in parts if command_verb(p) != "echo"]
+        return sum(budgets) if budgets else self.for_verb("echo")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current budgets for configured verbs and verbs with history."""
+        verbs = set(self.verb_timeouts) | set(self.metrics.get_stats()["commands"])
+        verbs.discard("batch")
+        return {
+            "default": self.default,
+            "adaptive": self.adaptive,
+            "verbs": {verb: round(self.for_verb(verb), 3) for verb in sorted(verbs)},
+        }
+
+
+# Seconds the current thread spent opening connections during a request
+_connect_timing = threading.local()
+
+
+def _timed_connect(connection_class):
+    """Subclass a urllib3 connection class to add connect time to _connect_timing."""
+    class TimedConnection(connection_class):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                super().connect()
+            finally:
+                _connect_timing.seconds = getattr(_connect_timing, "seconds", 0.0) + (
+                    time.perf_counter() - start
+                )
+    return TimedConnection
+
+
+@functools.lru_cache(maxsize=None)
+def _requests():
     """
-    Open a molecular structure in ChimeraX.
+    Get the requests module, importing it on first use.
 
-    Args:
-        identifier: Structure identifier (PDB ID, UniProt ID, file path, etc.)
-        source: Data source - 'pdb', 'alphafold', 'emdb', 'file', or 'local'
-        format: File format (only needed for local files, e.g., 'pdb', 'mmcif', 'mol2')
-        model_id: Optional model ID to assign (e.g., "#1", "#2")
+    Importing requests loads urllib3 and friends, which the MCP server
+    should not wait for before answering initialize.
+    """
+    import requests
 
-    Returns:
-        Confirmation message with details about opened structure
+    return requests
 
-    Examples:
-        - open_structure("1ubq", "pdb")  # Open PDB structure
-        - open_structure("P12345", "alphafold")  # Open AlphaFold prediction
-        - open_structure("C:/path/to/file.pdb", "local", "pdb")  # Open local file
+
+@functools.lru_cache(maxsize=None)
+def timed_http_adapter_class():
     """
-    try:
-        # Build open command based on source
-        if source == "local" or source == "file":
-            cmd = f"open {identifier}"
-            if format:
-                cmd += f" format {format}"
-        else:
-            cmd = f"open {identifier} from {source}"
+    Get the HTTPAdapter whose new connections record how long connecting took.
 
-        if model_id:
-            cmd += f" id {model_id}"
+    requests and urllib3 are imported here, when the first client is made,
+    so the MCP server can answer initialize before loading its HTTP stack.
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
-        result = execute_chimerax_command(cmd)
-        return result if result else f"Successfully opened {identifier} from {source}"
-    except ChimeraXError as e:
-        return f"Error opening structure: {str(e)}"
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = _timed_connect(HTTPConnection)
 
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = _timed_connect(HTTPSConnection)
 
-@mcp.tool()
-def close_models(model_spec: str = "all") -> str:
+    class TimedHTTPAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": TimedHTTPConnectionPool,
+                "https": TimedHTTPSConnectionPool,
+            }
+
+    return TimedHTTPAdapter
+
+
+# Lines of `info` (model summaries) and `info models` (model types) output
+INFO_MODEL_LINE = re.compile(r"^(#[\d.]+),\s*(.*?),\s*(shown|hidden)\b")
+INFO_COUNTS_LINE = re.compile(
+    r"^(\d+) atoms?, (\d+) bonds?, (\d+) residues?, (\d+) chains?(?:\s*\((.*?)\))?"
+)
+INFO_MODELS_LINE = re.compile(r"^model id (#[\d.]+) type (\S+)(?: name (.*))?$")
+# Start of the chain table ChimeraX logs when it opens a structure
+CHAIN_INFO_HEADER = re.compile(r"^Chain information for (.+?) (#[\d.]+)\s*$")
+
+
+def model_sort_key(model_id: str) -> tuple:
+    """Sort key putting #2 before #10 and #1.1 after #1."""
+    return tuple(int(p) if p.isdigit() else 0 for p in model_id.lstrip("#").split("."))
+
+
+def parse_scene_info(info_text: str, models_text: str = "") -> Dict[str, Dict[str, Any]]:
     """
-    Close molecular models in ChimeraX.
+    Parse `info` and `info models` output into model entries keyed by id.
 
     Args:
-        model_spec: Model specifier (e.g., "#1", "#1,2", "all")
+        info_text: Output of `info` (one summary per model, counts below it)
+        models_text: Output of `info models` (model types)
 
     Returns:
-        Confirmation message
-
-    Examples:
-        - close_models("#1")  # Close model 1
-        - close_models("all")  # Close all models
+        {"#1": {"id", "name", "type", "shown", "atoms", "bonds", "residues", "chains"}}
     """
-    try:
-        cmd = f"close {model_spec}" if model_spec != "all" else "close"
-        result = execute_chimerax_command(cmd)
-        return result if result else f"Successfully closed {model_spec}"
-    except ChimeraXError as e:
-        return f"Error closing models: {str(e)}"
+    models: Dict[str, Dict[str, Any]] = {}
+    current = None
+    for line in info_text.splitlines():
+        line = line.strip()
+        match = INFO_MODEL_LINE.match(line)
+        if match:
+            current = {
+                "id": match.group(1), "name": match.group(2), "type": None,
+                "shown": match.group(3) == "shown", "atoms": None, "bonds": None,
+                "residues": None, "chains": [],
+            }
+            models[current["id"]] = current
+            continue
+        match = INFO_COUNTS_LINE.match(line)
+        if match and current is not None:
+            current["atoms"], current["bonds"], current["residues"] = (
+                int(match.group(1)), int(match.group(2)), int(match.group(3))
+            )
+            if match.group(5):
+                current["chains"] = [c.strip() for c in match.group(5).split(",") if c.strip()]
 
+    for line in models_text.splitlines():
+        match = INFO_MODELS_LINE.match(line.strip())
+        if match:
+            entry = models.setdefault(match.group(1), {
+                "id": match.group(1), "name": match.group(3), "type": None,
+                "shown": None, "atoms": None, "bonds": None, "residues": None, "chains": [],
+            })
+            entry["type"] = match.group(2)
+    return models
 
-@mcp.tool()
-def save_image(
-    filepath: str,
-    width: int = 1920,
-    height: int = 1080,
-    transparent_background: bool = False,
-    supersample: int = 3
-) -> str:
+
+def parse_opened_models(log: str) -> Dict[str, Dict[str, Any]]:
     """
-    Save current ChimeraX visualization as an image.
+    Find the models an `open` command created, from its chain tables.
+
+    Returns:
+        Model entries (id, name and chains; counts unknown) keyed by id
+    """
+    models: Dict[str, Dict[str, Any]] = {}
+    current = None
+    for line in log.splitlines():
+        line = line.strip()
+        match = CHAIN_INFO_HEADER.match(line)
+        if match:
+            current = {
+                "id": match.group(2), "name": match.group(1), "type": None,
+                "shown": True, "atoms": None, "bonds": None, "residues": None, "chains": [],
+            }
+            models[current["id"]] = current
+        elif current is not None and "|" in line:
+            # Rows are "A B | description | ...", identical chains share a row
+            first = line.split("|", 1)[0].split()
+            if first and first != ["Chain"]:
+                current["chains"].extend(c for c in first if c not in current["chains"])
+        elif current is not None and line and not line.startswith("---"):
+            current = None
+    return models
 
-    Args:
-        filepath: Output file path (supports .png, .jpg, .tiff)
-        width: Image width in pixels
-        height: Image height in pixels
-        transparent_background: Use transparent background
-        supersample: Supersampling level for antialiasing (1-4, higher = better quality)
+
+def closed_model_ids(command: str) -> Optional[List[str]]:
+    """
+    Model ids removed by a `close` command.
 
     Returns:
-        Confirmation message with file path
+        [] for closing everything, the ids for simple specs like "#1,3-4"
+        or "#2.1", or None if the spec is too complex to resolve locally
+    """
+    args = command.split()[1:]
+    if not args or args in (["all"], ["session"]):
+        return []
+    if len(args) != 1 or not re.fullmatch(r"#[\d.,\-]+", args[0]):
+        return None
 
-    Examples:
-        - save_image("protein.png", 3840, 2160)
-        - save_image("figure.png", transparent_background=True)
+    ids = []
+    for item in args[0][1:].split(","):
+        if re.fullmatch(r"\d+-\d+", item):
+            low, high = (int(n) for n in item.split("-"))
+            ids.extend(f"#{n}" for n in range(low, high + 1))
+        elif re.fullmatch(r"\d+(?:\.\d+)*", item):
+            ids.append(f"#{item}")
+        else:
+            return None
+    return ids
+
+
+class SceneModel:
     """
-    try:
-        cmd = f"save {filepath} width {width} height {height} supersample {supersample}"
-        if transparent_background:
-            cmd += " transparentBackground true"
+    Shadow of the models open in a ChimeraX instance.
 
-        result = execute_chimerax_command(cmd)
-        return f"Image saved to {filepath}" + (f"\n{result}" if result else "")
-    except ChimeraXError as e:
-        return f"Error saving image: {str(e)}"
+    Keeps model ids, names, types, chain lists and atom/residue counts so
+    that tools can check specs and answer metadata questions without asking
+    ChimeraX. Models are added from the chain tables in `open` output and
+    removed when `close` names them; any command outside
+    SCENE_MODEL_NEUTRAL_VERBS marks the shadow stale, and a stale shadow is
+    refreshed with one `info` / `info models` request the next time it is
+    read, or by the periodic sync thread.
+    """
 
+    def __init__(self, client: "ChimeraXClient"):
+        self._client = client
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._generation = 0
+        self._synced_generation = -1
+        self._synced_at: Optional[float] = None
+        self._sync_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.syncs = 0
+        self.last_error: Optional[str] = None
 
-@mcp.tool()
-def color_structure(
-    model_spec: str,
-    color_scheme: str,
-    target: str = "all"
-) -> str:
+    def observe(self, command: str) -> None:
+        """Note a command about to be sent; closes are applied at once."""
+        parts = [
+            part for part in split_command_line(command)
+            if command_verb(part) not in SCENE_MODEL_NEUTRAL_VERBS
+        ]
+        if not parts:
+            return
+        with self._lock:
+            self._generation += 1
+            for part in parts:
+                if command_verb(part) != "close":
+                    continue
+                ids = closed_model_ids(part)
+                if ids == []:
+                    self._models.clear()
+                for model_id in ids or []:
+                    for known in list(self._models):
+                        if known == model_id or known.startswith(model_id + "."):
+                            del self._models[known]
+
+    def reset(self) -> None:
+        """Forget all models (ChimeraX was replaced by a fresh instance)."""
+        with self._lock:
+            self._generation += 1
+            self._models.clear()
+
+    def record_output(self, command: str, output: str) -> None:
+        """Add the models an `open` in the command reported."""
+        if not any(command_verb(p) == "open" for p in split_command_line(command)):
+            return
+        opened = parse_opened_models(output)
+        with self._lock:
+            self._models.update(opened)
+
+    def is_stale(self, max_age: Optional[float] = None) -> bool:
+        """True if models may have changed since the last sync."""
+        with self._lock:
+            if self._synced_generation != self._generation or self._synced_at is None:
+                return True
+            return max_age is not None and time.monotonic() - self._synced_at > max_age
+
+    def sync(self) -> None:
+        """
+        Refresh the shadow from ChimeraX.
+
+        Raises:
+            ChimeraXError: If ChimeraX cannot be reached or `info` fails
+        """
+        with self._lock:
+            generation = self._generation
+        info, models = self._client.execute_batch(
+            ["info", "info models"], stop_on_error=False, journal=False
+        )
+        if info["status"] != "ok":
+            raise ChimeraXError(f"Scene sync failed: {info['output']}")
+
+        parsed = parse_scene_info(
+            info["output"], models["output"] if models["status"] == "ok" else ""
+        )
+        with self._lock:
+            # A model-changing command overlapped the sync, so keep it stale
+            if generation != self._generation:
+                return
+            self._models = parsed
+            self._synced_generation = generation
+            self._synced_at = time.monotonic()
+            self.syncs += 1
+            self.last_error = None
+
+    def get(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get the models, syncing first if the shadow is stale or older than max_age.
+
+        Returns:
+            Dictionary with the model list and sync status
+        """
+        if self.is_stale(max_age):
+            self.sync()
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the models as currently known, without contacting ChimeraX."""
+        with self._lock:
+            age = time.monotonic() - self._synced_at if self._synced_at is not None else None
+            return {
+                "models": [
+                    dict(self._models[key], chains=list(self._models[key]["chains"]))
+                    for key in sorted(self._models, key=model_sort_key)
+                ],
+                "stale": self._synced_generation != self._generation or age is None,
+                "synced_seconds_ago": round(age, 3) if age is not None else None,
+                "syncs": self.syncs,
+                "last_error": self.last_error,
+            }
+
+    def find(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a model by id (e.g. "#1") without contacting ChimeraX."""
+        with self._lock:
+            model = self._models.get(model_id)
+            return dict(model, chains=list(model["chains"])) if model else None
+
+    def start_sync(self, interval: float) -> None:
+        """Refresh the shadow every interval seconds on a daemon thread."""
+        with self._lock:
+            if self._sync_thread is not None or interval <= 0:
+                return
+            self._sync_thread = threading.Thread(
+                target=self._sync_loop, args=(interval,), daemon=True
+            )
+        self._sync_thread.start()
+
+    def _sync_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                if self.is_stale(interval):
+                    self.sync()
+            except ChimeraXError as e:
+                with self._lock:
+                    self.last_error = str(e)
+
+    def stop(self) -> None:
+        """Stop the periodic sync thread."""
+        self._stop.set()
+
+
+class SessionLog:
     """
-    Color molecular structures using various schemes.
+    Scene-changing commands sent to ChimeraX since the last checkpoint.
 
-    Args:
-        model_spec: Model specifier (e.g., "#1", "#1,2", "all")
-        color_scheme: Color scheme - 'bychain', 'byhetero', 'byelement', 'bypolymer',
-                     'sequential', or specific color name (e.g., 'red', 'blue', '#FF0000')
-        target: What to color - 'all', 'cartoons', 'atoms', 'surfaces'
+    Commands are kept one per entry in the order they ran, leaving out
+    those in SCENE_NEUTRAL_VERBS. As in CommandCoalescer, a visual command
+    replaces an earlier one with the same coalesce_key, but only within a
+    run of visual commands, so replayed commands see the same selection
+    and models as the originals did. An absolute camera command (see
+    sets_camera) replaces all earlier camera moves, and `close session`
+    replaces everything before it.
+    """
 
-    Returns:
-        Confirmation message
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: List[tuple] = []  # (sequence number, command)
+        self._run_start = 0  # First entry after the last non-visual command
+        self._sequence = 0
+        self._suspended = 0
 
-    Examples:
-        - color_structure("#1", "bychain")
-        - color_structure("#1", "red", "cartoons")
-        - color_structure("all", "byelement", "atoms")
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def record(self, command: str) -> None:
+        """Log the scene-changing parts of a command line ChimeraX ran."""
+        with self._lock:
+            if self._suspended:
+                return
+            for part in split_command_line(command):
+                verb = command_verb(part)
+                if verb in SCENE_NEUTRAL_VERBS:
+                    continue
+                if verb == "close" and part.split()[1:] == ["session"]:
+                    self._drop(lambda entry: False)
+                elif sets_camera(part):
+                    self._drop(lambda entry: not is_camera_command(entry))
+                key = coalesce_key(part)
+                if key is None:
+                    self._run_start = len(self._entries) + 1
+                else:
+                    for i in range(self._run_start, len(self._entries)):
+                        if coalesce_key(self._entries[i][1]) == key:
+                            del self._entries[i]
+                            break
+                self._entries.append((self._sequence, part))
+                self._sequence += 1
+
+    def _drop(self, keep) -> None:
+        # Called with the lock held; _run_start stays on the same entry
+        dropped = sum(1 for _, c in self._entries[:self._run_start] if not keep(c))
+        self._entries = [entry for entry in self._entries if keep(entry[1])]
+        self._run_start -= dropped
+
+    def mark(self) -> int:
+        """Position to pass to trim() once a checkpoint covers the log so far."""
+        with self._lock:
+            return self._sequence
+
+    def trim(self, mark: int) -> None:
+        """Drop the commands logged before mark."""
+        with self._lock:
+            kept = [entry for entry in self._entries if entry[0] >= mark]
+            self._run_start = max(0, self._run_start - (len(self._entries) - len(kept)))
+            self._entries = kept
+
+    def commands(self) -> List[str]:
+        with self._lock:
+            return [command for _, command in self._entries]
+
+    @contextmanager
+    def suspended(self):
+        """Stop logging, e.g. while the log itself is replayed."""
+        with self._lock:
+            self._suspended += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._suspended -= 1
+
+
+# `echo` markers execute_batch adds after each command of a batch
+BATCH_MARKER = re.compile(r"^echo cxmcp-[0-9a-f]{12}:\d+$")
+
+
+class CommandJournal:
     """
-    try:
-        if target == "all":
-            cmd = f"color {model_spec} {color_scheme}"
-        else:
-            cmd = f"color {model_spec} {color_scheme} target {target}"
+    Append-only JSON lines journal of every command line sent to ChimeraX.
+
+    Each line holds a sequence number, the time, the instance URL, the
+    command (without execute_batch markers), 'ok' or 'error' and the
+    seconds it took. Failed batches also give how many of their commands
+    'completed'. Sequence numbers continue across server restarts. Scene
+    syncs and checkpoint saves and restores are not journaled.
+
+    Once the file grows past max_bytes it is renamed to <name>.1, replacing
+    the previous one, and a new file is started, so the journal keeps
+    between max_bytes and twice that of recent history.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 0):
+        self.path = path
+        self.old_path = path.with_name(path.name + ".1")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._seq: Optional[int] = None
+
+    def record(self, command: str, url: str, status: str, seconds: float,
+               completed: Optional[int] = None) -> None:
+        command = " ; ".join(
+            part for part in split_command_line(command) if not BATCH_MARKER.match(part)
+        )
+        with self._lock:
+            try:
+                if self._seq is None:
+                    self._seq = self._last_seq()
+                self._seq += 1
+                entry = {
+                    "seq": self._seq,
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "url": url,
+                    "command": command,
+                    "status": status,
+                    "seconds": round(seconds, 4),
+                }
+                if completed is not None:
+                    entry["completed"] = completed
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+                    size = f.tell()
+                if self.max_bytes > 0 and size >= self.max_bytes:
+                    os.replace(self.path, self.old_path)
+            except OSError:
+                # The journal must never break command execution
+                pass
+
+    @staticmethod
+    def _edge_seq(path: Path, last: bool) -> Optional[int]:
+        """Sequence number of the first or last readable line of a file."""
+        try:
+            with open(path, "rb") as f:
+                if last:
+                    f.seek(0, os.SEEK_END)
+                    f.seek(max(f.tell() - 65536, 0))
+                lines = f.read(65536).splitlines()
+        except OSError:
+            return None
+        for line in reversed(lines) if last else lines:
+            try:
+                return int(json.loads(line)["seq"])
+            except (ValueError, KeyError, TypeError):
+                continue
+        return None
+
+    def _last_seq(self) -> int:
+        for path in (self.path, self.old_path):
+            seq = self._edge_seq(path, last=True)
+            if seq is not None:
+                return seq
+        return 0
+
+    def read(self, first: int = 1, last: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get the journal entries numbered first to last (inclusive).
+
+        Returns:
+            Entries in order; unreadable lines and rotated-out entries are
+            skipped
+        """
+        paths = [self.path]
+        current_first = self._edge_seq(self.path, last=False)
+        if current_first is None or first < current_first:
+            # Only the rotated file can hold entries before the current one
+            paths.insert(0, self.old_path)
+
+        entries = []
+        for path in paths:
+            if not path.exists():
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get("seq", 0) < first:
+                        continue
+                    if last is not None and entry["seq"] > last:
+                        return entries
+                    entries.append(entry)
+        return entries
+
+
+# Atom spec hierarchy levels and the list items each level accepts
+SPEC_LEVELS = {"#": "model", "/": "chain", ":": "residue", "@": "atom"}
+_RESIDUE_NUMBER = r"-?\d+[A-Za-z]?"
+SPEC_ITEMS = {
+    "#": re.compile(r"(?:\*|\d+(?:-\d+)?)(?:\.(?:\*|\d+(?:-\d+)?))*"),
+    "/": re.compile(r"[A-Za-z0-9*?]+(?:-[A-Za-z0-9]+)?"),
+    ":": re.compile(
+        rf"(?:{_RESIDUE_NUMBER}|start)(?:-(?:{_RESIDUE_NUMBER}|end))?|[A-Za-z0-9_*?+']+"
+    ),
+    "@": re.compile(r"[A-Za-z0-9_'\"*?]+"),
+}
+# Tokens using operators, zones or attribute tests are left to ChimeraX
+SPEC_OPERATORS = re.compile(r"[<>=&|~()!]|##|//|::|@@")
+
+
+def _check_residue_range(item: str, token: str) -> None:
+    match = re.fullmatch(r"(-?\d+)[A-Za-z]?-(-?\d+)[A-Za-z]?", item)
+    if match and int(match.group(1)) > int(match.group(2)):
+        raise SpecError(f"Residue range ':{item}' in '{token}' runs backwards")
+
+
+def _check_against_scene(token: str, parts: List[tuple], scene: SceneModel) -> None:
+    """Reject models and chains a current scene model says do not exist."""
+    models = scene.snapshot()["models"]
+    named = [
+        item for marker, value in parts if marker == "#"
+        for item in value.split(",") if re.fullmatch(r"\d+(?:\.\d+)*", item)
+    ]
+    for model_id in named:
+        if not any(m["id"] == f"#{model_id}" or m["id"].startswith(f"#{model_id}.")
+                   for m in models):
+            open_ids = ", ".join(m["id"] for m in models) or "none"
+            raise SpecError(f"Model #{model_id} in '{token}' is not open (open models: {open_ids})")
+
+    if any(marker == "#" for marker, _ in parts) and not named:
+        return
+    scope = [m for m in models if not named or m["id"].lstrip("#").split(".")[0]
+             in {n.split(".")[0] for n in named}]
+    chains = {c.upper() for m in scope for c in m["chains"]}
+    if not chains:
+        return
+    for marker, value in parts:
+        for item in value.split(",") if marker == "/" else []:
+            if re.fullmatch(r"[A-Za-z0-9]+", item) and item.upper() not in chains:
+                raise SpecError(
+                    f"Chain /{item} in '{token}' does not exist "
+                    f"(chains: {', '.join(sorted(chains))})"
+                )
+
+
+def validate_spec(spec: str, scene: Optional[SceneModel] = None,
+                  require_atom: bool = False) -> str:
+    """
+    Check an atom specifier locally and return it normalized.
+
+    Hierarchy tokens like "#1/A:10-20@CA,CB" are checked level by level;
+    keywords (all, protein, sel, ...) and tokens with operators are passed
+    through. If the scene model is current, models and chains must also
+    exist in it.
+
+    Args:
+        spec: Atom specifier
+        scene: Scene model to check models and chains against
+        require_atom: The spec must name atoms (for per-atom commands)
+
+    Returns:
+        The spec with whitespace collapsed and list separators tidied
+
+    Raises:
+        SpecError: If the spec is malformed or names missing models/chains
+    """
+    if ";" in spec or "\n" in spec:
+        raise SpecError(f"Specifier '{spec.strip()}' must not contain ';' or line breaks")
+    text = re.sub(r"\s*,\s*", ",", " ".join(spec.split()))
+    text = re.sub(r"(?<=\w) ?- ?(?=\w)", "-", text)
+    if not text:
+        raise SpecError("Specifier is empty")
+    if text.count("(") != text.count(")") or text.count('"') % 2:
+        raise SpecError(f"Specifier '{text}' has unbalanced parentheses or quotes")
+
+    check_scene = scene is not None and not scene.is_stale()
+    has_atom = opaque = False
+    for token in text.split():
+        if token[0] not in SPEC_LEVELS or SPEC_OPERATORS.search(token):
+            opaque = True
+            continue
+        parts = re.findall(r"([#/:@])([^#/:@]*)", token)
+        for marker, value in parts:
+            items = value.split(",")
+            if not value or not all(SPEC_ITEMS[marker].fullmatch(item) for item in items):
+                raise SpecError(
+                    f"Invalid {SPEC_LEVELS[marker]} list '{marker}{value}' in '{token}'"
+                )
+            if marker == ":":
+                for item in items:
+                    _check_residue_range(item, token)
+            has_atom = has_atom or marker == "@"
+        if check_scene:
+            _check_against_scene(token, parts, scene)
+
+    if require_atom and not has_atom and not opaque:
+        raise SpecError(f"Specifier '{text}' names no atom (add @name, e.g. '{text}@CA')")
+    return text
+
+
+def join_spec(model_spec: str, chain: Optional[str] = None,
+              residues: Optional[str] = None) -> str:
+    """
+    Combine a model spec with chain and residue parts in hierarchy order.
+
+    Examples:
+        join_spec("#1", "A", "1-50") -> "#1/A:1-50"
+        join_spec("all", "B") -> "/B"
+    """
+    spec = model_spec.strip()
+    if spec.lower() == "all" and (chain or residues):
+        spec = ""
+    if chain:
+        spec += "/" + chain.strip().lstrip("/")
+    if residues:
+        spec += ":" + residues.strip().lstrip(":")
+    return spec
+
+
+def qualify_spec(model_spec: str, sub_spec: str) -> str:
+    """Prefix a chain/residue/atom spec with the model, unless it names one."""
+    sub_spec = sub_spec.strip()
+    if sub_spec.startswith("#") or model_spec.strip().lower() == "all":
+        return sub_spec
+    return model_spec.strip() + sub_spec
+
+
+class CircuitBreaker:
+    """
+    Fails fast while ChimeraX cannot be reached.
+
+    After `threshold` connection errors in a row the breaker opens and
+    check() raises ChimeraXUnavailableError at once, so callers are told
+    when to come back instead of each waiting on a refused connection.
+    While open, a daemon thread probes ChimeraX, backing off (with jitter)
+    from probe_interval to max_probe_interval, and the first successful
+    probe closes the breaker again.
+    """
+
+    def __init__(self, probe, threshold: int = DEFAULT_CONFIG["breaker_threshold"],
+                 probe_interval: float = DEFAULT_CONFIG["breaker_probe_interval"],
+                 max_probe_interval: float = 30.0):
+        self._probe = probe
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._next_probe = 0.0
+        self.trips = 0
+        self.probes = 0
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def retry_after(self) -> float:
+        """Seconds until the next health probe (0 if closed)."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(self._next_probe - time.monotonic(), 0.0)
+
+    def check(self) -> None:
+        """
+        Raises:
+            ChimeraXUnavailableError: If the breaker is open
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            retry_after = max(self._next_probe - time.monotonic(), 0.0)
+            down_for = time.monotonic() - self._opened_at
+        raise ChimeraXUnavailableError(
+            f"ChimeraX unavailable (unreachable for {down_for:.0f} s), "
+            f"retry after {max(math.ceil(retry_after), 1)} s",
+            retry_after
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """Count a connection error, opening the breaker at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures < self.threshold:
+                return
+            self._opened_at = time.monotonic()
+            self._next_probe = self._opened_at + self.probe_interval
+            self.trips += 1
+        threading.Thread(target=self._probe_loop, daemon=True).start()
+
+    def _probe_loop(self) -> None:
+        interval = self.probe_interval
+        while True:
+            delay = interval * random.uniform(0.8, 1.2)
+            with self._lock:
+                self._next_probe = time.monotonic() + delay
+            if self._stop.wait(delay):
+                return
+            self.probes += 1
+            if self._probe():
+                with self._lock:
+                    self._opened_at = None
+                    self._failures = 0
+                return
+            interval = min(interval * 2, self.max_probe_interval)
+
+    def reset(self) -> None:
+        """Close the breaker (ChimeraX is known to be back)."""
+        with self._lock:
+            self._opened_at = None
+            self._failures = 0
+        self._stop.set()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Stop probing (the client is being closed)."""
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            is_open = self._opened_at is not None
+            return {
+                "state": "open" if is_open else "closed",
+                "consecutive_failures": self._failures,
+                "trips": self.trips,
+                "probes": self.probes,
+                "retry_after": round(max(self._next_probe - time.monotonic(), 0.0), 1)
+                if is_open else 0.0,
+            }
+
+
+class ChimeraXClient:
+    """
+    Pooled HTTP client for the ChimeraX REST API.
+
+    Keeps connections to the REST server alive between commands so that
+    consecutive tool calls do not pay TCP connection setup each time.
+    Connection reuse only happens if the REST server keeps the connection
+    open; get_stats() reports how many connections were actually opened.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = DEFAULT_CONFIG["pool_size"],
+        connect_timeout: float = DEFAULT_CONFIG["connect_timeout"],
+        read_timeout: float = DEFAULT_CONFIG["read_timeout"],
+        cache: Optional[ResultCache] = None,
+        metrics: Optional[ServerMetrics] = None,
+        timeouts: Optional[TimeoutPolicy] = None,
+        retries: int = DEFAULT_CONFIG["retry_attempts"],
+        retry_backoff: float = DEFAULT_CONFIG["retry_backoff"],
+        breaker_threshold: int = DEFAULT_CONFIG["breaker_threshold"],
+        probe_interval: float = DEFAULT_CONFIG["breaker_probe_interval"],
+        session_log: Optional[SessionLog] = None,
+        journal: Optional[CommandJournal] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.cache = cache if cache is not None else ResultCache()
+        self.scene = SceneModel(self)
+        self.session_log = session_log
+        self.journal = journal
+        self.metrics = metrics if metrics is not None else server_metrics
+        self.timeouts = timeouts if timeouts is not None else TimeoutPolicy(
+            read_timeout, {}, metrics=self.metrics
+        )
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.breaker = CircuitBreaker(self._probe, breaker_threshold, probe_interval)
+        self.scene_version = 0
+
+        self._adapter = timed_http_adapter_class()(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True
+        )
+        self.session = _requests().Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._commands_sent = 0
+        self._errors = 0
+        self._retries = 0
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently waiting on ChimeraX."""
+        with self._lock:
+            return self._in_flight
+
+    def retarget(self, base_url: str) -> None:
+        """
+        Point the client at a fresh ChimeraX and forget the old one's state.
+
+        Requests already sent finish against the old URL; cached results,
+        the scene model and the breaker are reset in the same step so no
+        request pairs the new URL with state from the old instance.
+        """
+        with self._lock:
+            self.base_url = base_url.rstrip("/")
+            self.scene_version += 1
+            self.cache.invalidate()
+            self.scene.reset()
+            self.breaker.reset()
+
+    def run(self, command: str, read_timeout: Optional[float] = None) -> str:
+        """
+        Execute a single ChimeraX command, failing fast while ChimeraX is down.
+
+        Read-only commands are retried with jittered exponential backoff
+        after a connection error; other commands are never sent twice.
+
+        Args:
+            command: ChimeraX command to execute
+            read_timeout: Seconds to wait for the result (default: from the
+                          client's timeout policy)
+
+        Returns:
+            Response text from ChimeraX
+
+        Raises:
+            ChimeraXUnavailableError: If the circuit breaker is open
+            ChimeraXError: If command execution fails
+        """
+        self.breaker.check()
+        retryable = all(
+            command_verb(part) in RETRYABLE_VERBS for part in split_command_line(command)
+        )
+        attempts = 1 + (self.retries if retryable else 0)
+        for attempt in range(attempts):
+            try:
+                result = self._send(command, read_timeout)
+            except ChimeraXConnectionError:
+                self.breaker.record_failure()
+                if attempt + 1 >= attempts or self.breaker.is_open:
+                    raise
+                with self._lock:
+                    self._retries += 1
+                time.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _probe(self) -> bool:
+        """Cheap health check used by the circuit breaker."""
+        try:
+            response = self.session.get(
+                f"{self.base_url}/run?command=version",
+                timeout=(self.connect_timeout, max(self.timeouts.for_verb("version"), 1.0))
+            )
+            return response.ok
+        except _requests().exceptions.RequestException:
+            return False
+
+    def _send(self, command: str, read_timeout: Optional[float] = None) -> str:
+        """
+        Send one request to the REST server.
+
+        Args:
+            command: ChimeraX command to execute
+            read_timeout: Seconds to wait for the result (default: from the
+                          client's timeout policy)
+
+        Returns:
+            Response text from ChimeraX
+
+        Raises:
+            ChimeraXConnectionError: If the REST server cannot be reached
+            ChimeraXError: If command execution fails
+        """
+        if read_timeout is None:
+            read_timeout = self.timeouts.for_command(command)
+
+        with self._lock:
+            self._commands_sent += 1
+            self._in_flight += 1
+
+        # URL encode the command
+        encoded_command = quote(command)
+        url = f"{self.base_url}/run?command={encoded_command}"
+        response = None
+        status = "error"
+        _connect_timing.seconds = 0.0
+        start = time.perf_counter()
+        try:
+            response = self.session.get(
+                url, timeout=(self.connect_timeout, read_timeout)
+            )
+            response.raise_for_status()
+
+            status = "ok"
+            return response.text.strip()
+        except _requests().exceptions.ConnectionError:
+            self._record_error()
+            raise ChimeraXConnectionError(
+                "Cannot connect to ChimeraX. Please ensure ChimeraX is running "
+                "and the REST server is enabled with 'remotecontrol rest start'"
+            )
+        except _requests().exceptions.Timeout:
+            self._record_error()
+            status = "timeout"
+            raise ChimeraXError(
+                f"ChimeraX command timed out after {read_timeout:g} seconds"
+            )
+        except _requests().exceptions.HTTPError as e:
+            self._record_error()
+            raise ChimeraXCommandError(
+                f"Error communicating with ChimeraX: {str(e)}",
+                output=e.response.text.strip()
+            )
+        except _requests().exceptions.RequestException as e:
+            self._record_error()
+            raise ChimeraXError(f"Error communicating with ChimeraX: {str(e)}")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._record_timing(command, url, status, start, response)
+
+    def _record_timing(self, command: str, url: str, status: str, start: float,
+                       response: Optional["requests.Response"]) -> None:
+        total = time.perf_counter() - start
+        connect = _connect_timing.seconds
+        # requests measures elapsed until the response headers were parsed
+        waited = response.elapsed.total_seconds() if response is not None else total
+        self.metrics.record_command(
+            command, self.base_url, status, total, connect, max(waited - connect, 0.0),
+            len(url) - len(self.base_url),
+            len(response.content) if response is not None else 0
+        )
+
+    def execute(self, command: str, read_timeout: Optional[float] = None,
+                journal: bool = True) -> str:
+        """
+        Execute a command, answering read-only queries from the result cache.
+
+        Args:
+            command: ChimeraX command to execute
+            read_timeout: Seconds to wait for the result (default: client setting)
+            journal: Record the command in the command journal, if any
+
+        Returns:
+            Response text from ChimeraX
+
+        Raises:
+            ChimeraXError: If command execution fails
+        """
+        cached, generation = self.cache.lookup(command)
+        if cached is not None:
+            return cached
+
+        if any(command_verb(part) not in SCENE_NEUTRAL_VERBS
+               for part in split_command_line(command)):
+            with self._lock:
+                self.scene_version += 1
+
+        if not self.cache.invalidates(command):
+            result = self._run_journaled(command, read_timeout, journal)
+            self.cache.store(command, result, generation)
+            self._log_session(command)
+            return result
+
+        # Invalidate before and after, so queries overlapping the change are dropped
+        self.cache.invalidate()
+        self.scene.observe(command)
+        try:
+            result = self._run_journaled(command, read_timeout, journal)
+        finally:
+            self.cache.invalidate()
+        self.scene.record_output(command, result)
+        self._log_session(command)
+        return result
+
+    def _run_journaled(self, command: str, read_timeout: Optional[float],
+                       journal: bool = True) -> str:
+        if self.journal is None or not journal:
+            return self.run(command, read_timeout)
+        start = time.perf_counter()
+        try:
+            result = self.run(command, read_timeout)
+        except ChimeraXError:
+            self.journal.record(command, self.base_url, "error", time.perf_counter() - start)
+            raise
+        self.journal.record(command, self.base_url, "ok", time.perf_counter() - start)
+        return result
+
+    def _journal_batch(self, line: str, start: float, completed: int, total: int,
+                       journal: bool = True) -> None:
+        # Failed batches note how many commands ran, so replays can use them
+        if self.journal is not None and journal:
+            self.journal.record(
+                line, self.base_url, "ok" if completed == total else "error",
+                time.perf_counter() - start, None if completed == total else completed
+            )
+
+    def _log_session(self, command: str) -> None:
+        if self.session_log is not None:
+            self.session_log.record(command)
+
+    def execute_batch(
+        self,
+        commands: List[str],
+        stop_on_error: bool = True,
+        read_timeout: Optional[float] = None,
+        journal: bool = True
+    ) -> List[Dict[str, str]]:
+        """
+        Execute several ChimeraX commands in a single REST request.
+
+        The commands are joined into one `;`-separated command line with an
+        `echo` marker after each one, and the returned log is split back into
+        per-command output at the markers. ChimeraX stops a command line at the
+        first failing command; with stop_on_error=False the remaining commands
+        are sent again in a follow-up request.
+
+        Args:
+            commands: ChimeraX commands to execute, in order
+            stop_on_error: Skip the remaining commands after the first failure
+            read_timeout: Seconds to wait for each request (default: client setting)
+            journal: Record the command lines in the command journal, if any
+
+        Returns:
+            One dict per command with 'command', 'status' ('ok', 'error' or
+            'skipped') and 'output'
+
+        Raises:
+            ChimeraXError: If ChimeraX cannot be reached
+        """
+        pending = [c.strip() for c in commands if c.strip()]
+        results: List[Dict[str, str]] = []
+
+        while pending:
+            token = f"cxmcp-{uuid.uuid4().hex[:12]}"
+            parts = []
+            for i, command in enumerate(pending):
+                parts.extend([command, f"echo {token}:{i}"])
+
+            line = " ; ".join(parts)
+            error = None
+            start = time.perf_counter()
+            try:
+                text = self.execute(line, read_timeout, journal=False)
+            except ChimeraXCommandError as e:
+                text, error = e.output, e
+            except ChimeraXError:
+                self._journal_batch(line, start, 0, len(pending), journal)
+                raise
+
+            # Output before marker i belongs to command i
+            completed = 0
+            for i, command in enumerate(pending):
+                output, found, rest = text.partition(f"{token}:{i}")
+                if not found:
+                    break
+                results.append({"command": command, "status": "ok", "output": output.strip()})
+                text = rest
+                completed += 1
+            self._journal_batch(line, start, completed, len(pending), journal)
+
+            if completed == len(pending):
+                break
+            if error is not None:
+                # execute() only logs command lines that succeed as a whole
+                self._log_session(" ; ".join(pending[:completed]))
+
+            # The first command without a marker is the one that failed
+            message = text.strip() or (str(error) if error else "Command failed")
+            results.append({"command": pending[completed], "status": "error", "output": message})
+            pending = pending[completed + 1:]
+            if stop_on_error:
+                results.extend(
+                    {"command": command, "status": "skipped", "output": ""}
+                    for command in pending
+                )
+                break
+
+        return results
+
+    def _record_error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool statistics.
+
+        Returns:
+            Dictionary with request counts and connection reuse figures
+        """
+        connections_opened = 0
+        http_requests = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections_opened += pool.num_connections
+            http_requests += pool.num_requests
+
+        with self._lock:
+            commands_sent = self._commands_sent
+            errors = self._errors
+            retries = self._retries
+
+        reused = max(http_requests - connections_opened, 0)
+        return {
+            "url": self.base_url,
+            "pool_size": self.pool_size,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "timeouts": self.timeouts.get_stats(),
+            "breaker": self.breaker.get_stats(),
+            "commands_sent": commands_sent,
+            "errors": errors,
+            "retries": retries,
+            "http_requests": http_requests,
+            "connections_opened": connections_opened,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / http_requests, 3) if http_requests else 0.0,
+            "scene_version": self.scene_version,
+            "cache": self.cache.get_stats(),
+        }
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.scene.stop()
+        self.breaker.stop()
+        self.session.close()
+
+
+def coalesce_key(command: str) -> Optional[tuple]:
+    """
+    Get the key identifying which earlier commands a visual command supersedes.
+
+    Args:
+        command: A single ChimeraX command
+
+    Returns:
+        Hashable key, or None if the command cannot be coalesced
+    """
+    if ";" in command:
+        return None
+    words = command.split()
+    if len(words) < 2 or words[0].lower() not in COALESCE_VERBS:
+        return None
+
+    verb, spec, rest = words[0].lower(), words[1], words[2:]
+    if not spec.startswith(("#", "/", ":", "@")) and spec not in ("all", "sel"):
+        return None
+
+    if verb == "color":
+        # color <spec> <color> [options]: a new color replaces the old one
+        if not rest or rest[0].lower() in PARTIAL_COLOR_SCHEMES:
+            return None
+        return ("color", spec, tuple(rest[1:]))
+    if verb == "style":
+        return ("style", spec) if len(rest) == 1 else None
+    # show and hide of the same target override each other
+    return ("display", spec, tuple(rest))
+
+
+def is_camera_command(command: str) -> bool:
+    """Whether a command only moves the camera."""
+    words = command.lower().split()
+    if not words or words[0] not in CAMERA_VERBS:
+        return False
+    if words[0] == "view":
+        # view, view <spec>, view orient, view matrix camera ...; not named views
+        return (len(words) == 1 or words[1] in ("orient", "all", "sel")
+                or words[1].startswith(("#", "/", ":", "@"))
+                or words[1:3] == ["matrix", "camera"])
+    return not any(word in ("models", "coordinatesystem") for word in words[1:])
+
+
+def sets_camera(command: str) -> bool:
+    """Whether a command puts the camera in a position that ignores earlier moves."""
+    words = command.lower().split()
+    return words[:2] == ["view", "orient"] or words[:3] == ["view", "matrix", "camera"]
+
+
+def compile_macro(commands: List[str]) -> List[str]:
+    """
+    Reduce a command history to a script that rebuilds its final scene.
+
+    Queries and other scene-neutral commands are dropped, and so is
+    anything superseded by a later command, with the rules of SessionLog.
+
+    Args:
+        commands: Command lines in the order ChimeraX ran them
+
+    Returns:
+        Single commands to run in order
+    """
+    log = SessionLog()
+    for command in commands:
+        log.record(command)
+    return log.commands()
+
+
+class CommandCoalescer:
+    """
+    Buffer for visual commands that are sent to ChimeraX in one batch.
+
+    Commands are held for `window` seconds. A buffered command is dropped
+    when a later one with the same coalesce_key arrives, since ChimeraX
+    would overwrite its effect anyway. The buffer is flushed as a single
+    batch when the window expires or before any other command is sent.
+    """
+
+    def __init__(self, window: float, send_batch):
+        self.window = window
+        self._send_batch = send_batch
+        self._pending: List[tuple] = []
+        self._errors: List[str] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self.submitted = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    def submit(self, command: str) -> bool:
+        """
+        Buffer a command if it can be coalesced.
+
+        Returns:
+            True if the command was buffered, False if it must be sent now
+        """
+        key = coalesce_key(command)
+        if key is None:
+            return False
+
+        with self._lock:
+            kept = [(k, c) for k, c in self._pending if k != key]
+            self.dropped += len(self._pending) - len(kept)
+            self._pending = kept + [(key, command.strip())]
+            self.submitted += 1
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return True
+
+    def flush(self) -> None:
+        """Send all buffered commands as one batch."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not pending:
+                return
+
+            self.flushes += 1
+            try:
+                results = self._send_batch([c for _, c in pending])
+            except ChimeraXError as e:
+                errors = [f"Deferred commands failed: {str(e)}"]
+            else:
+                errors = [
+                    f"Deferred command '{r['command']}' failed: {r['output']}"
+                    for r in results if r["status"] == "error"
+                ]
+            with self._lock:
+                self._errors.extend(errors)
+
+    def take_errors(self) -> List[str]:
+        """Return and clear errors from earlier flushes."""
+        with self._lock:
+            errors, self._errors = self._errors, []
+        return errors
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "window": self.window,
+                "pending": len(self._pending),
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "flushes": self.flushes,
+            }
+
+
+def endpoint_url(endpoint: Any) -> str:
+    """Turn a configured endpoint (port number or URL) into a base URL."""
+    if isinstance(endpoint, int) or str(endpoint).isdigit():
+        return f"http://127.0.0.1:{endpoint}"
+    return str(endpoint).rstrip("/")
+
+
+class ChimeraXInstance:
+    """One ChimeraX endpoint in the instance pool."""
+
+    def __init__(self, client: ChimeraXClient, role: str):
+        self.client = client
+        self.role = role
+        self.busy = False
+        self.jobs_completed = 0
+
+    @property
+    def url(self) -> str:
+        return self.client.base_url
+
+
+class InstancePool:
+    """
+    Pool of ChimeraX instances.
+
+    The first instance holds the interactive session: all regular tool
+    commands are pinned to it so the scene the user works with stays in one
+    place. Independent jobs run on the remaining worker instances, one job
+    per instance at a time, on whichever is idle. With a single endpoint
+    jobs share the session instance.
+    """
+
+    def __init__(self, clients: List[ChimeraXClient]):
+        self.instances = [
+            ChimeraXInstance(client, "session" if i == 0 else "worker")
+            for i, client in enumerate(clients)
+        ]
+        self._condition = threading.Condition()
+        self._waiting = 0
+        # (loop, future) of acquire_async callers waiting for an instance
+        self._async_waiters: List[tuple] = []
+
+    @property
+    def session(self) -> ChimeraXInstance:
+        return self.instances[0]
+
+    @property
+    def workers(self) -> List[ChimeraXInstance]:
+        return self.instances[1:] or self.instances[:1]
+
+    @contextmanager
+    def acquire(self):
+        """
+        Reserve an idle worker instance for a job, waiting if all are busy.
+
+        Yields:
+            ChimeraXInstance reserved for the caller
+        """
+        with self._condition:
+            self._waiting += 1
+            try:
+                while not any(not i.busy for i in self.workers):
+                    self._condition.wait()
+            finally:
+                self._waiting -= 1
+            instance = self._reserve()
+
+        try:
+            yield instance
+        finally:
+            self._release(instance)
+
+    @asynccontextmanager
+    async def acquire_async(self):
+        """
+        Reserve an idle worker instance for a job without blocking a thread.
+
+        Queued jobs wait on the event loop instead of holding executor
+        threads, so tools on the session instance always find a free thread.
+
+        Yields:
+            ChimeraXInstance reserved for the caller
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if any(not i.busy for i in self.workers):
+                    instance = self._reserve()
+                    break
+                waiter = (loop, loop.create_future())
+                self._async_waiters.append(waiter)
+                self._waiting += 1
+            try:
+                await waiter[1]
+            finally:
+                with self._condition:
+                    self._waiting -= 1
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+
+        try:
+            yield instance
+        finally:
+            self._release(instance)
+
+    def _reserve(self) -> ChimeraXInstance:
+        # Prefer instances that are reachable, then the least loaded
+        instance = min(
+            (i for i in self.workers if not i.busy),
+            key=lambda i: (i.client.breaker.is_open, i.client.in_flight)
+        )
+        instance.busy = True
+        return instance
+
+    def _release(self, instance: ChimeraXInstance) -> None:
+        with self._condition:
+            instance.busy = False
+            instance.jobs_completed += 1
+            self._condition.notify()
+            waiters, self._async_waiters = self._async_waiters, []
+        # Waiters re-check for an idle instance; those that lose go back to waiting
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(
+                lambda f=future: f.done() or f.set_result(None)
+            )
+
+    def is_idle(self) -> bool:
+        """True if no job holds or waits for an instance and no request is open."""
+        with self._condition:
+            return not self._waiting and not any(
+                i.busy or i.client.in_flight for i in self.instances
+            )
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get per-instance load.
+
+        Returns:
+            Dictionary with the number of waiting jobs and, per instance,
+            its role, whether it is running a job and its open requests
+        """
+        with self._condition:
+            return {
+                "jobs_waiting": self._waiting,
+                "instances": [
+                    {
+                        "url": i.url,
+                        "role": i.role,
+                        "busy": i.busy,
+                        "reachable": not i.client.breaker.is_open,
+                        "queue_depth": i.client.in_flight,
+                        "jobs_completed": i.jobs_completed,
+                    }
+                    for i in self.instances
+                ],
+            }
+
+
+_pool: Optional[InstancePool] = None
+_coalescer: Optional[CommandCoalescer] = None
+_pool_config: Dict[str, Any] = {}  # Configuration _pool was built from
+_executor: Optional[ThreadPoolExecutor] = None
+_client_lock = threading.Lock()
+# Held for a whole apply_config, so concurrent reloads do not both build
+# on the same old pool
+_reload_lock = threading.Lock()
+
+
+# One journal per file, shared by every pool built for it, so the sequence
+# numbers of a rebuilt pool carry on from the old one's
+_journals: Dict[Path, CommandJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(config: Dict[str, Any]) -> Optional[CommandJournal]:
+    """
+    Get the command journal for a configuration.
+
+    Returns:
+        CommandJournal for the configured file, or None if journaling is off
+    """
+    if not config["journal"]:
+        return None
+    path = Path(
+        config["journal_file"] or Path.home() / ".chimerax_mcp" / "journal.jsonl"
+    ).expanduser()
+    max_bytes = int(float(config["journal_max_mb"]) * 1024 * 1024)
+    with _journals_lock:
+        journal = _journals.get(path)
+        if journal is None:
+            journal = _journals[path] = CommandJournal(path, max_bytes)
+        journal.max_bytes = max_bytes
+        return journal
+
+
+def build_pool(config: Dict[str, Any], session_url: str,
+               session_log: Optional[SessionLog] = None) -> tuple:
+    """
+    Build the instance pool and command coalescer for a configuration.
+
+    Args:
+        config: Configuration from load_config()
+        session_url: URL of the session instance
+        session_log: Command log to keep for the session instance (default: a new one)
+
+    Returns:
+        (InstancePool, CommandCoalescer or None)
+    """
+    coalescer = None
+    if float(config["coalesce_window"]) > 0:
+        coalescer = CommandCoalescer(
+            float(config["coalesce_window"]),
+            lambda commands: get_client().execute_batch(commands, stop_on_error=False)
+        )
+
+    journal = get_journal(config)
+
+    urls = [session_url.rstrip("/")]
+    for endpoint in config["endpoints"]:
+        if endpoint_url(endpoint) not in urls:
+            urls.append(endpoint_url(endpoint))
+
+    pool = InstancePool([
+        ChimeraXClient(
+            url,
+            pool_size=int(config["pool_size"]),
+            connect_timeout=float(config["connect_timeout"]),
+            read_timeout=float(config["read_timeout"]),
+            cache=ResultCache(int(config["cache_size"]), float(config["cache_ttl"])),
+            timeouts=TimeoutPolicy(
+                float(config["read_timeout"]),
+                dict(DEFAULT_CONFIG["verb_timeouts"], **config["verb_timeouts"]),
+                bool(config["adaptive_timeouts"]),
+                float(config["adaptive_timeout_factor"]),
+                float(config["adaptive_min_timeout"]),
+                float(config["adaptive_max_timeout"])
+            ),
+            retries=int(config["retry_attempts"]),
+            retry_backoff=float(config["retry_backoff"]),
+            breaker_threshold=int(config["breaker_threshold"]),
+            probe_interval=float(config["breaker_probe_interval"]),
+            session_log=(
+                session_log if session_log is not None else SessionLog()
+            ) if url == urls[0] else None,
+            journal=journal
+        )
+        for url in urls
+    ])
+    return pool, coalescer
+
+
+def get_pool() -> InstancePool:
+    """
+    Get the ChimeraX instance pool, creating it on first use.
+
+    The session instance is CHIMERAX_URL; any `endpoints` from
+    chimerax_mcp_config.json are added as worker instances.
+
+    Returns:
+        InstancePool configured from chimerax_mcp_config.json
+    """
+    global _pool, _coalescer, _pool_config, CHIMERAX_URL
+    with _client_lock:
+        if _pool is None:
+            config = load_config()
+            if CHIMERAX_URL is None:
+                CHIMERAX_URL = get_chimerax_url()
+            server_metrics.trace_file = config["trace_file"]
+            _pool, _coalescer = build_pool(config, CHIMERAX_URL)
+            _pool_config = config
+        return _pool
+
+
+def get_client() -> ChimeraXClient:
+    """
+    Get the client for the session instance, creating it on first use.
+
+    Returns:
+        ChimeraXClient configured from chimerax_mcp_config.json
+    """
+    return get_pool().session.client
+
+
+def get_scene() -> SceneModel:
+    """
+    Get the scene model of the session instance.
+
+    Starts the periodic sync thread on first use unless scene_sync_interval is 0.
+
+    Returns:
+        SceneModel shadowing the models open in the session instance
+    """
+    scene = get_client().scene
+    scene.start_sync(float(load_config()["scene_sync_interval"]))
+    return scene
+
+
+def get_coalescer() -> Optional[CommandCoalescer]:
+    """
+    Get the visual command coalescer.
+
+    Returns:
+        CommandCoalescer, or None if coalesce_window is 0
+    """
+    get_client()
+    return _coalescer
+
+
+def flush_pending_commands() -> None:
+    """Send any visual commands still held by the coalescer."""
+    coalescer = get_coalescer()
+    if coalescer is not None:
+        coalescer.flush()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Get the thread pool used to run blocking ChimeraX requests.
+
+    The pool has one worker per pooled connection across all ChimeraX
+    instances, so async tools can keep that many commands in flight
+    without blocking the event loop.
+
+    Returns:
+        ThreadPoolExecutor sized to the client connection pools
+    """
+    global _executor
+    pool = get_pool()
+    with _client_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=sum(i.client.pool_size for i in pool.instances),
+                thread_name_prefix="chimerax"
+            )
+        return _executor
+
+
+# Where ChimeraX is usually installed, checked when chimerax_path is empty
+CHIMERAX_CANDIDATES = [
+    r"C:\Program Files\ChimeraX\bin\ChimeraX.exe",
+    r"C:\Program Files (x86)\ChimeraX\bin\ChimeraX.exe",
+    r"%LOCALAPPDATA%\UCSF ChimeraX\bin\ChimeraX.exe",
+    r"C:\Program Files\UCSF ChimeraX\bin\ChimeraX.exe",
+    "/Applications/ChimeraX.app/Contents/MacOS/ChimeraX",
+    "/usr/bin/chimerax",
+]
+
+
+def find_chimerax_executable(configured: str = "") -> Optional[str]:
+    """
+    Locate the ChimeraX executable.
+
+    Args:
+        configured: chimerax_path setting; used as is when not empty
+
+    Returns:
+        Path of the executable, or None if it cannot be found
+    """
+    if configured:
+        return configured
+    for name in ("ChimeraX", "chimerax"):
+        found = shutil.which(name)
+        if found:
+            return found
+    for candidate in CHIMERAX_CANDIDATES:
+        path = os.path.expandvars(candidate)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+class ChimeraXSupervisor:
+    """
+    Runs ChimeraX with the REST server enabled and keeps it answering.
+
+    ChimeraX is launched with `--cmd "remotecontrol rest start port N"` on
+    the session port, unless something already answers there. A daemon
+    thread checks it every `interval` seconds with `version`. If the process
+    exits, or `failures` checks in a row fail, the session client fails
+    over to the standby instance when there is one. Otherwise ChimeraX is
+    restarted on the same port. The scene is lost either way, so the client's
+    cache and scene model are reset.
+
+    With a standby port a second ChimeraX is kept started and idle, so a
+    failover costs no startup time; a fresh standby is then launched on
+    the old port.
+    """
+
+    def __init__(self, client: ChimeraXClient, executable: str, port: int,
+                 standby_port: int = 0, args: Optional[List[str]] = None,
+                 interval: float = DEFAULT_CONFIG["health_check_interval"],
+                 failures: int = DEFAULT_CONFIG["health_check_failures"],
+                 startup_timeout: float = DEFAULT_CONFIG["startup_timeout"]):
+        self.client = client
+        self.executable = executable
+        self.args = list(args or [])
+        self.active_port = port
+        self.standby_port = standby_port
+        self.interval = interval
+        self.failures = failures
+        self.startup_timeout = startup_timeout
+        self.processes: Dict[int, Any] = {}
+        self.restarts = 0
+        self.failovers = 0
+        self.last_failure: Optional[str] = None
+        # Called once a fresh ChimeraX has replaced the failed one
+        self.on_recover = None
+        self.last_recover_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def url(port: int) -> str:
+        return f"http://127.0.0.1:{port}"
+
+    def command(self, port: int) -> List[str]:
+        """Command line launching ChimeraX with the REST server on port."""
+        return [self.executable, *self.args, "--cmd", f"remotecontrol rest start port {port}"]
+
+    def is_healthy(self, port: int) -> bool:
+        """True if ChimeraX on port answers `version` in time."""
+        try:
+            response = _requests().get(
+                f"{self.url(port)}/run?command=version",
+                timeout=(self.client.connect_timeout, min(max(self.interval, 1.0), 5.0))
+            )
+            return response.ok
+        except _requests().exceptions.RequestException:
+            return False
+
+    def _alive(self, port: int) -> bool:
+        process = self.processes.get(port)
+        return process is None or process.poll() is None
+
+    def launch(self, port: int) -> bool:
+        """
+        Start ChimeraX on port and wait until it answers.
+
+        Returns:
+            True if it answered within startup_timeout
+        """
+        process = subprocess.Popen(
+            self.command(port), stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        with self._lock:
+            self.processes[port] = process
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline and not self._stop.is_set():
+            if process.poll() is not None:
+                return False
+            if self.is_healthy(port):
+                return True
+            time.sleep(0.1)
+        return False
+
+    def terminate(self, port: int) -> None:
+        """Stop the ChimeraX this supervisor started on port, if any."""
+        with self._lock:
+            process = self.processes.pop(port, None)
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def start(self) -> None:
+        """Bring ChimeraX up and start health checks on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        # Adopt a ChimeraX that is already running on the session port
+        if not self.is_healthy(self.active_port):
+            self.launch(self.active_port)
+        if self.standby_port:
+            self.launch(self.standby_port)
+
+        failed = 0
+        while not self._stop.wait(self.interval):
+            if self._alive(self.active_port) and self.is_healthy(self.active_port):
+                failed = 0
+            else:
+                failed += 1
+                if not self._alive(self.active_port) or failed >= self.failures:
+                    self.recover()
+                    failed = 0
+            if (self.standby_port and not self._stop.is_set()
+                    and not self._alive(self.standby_port)):
+                self.launch(self.standby_port)
+
+    def recover(self) -> None:
+        """Replace the session ChimeraX: fail over to the standby or restart."""
+        failed_port = self.active_port
+        self.last_failure = time.strftime("%Y-%m-%dT%H:%M:%S")
+        if self.standby_port and self._alive(self.standby_port) \
+                and self.is_healthy(self.standby_port):
+            self.active_port, self.standby_port = self.standby_port, failed_port
+            self._switch_client()
+            self.failovers += 1
+            self._recovered()
+            self.terminate(failed_port)
+            self.launch(failed_port)
+        else:
+            self.terminate(failed_port)
+            if not self.launch(failed_port):
+                # Tried again on the next health check
+                self.last_recover_error = f"ChimeraX did not start on port {failed_port}"
+                return
+            self._switch_client()
+            self.restarts += 1
+            self._recovered()
+
+    def _switch_client(self) -> None:
+        self.client.retarget(self.url(self.active_port))
+
+    def _recovered(self) -> None:
+        if self.on_recover is None:
+            return
+        try:
+            self.on_recover()
+            self.last_recover_error = None
+        except ChimeraXError as e:
+            self.last_recover_error = str(e)
+
+    def stop(self) -> None:
+        """Stop health checks and the ChimeraX processes started here."""
+        self._stop.set()
+        for port in list(self.processes):
+            self.terminate(port)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "executable": self.executable,
+            "active_url": self.url(self.active_port),
+            "active_managed": self.active_port in self.processes,
+            "standby_url": self.url(self.standby_port) if self.standby_port else None,
+            "standby_ready": bool(self.standby_port) and self.standby_port in self.processes
+            and self._alive(self.standby_port),
+            "restarts": self.restarts,
+            "failovers": self.failovers,
+            "last_failure": self.last_failure,
+            "last_recover_error": self.last_recover_error,
+        }
+
+
+_supervisor: Optional[ChimeraXSupervisor] = None
+
+
+def get_supervisor() -> Optional[ChimeraXSupervisor]:
+    """
+    Get the ChimeraX supervisor, creating it on first use.
+
+    Returns:
+        ChimeraXSupervisor, or None unless auto_start_chimerax is set, the
+        session instance is on this machine and ChimeraX can be found
+    """
+    global _supervisor
+    client = get_client()
+    with _client_lock:
+        if _supervisor is None:
+            config = load_config()
+            parsed = urlparse(client.base_url)
+            executable = find_chimerax_executable(config["chimerax_path"])
+            if (not config["auto_start_chimerax"] or executable is None
+                    or parsed.hostname not in ("127.0.0.1", "localhost")):
+                return None
+            _supervisor = ChimeraXSupervisor(
+                client, executable, parsed.port or 80,
+                standby_port=int(config["standby_port"]),
+                args=config["chimerax_args"],
+                interval=float(config["health_check_interval"]),
+                failures=int(config["health_check_failures"]),
+                startup_timeout=float(config["startup_timeout"])
+            )
+        return _supervisor
+
+
+class SessionCheckpointer:
+    """
+    Periodic ChimeraX session checkpoints for fast recovery.
+
+    A checkpoint is a ChimeraX session file saved in a managed directory,
+    after which the client's SessionLog only holds the commands sent since.
+    restore() opens the latest checkpoint and replays that tail, so recovery
+    time is bounded by the checkpoint interval rather than by how long the
+    session has run. A checkpoint is taken every `interval` seconds if the
+    scene changed, or as soon as `max_commands` changes have been logged.
+    """
+
+    def __init__(self, client: ChimeraXClient, directory: Path,
+                 interval: float = DEFAULT_CONFIG["checkpoint_interval"],
+                 max_commands: int = DEFAULT_CONFIG["checkpoint_max_commands"],
+                 keep: int = 2):
+        self.client = client
+        self.log = client.session_log
+        self.directory = directory
+        self.interval = interval
+        self.max_commands = max_commands
+        self.keep = keep
+        self.latest: Optional[Dict[str, Any]] = None
+        self.checkpoints = 0
+        self.restores = 0
+        self.last_error: Optional[str] = None
+        self._files: deque = deque()
+        self._started = time.time()
+        self._lock = threading.Lock()  # One checkpoint or restore at a time
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """
+        Save the ChimeraX session and clear the command log it covers.
+
+        Returns:
+            Dictionary with the checkpoint 'path' and 'created' time
+
+        Raises:
+            ChimeraXError: If ChimeraX cannot save the session
+        """
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / (
+                f"checkpoint-{time.strftime('%Y%m%d-%H%M%S')}-{self.checkpoints}.cxs"
+            )
+            # Commands racing the save stay in the log and are replayed on
+            # top of the checkpoint, which repeats at most a few of them
+            mark = self.log.mark()
+            self.client.execute(f"save {quote_path(str(path))}", journal=False)
+            self.log.trim(mark)
+
+            self.latest = {"path": str(path), "created": time.time()}
+            self.checkpoints += 1
+            self._files.append(path)
+            while len(self._files) > self.keep:
+                old = self._files.popleft()
+                if old.exists():
+                    old.unlink()
+            return dict(self.latest)
+
+    def restore(self) -> Dict[str, Any]:
+        """
+        Rebuild the scene from the latest checkpoint and the command log.
+
+        Without a checkpoint the session is closed and the whole log is
+        replayed.
+
+        Returns:
+            Dictionary with the checkpoint used, how many commands were
+            replayed, the replay errors and the seconds taken
+
+        Raises:
+            ChimeraXError: If ChimeraX cannot be reached or cannot open the
+                checkpoint
+        """
+        with self._lock:
+            start = time.perf_counter()
+            tail = self.log.commands()
+            with self.log.suspended():
+                if self.latest is not None:
+                    self.client.execute(f"open {quote_path(self.latest['path'])}", journal=False)
+                else:
+                    self.client.execute("close session", journal=False)
+                results = self.client.execute_batch(
+                    tail, stop_on_error=False, journal=False
+                ) if tail else []
+            self.restores += 1
+            return {
+                "checkpoint": self.latest["path"] if self.latest else None,
+                "checkpoint_age": round(time.time() - self.latest["created"], 1)
+                if self.latest else None,
+                "replayed": len(tail),
+                "errors": [r for r in results if r["status"] == "error"],
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+
+    def due(self) -> bool:
+        """Whether the scene changed enough to take a periodic checkpoint."""
+        pending = len(self.log)
+        if self.interval <= 0 or not pending or self.client.breaker.is_open:
+            return False
+        since = self.latest["created"] if self.latest else self._started
+        return pending >= self.max_commands or time.time() - since >= self.interval
+
+    def start(self) -> None:
+        """Start periodic checkpoints unless the interval is 0."""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        # The interval may be changed by reload_config while this runs
+        while not self._stop.wait(min(self.interval, 1.0) if self.interval > 0 else 1.0):
+            if not self.due():
+                continue
+            try:
+                self.checkpoint()
+                self.last_error = None
+            except ChimeraXError as e:
+                self.last_error = str(e)
+
+    def stop(self) -> None:
+        """Stop periodic checkpoints."""
+        self._stop.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "interval": self.interval,
+            "latest": self.latest["path"] if self.latest else None,
+            "latest_age": round(time.time() - self.latest["created"], 1)
+            if self.latest else None,
+            "commands_since": len(self.log),
+            "checkpoints": self.checkpoints,
+            "restores": self.restores,
+            "last_error": self.last_error,
+        }
+
+
+_checkpointer: Optional[SessionCheckpointer] = None
+
+
+def get_checkpointer() -> Optional[SessionCheckpointer]:
+    """
+    Get the session checkpointer, creating it on first use.
+
+    Starts periodic checkpoints unless checkpoint_interval is 0.
+
+    Returns:
+        SessionCheckpointer, or None if the session instance keeps no
+        command log or ChimeraX does not run on this machine
+    """
+    global _checkpointer
+    client = get_client()
+    with _client_lock:
+        if _checkpointer is not None and _checkpointer.client is not client:
+            if client.session_log is not None and client.session_log is _checkpointer.log:
+                # Pool rebuilt by reload_config for the same ChimeraX
+                _checkpointer.client = client
+            else:
+                _checkpointer.stop()
+                _checkpointer = None
+        if _checkpointer is None:
+            config = load_config()
+            if (client.session_log is None
+                    or urlparse(client.base_url).hostname not in ("127.0.0.1", "localhost")):
+                return None
+            directory = config["checkpoint_dir"] or Path.home() / ".chimerax_mcp" / "checkpoints"
+            _checkpointer = SessionCheckpointer(
+                client, Path(directory),
+                float(config["checkpoint_interval"]),
+                int(config["checkpoint_max_commands"])
+            )
+            _checkpointer.start()
+        return _checkpointer
+
+
+# Settings the pool and its clients are built from; a change to any of
+# them makes apply_config build a new pool
+POOL_SETTINGS = {
+    "port", "pool_size", "connect_timeout", "read_timeout", "cache_size", "cache_ttl",
+    "coalesce_window", "endpoints", "trace_file", "verb_timeouts", "adaptive_timeouts",
+    "adaptive_timeout_factor", "adaptive_min_timeout", "adaptive_max_timeout",
+    "retry_attempts", "retry_backoff", "breaker_threshold", "breaker_probe_interval",
+    "scene_sync_interval", "journal", "journal_file", "journal_max_mb",
+}
+
+# Settings only read when the server starts
+RESTART_SETTINGS = {"auto_start_chimerax", "chimerax_path", "chimerax_args", "standby_port"}
+
+
+def _retire_pool(pool: InstancePool, executor: Optional[ThreadPoolExecutor],
+                 timeout: float) -> None:
+    """Close a replaced pool once the requests and jobs using it have finished."""
+    if executor is not None:
+        # Calls already queued still run, on the old clients
+        executor.shutdown(wait=True)
+    deadline = time.monotonic() + timeout
+    while not pool.is_idle() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    for instance in pool.instances:
+        instance.client.close()
+
+
+def apply_config() -> Dict[str, Any]:
+    """
+    Apply changes to chimerax_mcp_config.json and CHIMERAX_URL without a restart.
+
+    If the session URL or a setting in POOL_SETTINGS changed, a new pool,
+    coalescer and executor are built and used from the next tool call on.
+    Requests and jobs already running finish on the old clients, which are
+    closed once idle. The session command log carries over when the session
+    URL is unchanged. Structure cache, output store, checkpoint and health
+    check settings are applied in place; the rest are read on each use.
+    Concurrent calls run one after the other.
+
+    Returns:
+        Dictionary with the 'changed' settings, the 'session_url', what was
+        'rebuilt' and the settings that need a restart ('restart_required')
+
+    Raises:
+        ValueError: If the config file cannot be read
+    """
+    global _pool, _coalescer, _pool_config, _executor, CHIMERAX_URL
+    global _structure_cache, _prefetcher
+    with _reload_lock:
+        check_config_file()
+        config = load_config()
+        with _client_lock:
+            old_pool, old_coalescer, old_config = _pool, _coalescer, _pool_config
+            if old_pool is None:
+                # Nothing is built yet, so first use picks up the new settings
+                CHIMERAX_URL = None
+                return {"changed": [], "session_url": None, "rebuilt": [], "restart_required": []}
+
+        changed = sorted(key for key in config if config[key] != old_config.get(key))
+        restart_required = [key for key in changed if key in RESTART_SETTINGS]
+        rebuilt = []
+        old_session = old_pool.session.client
+        url = get_chimerax_url().rstrip("/")
+        supervisor = _supervisor
+        if supervisor is not None:
+            # The supervisor decides which port the session ChimeraX is on
+            if url != CHIMERAX_URL.rstrip("/"):
+                restart_required.append("port")
+            url = old_session.base_url
+
+        if url != old_session.base_url or any(key in POOL_SETTINGS for key in changed):
+            if old_coalescer is not None:
+                old_coalescer.flush()
+            same_instance = url == old_session.base_url
+            server_metrics.trace_file = config["trace_file"]
+            pool, coalescer = build_pool(
+                config, url, old_session.session_log if same_instance else None
+            )
+            with _client_lock:
+                _pool, _coalescer, _pool_config = pool, coalescer, config
+                if supervisor is None:
+                    CHIMERAX_URL = url
+                old_executor, _executor = _executor, None
+            if supervisor is not None:
+                supervisor.client = pool.session.client
+            threading.Thread(
+                target=_retire_pool, args=(old_pool, old_executor, float(config["job_timeout"])),
+                daemon=True
+            ).start()
+            rebuilt.append("pool")
+        else:
+            with _client_lock:
+                _pool_config = config
+
+        with _output_store_lock:
+            if _output_store is not None:
+                _output_store.max_chars = int(config["output_store_chars"])
+            if any(key in changed for key in ("structure_cache_dir", "structure_cache_mb",
+                                              "archive_urls")):
+                if _structure_cache is not None:
+                    rebuilt.append("structure_cache")
+                _structure_cache = None
+            if any(key in changed for key in ("prefetch_concurrency", "job_timeout")):
+                _prefetcher = None
+
+        checkpointer = get_checkpointer() if _checkpointer is not None else None
+        if checkpointer is not None:
+            checkpointer.interval = float(config["checkpoint_interval"])
+            checkpointer.max_commands = int(config["checkpoint_max_commands"])
+            checkpointer.directory = Path(
+                config["checkpoint_dir"] or Path.home() / ".chimerax_mcp" / "checkpoints"
+            )
+            checkpointer.start()
+
+        if supervisor is not None:
+            supervisor.interval = float(config["health_check_interval"])
+            supervisor.failures = int(config["health_check_failures"])
+            supervisor.startup_timeout = float(config["startup_timeout"])
+            supervisor.on_recover = checkpointer.restore if (
+                checkpointer is not None and config["restore_after_restart"]
+            ) else None
+
+        return {
+            "changed": changed,
+            "session_url": get_client().base_url,
+            "rebuilt": rebuilt,
+            "restart_required": restart_required,
+        }
+
+
+class ConfigWatcher:
+    """
+    Applies chimerax_mcp_config.json whenever it changes.
+
+    The file's modification time and size are checked every `interval`
+    seconds. A file that cannot be read, such as one saved halfway, is not
+    applied; it is checked again on the next round.
+    """
+
+    def __init__(self, path: Path, interval: float = DEFAULT_CONFIG["config_watch_interval"],
+                 apply=None):
+        self.path = path
+        self.interval = interval
+        self.apply = apply if apply is not None else apply_config
+        self.reloads = 0
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self._stamp = self._read_stamp()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _read_stamp(self) -> Optional[tuple]:
+        try:
+            stat = self.path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def check(self) -> bool:
+        """Apply the config file if it changed; returns whether it was applied."""
+        stamp = self._read_stamp()
+        if stamp == self._stamp:
+            return False
+        try:
+            self.last_result = self.apply()
+        except Exception as e:
+            # Keep watching; a fixed file is applied on a later round
+            self.last_error = str(e) if isinstance(e, ValueError) else f"{type(e).__name__}: {e}"
+            return False
+        self._stamp = stamp
+        self.reloads += 1
+        self.last_error = None
+        return True
+
+    def start(self) -> None:
+        """Start watching unless the interval is 0."""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stop.set()
+
+
+def execute_chimerax_command(command: str, read_timeout: Optional[float] = None) -> str:
+    """
+    Execute a command in ChimeraX via REST API.
+
+    When command coalescing is enabled, visual commands are buffered and
+    this returns an empty string; buffered commands are flushed before any
+    other command is sent.
+
+    Args:
+        command: ChimeraX command to execute
+        read_timeout: Seconds to wait for the result (default: read_timeout setting)
+
+    Returns:
+        Response text from ChimeraX
+
+    Raises:
+        ChimeraXError: If command execution fails
+    """
+    client = get_client()
+    coalescer = get_coalescer()
+    if coalescer is None:
+        return client.execute(command, read_timeout)
+
+    if coalescer.submit(command):
+        return ""
+
+    coalescer.flush()
+    result = client.execute(command, read_timeout)
+    errors = coalescer.take_errors()
+    return "\n".join(errors + [result]) if errors else result
+
+
+def execute_chimerax_commands(
+    commands: List[str],
+    stop_on_error: bool = True
+) -> List[Dict[str, str]]:
+    """
+    Execute several ChimeraX commands in a single REST request.
+
+    See ChimeraXClient.execute_batch for how commands are batched.
+
+    Args:
+        commands: ChimeraX commands to execute, in order
+        stop_on_error: Skip the remaining commands after the first failure
+
+    Returns:
+        One dict per command with 'command', 'status' ('ok', 'error' or
+        'skipped') and 'output'
+
+    Raises:
+        ChimeraXError: If ChimeraX cannot be reached
+    """
+    flush_pending_commands()
+    return get_client().execute_batch(commands, stop_on_error)
+
+
+def execute_job(
+    commands: List[str],
+    stop_on_error: bool = True,
+    cleanup: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Run an independent batch of commands on an idle ChimeraX instance.
+
+    Jobs do not touch the session instance unless it is the only one, so
+    they must not rely on models opened by earlier tool calls.
+
+    Args:
+        commands: ChimeraX commands to execute, in order
+        stop_on_error: Skip the remaining commands after the first failure
+        cleanup: Commands run afterwards on the same instance even if the
+                 job failed, e.g. closing the models it opened
+
+    Returns:
+        Dictionary with the instance URL and per-command results
+
+    Raises:
+        ChimeraXError: If the instance cannot be reached
+    """
+    with get_pool().acquire() as instance:
+        return run_job_on(instance, commands, stop_on_error, cleanup)
+
+
+def run_job_on(
+    instance: ChimeraXInstance,
+    commands: List[str],
+    stop_on_error: bool = True,
+    cleanup: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Run a job on an instance already reserved for it (see execute_job)."""
+    if instance is get_pool().session:
+        # The job shares the session instance, so visual commands the
+        # coalescer still holds must run before it
+        flush_pending_commands()
+    cleanup = cleanup or []
+    results = instance.client.execute_batch(commands + cleanup, stop_on_error)
+    skipped = [r["command"] for r in results[len(commands):] if r["status"] == "skipped"]
+    if skipped:
+        results[len(results) - len(skipped):] = instance.client.execute_batch(
+            skipped, stop_on_error=False
+        )
+    return {"instance": instance.url, "results": results}
+
+
+async def execute_chimerax_command_async(command: str) -> str:
+    """
+    Execute a command in ChimeraX without blocking the event loop.
+
+    Args:
+        command: ChimeraX command to execute
+
+    Returns:
+        Response text from ChimeraX
+
+    Raises:
+        ChimeraXError: If command execution fails
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), execute_chimerax_command, command)
+
+
+async def execute_chimerax_commands_async(
+    commands: List[str],
+    stop_on_error: bool = True
+) -> List[Dict[str, str]]:
+    """
+    Execute several ChimeraX commands in one request without blocking the event loop.
+
+    See execute_chimerax_commands for the batching behavior.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), execute_chimerax_commands, commands, stop_on_error
+    )
+
+
+async def execute_job_async(
+    commands: List[str],
+    stop_on_error: bool = True,
+    cleanup: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Run an independent job without blocking the event loop.
+
+    See execute_job for how instances are chosen. The job waits for an
+    instance on the event loop and only takes an executor thread once it
+    has one.
+    """
+    loop = asyncio.get_running_loop()
+    async with get_pool().acquire_async() as instance:
+        return await loop.run_in_executor(
+            get_executor(), run_job_on, instance, commands, stop_on_error, cleanup
+        )
+
+
+class BackgroundJob:
+    """A long-running operation the client polls instead of waiting on."""
+
+    def __init__(self, stage: str):
+        self.id = uuid.uuid4().hex[:8]
+        self.stage = stage
+        self.status = "running"
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.future = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished if self.finished is not None else time.monotonic()
+        info = {
+            "job_id": self.id,
+            "stage": self.stage,
+            "status": self.status,
+            "elapsed": round(end - self.started, 1),
+        }
+        if self.result is not None:
+            info["result"] = self.result
+        if self.error is not None:
+            info["error"] = self.error
+        return info
+
+
+class BackgroundJobManager:
+    """
+    Runs long operations on the worker threads and tracks them by job id.
+
+    Cancelling a job that already reached ChimeraX cannot stop ChimeraX
+    itself; the job is marked cancelled and its result is discarded.
+    Only the most recent `max_jobs` finished jobs are kept.
+    """
+
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, BackgroundJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, stage: str, func, *args) -> BackgroundJob:
+        """
+        Start func(*args) in the background.
+
+        func returns the job's result text; any exception fails the job.
+        """
+        job = BackgroundJob(stage)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = get_executor().submit(self._run, job, func, *args)
+        return job
+
+    def _run(self, job: BackgroundJob, func, *args) -> None:
+        try:
+            result = func(*args)
+        except Exception as e:
+            status, result, error = "failed", None, str(e)
+        else:
+            status, error = "done", None
+        with self._lock:
+            job.finished = time.monotonic()
+            if job.status == "cancelled":
+                return
+            job.status, job.result, job.error = status, result, error
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.status != "running"]
+        for job in finished[:max(len(self._jobs) - self.max_jobs, 0)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> Optional[BackgroundJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[BackgroundJob]:
+        """Cancel a running job; returns None for unknown ids."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == "running":
+                job.future.cancel()
+                job.status = "cancelled"
+                job.finished = time.monotonic()
+            return job
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [job.to_dict() for job in self._jobs.values()]
+
+
+background_jobs = BackgroundJobManager()
+
+
+async def run_long_command(
+    command: str,
+    stage: str,
+    describe,
+    background: bool = False,
+    ctx: Optional[Context] = None,
+    prepare=None
+) -> str:
+    """
+    Run a command that may take longer than the normal read timeout.
+
+    The command gets the job_timeout setting, or its verb timeout if longer. In
+    the foreground, progress notifications with the elapsed time are sent
+    every progress_interval seconds while ChimeraX works. In the background
+    a job handle is returned at once and the outcome is fetched later with
+    get_job_status.
+
+    Args:
+        command: ChimeraX command to execute
+        stage: Short description of the operation, shown in progress
+        describe: Function turning ChimeraX output into the tool's message
+        background: Return a job handle instead of waiting
+        ctx: MCP request context for progress notifications
+        prepare: Optional function run first on the worker thread, as part
+                 of the job, that returns the command to send instead
+
+    Returns:
+        The tool message, or a job handle message in background mode
+
+    Raises:
+        ChimeraXError: If command execution fails (foreground only)
+    """
+    config = load_config()
+    timeout = max(float(config["job_timeout"]), get_client().timeouts.for_command(command))
+
+    def work() -> str:
+        return execute_chimerax_command(prepare(command) if prepare else command, timeout)
+
+    if background:
+        job = background_jobs.submit(stage, lambda: describe(work()))
+        return (
+            f"Started background job {job.id} ({stage}). "
+            f"Check it with get_job_status('{job.id}')."
+        )
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_executor(), work)
+    start = time.monotonic()
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=float(config["progress_interval"]))
+        if done:
+            return describe(future.result())
+        if ctx is not None:
+            elapsed = time.monotonic() - start
+            await ctx.report_progress(elapsed, None, f"{stage}: {elapsed:.0f}s elapsed")
+
+
+# Atom as written by ChimeraX in hbonds/clashes files, e.g. "#1/A LYS 6 NZ"
+ATOM_PATTERN = r"(?:#[\d.]+)?/\S+\s+\S+\s+-?\d+[A-Za-z]?\s+\S+"
+HBOND_LINE = re.compile(
+    rf"^\s*({ATOM_PATTERN})\s+({ATOM_PATTERN})\s+({ATOM_PATTERN}|no hydrogen)"
+    r"\s+(-?[\d.]+)\s+(-?[\d.]+|N/A)\s*$"
+)
+CLASH_LINE = re.compile(
+    rf"^\s*({ATOM_PATTERN})\s+({ATOM_PATTERN})\s+(-?[\d.]+)\s+(-?[\d.]+)\s*$"
+)
+DISTANCE_LINE = re.compile(r"Distance between (.+?) and (.+?):\s*(-?[\d.]+)")
+
+
+def temp_output_path(suffix: str = ".txt") -> str:
+    """Create an empty temporary file for ChimeraX to write results into."""
+    fd, path = tempfile.mkstemp(prefix="chimerax_mcp_", suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def quote_path(path: str) -> str:
+    """Quote a file path for a ChimeraX command if it contains spaces."""
+    return f'"{path}"' if any(c.isspace() for c in path) else path
+
+
+def read_output_file(path: str, remove: bool) -> Optional[str]:
+    """
+    Read a results file written by ChimeraX.
+
+    Returns:
+        File contents, or None if it cannot be read (e.g. ChimeraX runs on
+        another machine)
+    """
+    try:
+        return Path(path).read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return None
+    finally:
+        if remove:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _normalize_atom(atom: str) -> str:
+    return " ".join(atom.split())
+
+
+def _distance_stats(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    return {
+        "min": round(min(values), 3),
+        "max": round(max(values), 3),
+        "mean": round(sum(values) / len(values), 3),
+    }
+
+
+def parse_hbonds(log: str, file_text: Optional[str], limit: int = 50) -> Dict[str, Any]:
+    """
+    Turn `hbonds` output into a compact summary.
+
+    Args:
+        log: Log text returned by the hbonds command
+        file_text: Contents of its saveFile output, if available
+        limit: Maximum number of H-bonds listed (shortest first)
+
+    Returns:
+        Dictionary with the H-bond count, donor-acceptor distance stats and
+        the listed H-bonds
+    """
+    hbonds = []
+    for line in (file_text or "").splitlines():
+        match = HBOND_LINE.match(line)
+        if match:
+            donor, acceptor, hydrogen, da, dha = match.groups()
+            hbonds.append({
+                "donor": _normalize_atom(donor),
+                "acceptor": _normalize_atom(acceptor),
+                "hydrogen": None if hydrogen == "no hydrogen" else _normalize_atom(hydrogen),
+                "distance": float(da),
+                "dha_distance": None if dha == "N/A" else float(dha),
+            })
+
+    if file_text is None:
+        found = re.search(r"(\d+)\s+(?:hydrogen bonds|H-bonds)", log, re.IGNORECASE)
+        return {
+            "count": int(found.group(1)) if found else None,
+            "log": budget_output(log),
+        }
+
+    hbonds.sort(key=lambda h: h["distance"])
+    return {
+        "count": len(hbonds),
+        "distance": _distance_stats([h["distance"] for h in hbonds]),
+        "listed": min(len(hbonds), limit),
+        "hbonds": hbonds[:limit],
+    }
+
+
+def parse_clashes(log: str, file_text: Optional[str], limit: int = 50) -> Dict[str, Any]:
+    """
+    Turn `clashes` output into a compact summary.
+
+    Args:
+        log: Log text returned by the clashes command
+        file_text: Contents of its saveFile output, if available
+        limit: Maximum number of clashes listed (worst overlap first)
+
+    Returns:
+        Dictionary with the clash count, overlap and distance stats and the
+        listed clashes
+    """
+    clashes = []
+    for line in (file_text or "").splitlines():
+        match = CLASH_LINE.match(line)
+        if match:
+            atom1, atom2, overlap, distance = match.groups()
+            clashes.append({
+                "atom1": _normalize_atom(atom1),
+                "atom2": _normalize_atom(atom2),
+                "overlap": float(overlap),
+                "distance": float(distance),
+            })
+
+    if file_text is None:
+        found = re.search(r"(\d+)\s+clash", log, re.IGNORECASE)
+        return {
+            "count": int(found.group(1)) if found else None,
+            "log": budget_output(log),
+        }
+
+    clashes.sort(key=lambda c: -c["overlap"])
+    return {
+        "count": len(clashes),
+        "overlap": _distance_stats([c["overlap"] for c in clashes]),
+        "distance": _distance_stats([c["distance"] for c in clashes]),
+        "listed": min(len(clashes), limit),
+        "clashes": clashes[:limit],
+    }
+
+
+def parse_distance(log: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract the measured distance from `distance` command output.
+
+    Returns:
+        Dictionary with both atoms and the distance in angstroms, or None
+        if the output does not contain a distance
+    """
+    match = DISTANCE_LINE.search(log)
+    if not match:
+        return None
+    return {
+        "atom1": match.group(1).strip(),
+        "atom2": match.group(2).strip(),
+        "distance": float(match.group(3)),
+    }
+
+
+class OutputStore:
+    """
+    Server-side store for tool output too large to return in one response.
+
+    Outputs are kept under a short handle until the total stored size
+    exceeds max_chars, then the least recently used outputs are evicted.
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_CONFIG["output_store_chars"]):
+        self.max_chars = max_chars
+        self._outputs: "OrderedDict[str, str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, text: str) -> str:
+        """Store text and return its handle."""
+        handle = uuid.uuid4().hex[:10]
+        with self._lock:
+            self._outputs[handle] = text
+            self._size += len(text)
+            while self._size > self.max_chars and len(self._outputs) > 1:
+                _, evicted = self._outputs.popitem(last=False)
+                self._size -= len(evicted)
+        return handle
+
+    def get(self, handle: str) -> Optional[str]:
+        with self._lock:
+            text = self._outputs.get(handle)
+            if text is not None:
+                self._outputs.move_to_end(handle)
+            return text
+
+
+def normalize_structure_id(source: str, identifier: str) -> str:
+    """Normalize an archive identifier (PDB ids lowercase, EMDB ids numeric)."""
+    identifier = identifier.strip()
+    if source == "pdb":
+        return identifier.lower()
+    if source == "emdb":
+        return re.sub(r"^emd[-_]?", "", identifier, flags=re.IGNORECASE)
+    return identifier.upper()
+
+
+class StructureCache:
+    """
+    Content-addressed on-disk cache of structure files.
+
+    Downloaded files are stored once under objects/<sha256><suffix>;
+    index.json maps "source:id" keys to them with their last use time.
+    When the total size exceeds max_bytes, the least recently used entries
+    are evicted. Concurrent requests for the same entry share one download.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int,
+                 url_overrides: Optional[Dict[str, str]] = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.url_overrides = dict(url_overrides or {})
+        self._objects = self.directory / "objects"
+        self._index_file = self.directory / "index.json"
+        self._lock = threading.Lock()
+        self._downloads: Dict[str, threading.Event] = {}
+        self.hits = 0
+        self.misses = 0
+        self.downloads = 0
+        self.evictions = 0
+
+        self._objects.mkdir(parents=True, exist_ok=True)
+        try:
+            self._index: Dict[str, Dict[str, Any]] = json.loads(self._index_file.read_text())
+        except (OSError, ValueError):
+            self._index = {}
+
+    @staticmethod
+    def key(source: str, identifier: str) -> str:
+        return f"{source}:{normalize_structure_id(source, identifier)}"
+
+    def url(self, source: str, identifier: str) -> str:
+        template = self.url_overrides.get(source, ARCHIVE_SOURCES[source]["url"])
+        return template.format(id=normalize_structure_id(source, identifier))
+
+    def _path(self, entry: Dict[str, Any]) -> Path:
+        return self._objects / f"{entry['sha256']}{entry['suffix']}"
+
+    def lookup(self, source: str, identifier: str) -> Optional[Path]:
+        """
+        Get the cached file for a structure.
+
+        Returns:
+            Path of the local file, or None on a cache miss
+        """
+        key = self.key(source, identifier)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or not self._path(entry).exists():
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry["last_used"] = time.time()
+            self._save_index()
+            return self._path(entry)
+
+    def contains(self, source: str, identifier: str) -> bool:
+        """Check whether a structure is cached, without counting a hit or miss."""
+        with self._lock:
+            entry = self._index.get(self.key(source, identifier))
+            return entry is not None and self._path(entry).exists()
+
+    def fetch(self, source: str, identifier: str, timeout: float = 60.0) -> Path:
+        """
+        Get the cached file for a structure, downloading it on a miss.
+
+        Raises:
+            ChimeraXError: If the download fails
+        """
+        key = self.key(source, identifier)
+        while True:
+            path = self.lookup(source, identifier)
+            if path is not None:
+                return path
+            with self._lock:
+                event = self._downloads.get(key)
+                if event is None:
+                    event = self._downloads[key] = threading.Event()
+                    break
+            # Someone else is downloading this entry; wait and look again
+            event.wait()
+            with self._lock:
+                if key not in self._index:
+                    raise ChimeraXError(f"Download of {key} failed")
+
+        try:
+            return self._download(source, identifier, key, timeout)
+        finally:
+            with self._lock:
+                self._downloads.pop(key).set()
+
+    def is_downloading(self, source: str, identifier: str) -> bool:
+        with self._lock:
+            return self.key(source, identifier) in self._downloads
+
+    def _download(self, source: str, identifier: str, key: str, timeout: float) -> Path:
+        url = self.url(source, identifier)
+        suffix = ARCHIVE_SOURCES[source]["suffix"]
+        fd, tmp = tempfile.mkstemp(dir=self._objects, suffix=".part")
+        digest = hashlib.sha256()
+        try:
+            with _requests().get(url, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                stream = response.raw
+                if url.endswith(".gz"):
+                    stream = gzip.GzipFile(fileobj=response.raw)
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in iter(lambda: stream.read(1 << 16), b""):
+                        digest.update(chunk)
+                        f.write(chunk)
+        except (_requests().exceptions.RequestException, OSError) as e:
+            os.remove(tmp)
+            raise ChimeraXError(f"Could not download {identifier} from {url}: {str(e)}")
+
+        entry = {
+            "sha256": digest.hexdigest(),
+            "suffix": suffix,
+            "size": os.path.getsize(tmp),
+            "last_used": time.time(),
+        }
+        with self._lock:
+            path = self._path(entry)
+            if path.exists():
+                os.remove(tmp)
+            else:
+                os.replace(tmp, path)
+            self._index[key] = entry
+            self.downloads += 1
+            self._evict(keep=key)
+            self._save_index()
+        return path
+
+    def _evict(self, keep: str) -> None:
+        def total() -> int:
+            objects = {e["sha256"]: e["size"] for e in self._index.values()}
+            return sum(objects.values())
+
+        while total() > self.max_bytes and len(self._index) > 1:
+            key = min(
+                (k for k in self._index if k != keep),
+                key=lambda k: self._index[k]["last_used"]
+            )
+            entry = self._index.pop(key)
+            self.evictions += 1
+            if not any(e["sha256"] == entry["sha256"] for e in self._index.values()):
+                try:
+                    os.remove(self._path(entry))
+                except OSError:
+                    pass
+
+    def _save_index(self) -> None:
+        tmp = self._index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index, indent=1))
+        os.replace(tmp, self._index_file)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            objects = {e["sha256"]: e["size"] for e in self._index.values()}
+            return {
+                "directory": str(self.directory),
+                "entries": len(self._index),
+                "bytes": sum(objects.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "downloads": self.downloads,
+                "evictions": self.evictions,
+            }
+
+
+class StructurePrefetcher:
+    """
+    Downloads queued structures into the StructureCache in the background.
+
+    At most `concurrency` downloads run at once, on daemon threads started
+    as needed. Entries already cached when their turn comes are skipped;
+    open_structure on an entry being downloaded waits for that download.
+    """
+
+    def __init__(self, cache: StructureCache, concurrency: int = 2, timeout: float = 600.0):
+        self.cache = cache
+        self.concurrency = max(concurrency, 1)
+        self.timeout = timeout
+        self._queue: deque = deque()
+        self._active: List[str] = []
+        self._workers = 0
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.skipped = 0
+        self.failed: Dict[str, str] = {}
+
+    def submit(self, source: str, identifiers: List[str]) -> int:
+        """
+        Queue structures for download.
+
+        Returns:
+            Number of entries queued (cached or already queued ones are left out)
+        """
+        queued = 0
+        with self._lock:
+            pending = {StructureCache.key(s, i) for s, i in self._queue} | set(self._active)
+            for identifier in identifiers:
+                key = StructureCache.key(source, identifier)
+                if key in pending or self.cache.contains(source, identifier):
+                    continue
+                self._queue.append((source, identifier))
+                pending.add(key)
+                queued += 1
+
+            while self._workers < min(self.concurrency, len(self._queue)):
+                self._workers += 1
+                threading.Thread(target=self._work, daemon=True).start()
+        return queued
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._workers -= 1
+                    return
+                source, identifier = self._queue.popleft()
+                key = StructureCache.key(source, identifier)
+                self._active.append(key)
+
+            try:
+                if self.cache.contains(source, identifier):
+                    outcome = "skipped"
+                else:
+                    self.cache.fetch(source, identifier, self.timeout)
+                    outcome = "completed"
+            except Exception as e:
+                outcome = str(e)
+
+            with self._lock:
+                self._active.remove(key)
+                if outcome == "completed":
+                    self.completed += 1
+                elif outcome == "skipped":
+                    self.skipped += 1
+                else:
+                    self.failed[key] = outcome
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": [StructureCache.key(s, i) for s, i in self._queue],
+                "downloading": list(self._active),
+                "completed": self.completed,
+                "skipped": self.skipped,
+                "failed": dict(self.failed),
+                "concurrency": self.concurrency,
+            }
+
+
+_output_store: Optional[OutputStore] = None
+_output_store_lock = threading.Lock()
+_structure_cache: Optional[StructureCache] = None
+_prefetcher: Optional[StructurePrefetcher] = None
+
+
+def get_output_store() -> OutputStore:
+    """Get the shared output store, creating it on first use."""
+    global _output_store
+    with _output_store_lock:
+        if _output_store is None:
+            _output_store = OutputStore(int(load_config()["output_store_chars"]))
+        return _output_store
+
+
+def get_structure_cache() -> Optional[StructureCache]:
+    """
+    Get the local structure file cache, creating it on first use.
+
+    Returns:
+        StructureCache, or None if disabled (structure_cache_mb is 0) or if
+        ChimeraX does not run on this machine and so cannot read its files
+    """
+    global _structure_cache
+    base_url = get_client().base_url
+    with _output_store_lock:
+        if _structure_cache is None:
+            config = load_config()
+            host = urlparse(base_url).hostname
+            if float(config["structure_cache_mb"]) <= 0 or host not in ("127.0.0.1", "localhost"):
+                return None
+            directory = (
+                config["structure_cache_dir"] or Path.home() / ".chimerax_mcp" / "structures"
+            )
+            _structure_cache = StructureCache(
+                Path(directory),
+                int(float(config["structure_cache_mb"]) * 1024 * 1024),
+                config["archive_urls"]
+            )
+        return _structure_cache
+
+
+# Returned by the tools that need the structure cache when there is none
+STRUCTURE_CACHE_OFF = (
+    "Error: The structure cache is off. It needs ChimeraX running on this machine "
+    "and structure_cache_mb above 0"
+)
+
+
+def get_prefetcher() -> Optional[StructurePrefetcher]:
+    """
+    Get the background structure prefetcher, creating it on first use.
+
+    Returns:
+        StructurePrefetcher, or None if the structure cache is disabled
+    """
+    global _prefetcher
+    cache = get_structure_cache()
+    if cache is None:
+        return None
+    with _output_store_lock:
+        if _prefetcher is None or _prefetcher.cache is not cache:
+            config = load_config()
+            _prefetcher = StructurePrefetcher(
+                cache, int(config["prefetch_concurrency"]), float(config["job_timeout"])
+            )
+        return _prefetcher
+
+
+def budget_output(text: str, max_chars: Optional[int] = None) -> str:
+    """
+    Keep tool output within the response budget.
+
+    Output longer than max_chars is stored in the output store and only
+    its beginning is returned, followed by a note with the total size and
+    the handle for get_output_page.
+
+    Args:
+        text: Full output
+        max_chars: Budget in characters (default: max_output_chars setting)
+
+    Returns:
+        The text itself, or its head plus a paging note
+    """
+    if max_chars is None:
+        max_chars = int(load_config()["max_output_chars"])
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+
+    handle = get_output_store().put(text)
+    return (
+        f"{text[:max_chars]}\n"
+        f"... [output truncated: showing {max_chars} of {len(text)} characters, "
+        f"{text.count(chr(10)) + 1} lines. Use get_output_page('{handle}', "
+        f"offset={max_chars}) to read more]"
+    )
+
+
+def _tool_failed(result: Any) -> bool:
+    return isinstance(result, str) and result.startswith("Error")
+
+
+def timed_tool(fn):
+    """
+    Record the duration of each call to an MCP tool in server_metrics.
+
+    Goes below @mcp.tool(), which reads the signature of the wrapped tool.
+    Calls that raise or return an "Error..." message count as errors.
+    """
+    name = fn.__name__
+
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = None
+            try:
+                result = await fn(*args, **kwargs)
+                return result
+            finally:
+                server_metrics.record_tool(
+                    name, time.perf_counter() - start, result is None or _tool_failed(result)
+                )
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        finally:
+            server_metrics.record_tool(
+                name, time.perf_counter() - start, result is None or _tool_failed(result)
+            )
+    return wrapper
+
+
+@mcp.tool()
+@timed_tool
+async def run_command(command: str) -> str:
+    """
+    Execute any ChimeraX command directly.
+
+    This is the most flexible tool - it allows execution of any valid ChimeraX
+    command. Use this for advanced operations or commands not covered by other tools.
+
+    Args:
+        command: Any valid ChimeraX command (e.g., "open 1ubq", "color red", "save image.png")
+
+    Returns:
+        Output from ChimeraX command execution
+
+    Examples:
+        - run_command("version")
+        - run_command("open 1ubq from pdb")
+        - run_command("color #1 bychain")
+    """
+    try:
+        result = await execute_chimerax_command_async(command)
+        return budget_output(result) if result else "Command executed successfully (no output)"
+    except ChimeraXError as e:
+        return f"Error: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def run_commands(commands: List[str], stop_on_error: bool = True) -> str:
+    """
+    Execute several ChimeraX commands in one round trip.
+
+    Much faster than calling run_command repeatedly when building up a
+    figure, since all commands are sent to ChimeraX in a single request.
+
+    Args:
+        commands: List of ChimeraX commands, executed in order
+        stop_on_error: Stop at the first failing command (True) or
+                       continue with the remaining commands (False)
+
+    Returns:
+        JSON object with per-command status and output
+
+    Examples:
+        - run_commands(["open 1ubq", "color #1 bychain", "cartoon #1"])
+        - run_commands(["color #1 red", "bogus", "view"], stop_on_error=False)
+    """
+    try:
+        results = await execute_chimerax_commands_async(commands, stop_on_error)
+    except ChimeraXError as e:
+        return f"Error: {str(e)}"
+
+    summary = {
+        status: sum(1 for r in results if r["status"] == status)
+        for status in ("ok", "error", "skipped")
+    }
+    for r in results:
+        r["output"] = budget_output(r["output"])
+    return json.dumps({"summary": summary, "results": results}, indent=2)
+
+
+def cached_structure_path(source: str, identifier: str) -> Optional[Path]:
+    """
+    Get a local copy of an archive entry from the structure cache.
+
+    Downloads the entry into the cache on a miss, so it is called from the
+    worker running the open rather than on the event loop. Returns None
+    when the cache is disabled, the source is not cacheable or the download
+    fails, in which case ChimeraX should fetch the entry itself.
+    """
+    cache = get_structure_cache()
+    if cache is None or source not in ARCHIVE_SOURCES:
+        return None
+    try:
+        return cache.fetch(source, identifier, float(load_config()["job_timeout"]))
+    except ChimeraXError:
+        return None
+
+
+@mcp.tool()
+@timed_tool
+async def open_structure(
+    identifier: str,
+    source: str = "pdb",
+    format: Optional[str] = None,
+    model_id: Optional[str] = None,
+    background: bool = False,
+    ctx: Context = None
+) -> str:
+    """
+    Open a molecular structure in ChimeraX.
+
+    Large downloads (e.g. EMDB maps) can take minutes; progress is reported
+    while waiting, or use background=True to get a job handle instead.
+    Entries from 'pdb', 'alphafold' and 'emdb' are kept in a local file
+    cache, so opening the same entry again does not download it again.
+
+    Args:
+        identifier: Structure identifier (PDB ID, UniProt ID, file path, etc.)
+        source: Data source - 'pdb', 'alphafold', 'emdb', 'file', or 'local'
+        format: File format (only needed for local files, e.g., 'pdb', 'mmcif', 'mol2')
+        model_id: Optional model ID to assign (e.g., "#1", "#2")
+        background: Return a job handle at once (poll with get_job_status)
+
+    Returns:
+        Confirmation message with details about opened structure
+
+    Examples:
+        - open_structure("1ubq", "pdb")  # Open PDB structure
+        - open_structure("P12345", "alphafold")  # Open AlphaFold prediction
+        - open_structure("C:/path/to/file.pdb", "local", "pdb")  # Open local file
+        - open_structure("1080", "emdb", background=True)  # Large map download
+    """
+    try:
+        # Build open command based on source
+        if source == "local" or source == "file":
+            cmd = f"open {identifier}"
+            if format:
+                cmd += f" format {format}"
+        else:
+            cmd = f"open {identifier} from {source}"
+        suffix = f" id {model_id}" if model_id else ""
+
+        def prepare(command: str) -> str:
+            # Runs inside the job, so a long download is covered by its
+            # progress reports and a background open returns at once
+            path = cached_structure_path(source, identifier)
+            if path is None:
+                return command
+            fmt = ARCHIVE_SOURCES[source]["format"]
+            return f"open {quote_path(str(path))} format {fmt} name {identifier}{suffix}"
+
+        return await run_long_command(
+            cmd + suffix,
+            f"Opening {identifier}",
+            lambda result: result if result else f"Successfully opened {identifier} from {source}",
+            background,
+            ctx,
+            prepare=None if source in ("local", "file") else prepare
+        )
+    except ChimeraXError as e:
+        return f"Error opening structure: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def close_models(model_spec: str = "all") -> str:
+    """
+    Close molecular models in ChimeraX.
+
+    Args:
+        model_spec: Model specifier (e.g., "#1", "#1,2", "all")
+
+    Returns:
+        Confirmation message
+
+    Examples:
+        - close_models("#1")  # Close model 1
+        - close_models("all")  # Close all models
+    """
+    try:
+        if model_spec != "all":
+            model_spec = validate_spec(model_spec, get_scene())
+        cmd = f"close {model_spec}" if model_spec != "all" else "close"
+        result = await execute_chimerax_command_async(cmd)
+        return result if result else f"Successfully closed {model_spec}"
+    except ChimeraXError as e:
+        return f"Error closing models: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def save_image(
+    filepath: str,
+    width: int = 1920,
+    height: int = 1080,
+    transparent_background: bool = False,
+    supersample: int = 3,
+    background: bool = False,
+    ctx: Context = None
+) -> str:
+    """
+    Save current ChimeraX visualization as an image.
+
+    Large supersampled renders can take a while; progress is reported while
+    waiting, or use background=True to get a job handle instead.
+
+    Args:
+        filepath: Output file path (supports .png, .jpg, .tiff)
+        width: Image width in pixels
+        height: Image height in pixels
+        transparent_background: Use transparent background
+        supersample: Supersampling level for antialiasing (1-4, higher = better quality)
+        background: Return a job handle at once (poll with get_job_status)
+
+    Returns:
+        Confirmation message with file path
+
+    Examples:
+        - save_image("protein.png", 3840, 2160)
+        - save_image("figure.png", transparent_background=True)
+    """
+    try:
+        cmd = f"save {filepath} width {width} height {height} supersample {supersample}"
+        if transparent_background:
+            cmd += " transparentBackground true"
+
+        return await run_long_command(
+            cmd,
+            f"Rendering {filepath}",
+            lambda result: f"Image saved to {filepath}" + (f"\n{result}" if result else ""),
+            background,
+            ctx
+        )
+    except ChimeraXError as e:
+        return f"Error saving image: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def color_structure(
+    model_spec: str,
+    color_scheme: str,
+    target: str = "all"
+) -> str:
+    """
+    Color molecular structures using various schemes.
+
+    Args:
+        model_spec: Model specifier (e.g., "#1", "#1,2", "all")
+        color_scheme: Color scheme - 'bychain', 'byhetero', 'byelement', 'bypolymer',
+                     'sequential', or specific color name (e.g., 'red', 'blue', '#FF0000')
+        target: What to color - 'all', 'cartoons', 'atoms', 'surfaces'
+
+    Returns:
+        Confirmation message
+
+    Examples:
+        - color_structure("#1", "bychain")
+        - color_structure("#1", "red", "cartoons")
+        - color_structure("all", "byelement", "atoms")
+    """
+    try:
+        model_spec = validate_spec(model_spec, get_scene())
+        if target == "all":
+            cmd = f"color {model_spec} {color_scheme}"
+        else:
+            cmd = f"color {model_spec} {color_scheme} target {target}"
+
+        result = await execute_chimerax_command_async(cmd)
+        return result if result else f"Successfully colored {model_spec} using {color_scheme}"
+    except ChimeraXError as e:
+        return f"Error coloring structure: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def show_style(
+    model_spec: str,
+    style: str = "cartoon",
+    show: bool = True
+) -> str:
+    """
+    Change molecular representation style.
+
+    Args:
+        model_spec: Model specifier (e.g., "#1", "#1:1-100")
+        style: Display style - 'cartoon', 'stick', 'sphere', 'ball', 'surface'
+        show: True to show, False to hide
+
+    Returns:
+        Confirmation message
+
+    Examples:
+        - show_style("#1", "cartoon")
+        - show_style("#1:1-50", "stick")
+        - show_style("#1", "atoms", False)  # Hide atoms
+    """
+    try:
+        model_spec = validate_spec(model_spec, get_scene())
+        action = "show" if show else "hide"
+        cmd = f"{action} {model_spec} {style}"
+
+        result = await execute_chimerax_command_async(cmd)
+        return result if result else f"Successfully changed style for {model_spec}"
+    except ChimeraXError as e:
+        return f"Error changing style: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def measure_distance(
+    atom1: str,
+    atom2: str,
+    model_spec: str = "#1",
+    structured: bool = True
+) -> str:
+    """
+    Measure distance between two atoms.
+
+    Args:
+        atom1: First atom specifier (e.g., ":45@CA", "/A:45@CA", "#2:45@CA")
+        atom2: Second atom specifier
+        model_spec: Model containing the atoms (unless the atom spec names one)
+        structured: Return JSON with the atoms and distance instead of log text
+
+    Returns:
+        Distance in angstroms
+
+    Examples:
+        - measure_distance(":45@CA", ":72@CA")  # Distance between CA atoms
+        - measure_distance(":100@NZ", ":150@OE1", "#1")
+    """
+    try:
+        scene = get_scene()
+        atom1 = validate_spec(qualify_spec(model_spec, atom1), scene, require_atom=True)
+        atom2 = validate_spec(qualify_spec(model_spec, atom2), scene, require_atom=True)
+        cmd = f"distance {atom1} {atom2}"
+        result = await execute_chimerax_command_async(cmd)
+        measured = parse_distance(result) if structured else None
+        if measured is not None:
+            return json.dumps(measured)
+        return result if result else "Distance measured (check ChimeraX for result)"
+    except ChimeraXError as e:
+        return f"Error measuring distance: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def align_structures(
+    mobile_spec: str,
+    reference_spec: str,
+    method: str = "matchmaker"
+) -> str:
+    """
+    Align one structure to another.
+
+    Args:
+        mobile_spec: Model to move (e.g., "#2")
+        reference_spec: Reference model (e.g., "#1")
+        method: Alignment method - 'matchmaker' (sequence-based) or 'align' (current view)
+
+    Returns:
+        Alignment statistics (RMSD, etc.)
+
+    Examples:
+        - align_structures("#2", "#1")  # Align model 2 to model 1
+        - align_structures("#2", "#1", "align")
+    """
+    try:
+        scene = get_scene()
+        mobile_spec = validate_spec(mobile_spec, scene)
+        reference_spec = validate_spec(reference_spec, scene)
+        if method == "matchmaker":
+            cmd = f"matchmaker {mobile_spec} to {reference_spec}"
+        else:
+            cmd = f"align {mobile_spec} to {reference_spec}"
+
+        result = await execute_chimerax_command_async(cmd)
+        return result if result else f"Successfully aligned {mobile_spec} to {reference_spec}"
+    except ChimeraXError as e:
+        return f"Error aligning structures: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def get_model_info(model_spec: str = "all") -> str:
+    """
+    Get information about loaded models.
+
+    Args:
+        model_spec: Model specifier (e.g., "#1", "all")
+
+    Returns:
+        Model information including atoms, residues, chains
+
+    Examples:
+        - get_model_info("#1")
+        - get_model_info("all")
+    """
+    try:
+        cmd = f"info models {validate_spec(model_spec, get_scene())}"
+        result = await execute_chimerax_command_async(cmd)
+        return budget_output(result) if result else "No models loaded"
+    except ChimeraXError as e:
+        return f"Error getting model info: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def list_models(refresh: bool = False) -> str:
+    """
+    List the open models from the server's scene model.
+
+    Answered locally unless a command may have changed the models since
+    the last sync, in which case one cheap `info` request refreshes it.
+
+    Args:
+        refresh: Sync with ChimeraX even if the scene model looks current
+
+    Returns:
+        JSON with id, name, type, chains and atom/residue counts per model
+
+    Examples:
+        - list_models()
+        - list_models(refresh=True)  # After changing models in the ChimeraX window
+    """
+    try:
+        loop = asyncio.get_running_loop()
+        state = await loop.run_in_executor(
+            get_executor(), get_scene().get, 0 if refresh else None
+        )
+        return budget_output(json.dumps(state, indent=2))
+    except ChimeraXError as e:
+        return f"Error listing models: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def show_surface(
+    model_spec: str,
+    show: bool = True,
+    transparency: int = 0,
+    color: Optional[str] = None
+) -> str:
+    """
+    Show or hide molecular surface.
+
+    Args:
+        model_spec: Model specifier
+        show: True to show, False to hide
+        transparency: Transparency level (0-100, 0=opaque, 100=fully transparent)
+        color: Optional surface color
+
+    Returns:
+        Confirmation message
+
+    Examples:
+        - show_surface("#1")
+        - show_surface("#1", transparency=50, color="blue")
+        - show_surface("#1", show=False)  # Hide surface
+    """
+    try:
+        model_spec = validate_spec(model_spec, get_scene())
+        if show:
+            cmd = f"surface {model_spec}"
+            if transparency > 0:
+                cmd += f" transparency {transparency}"
+            commands = [cmd]
+            if color:
+                commands.append(f"color {model_spec} {color} target surfaces")
+        else:
+            commands = [f"surface {model_spec} hide"]
+
+        results = await execute_chimerax_commands_async(commands)
+        for r in results:
+            if r["status"] == "error":
+                return f"Error with surface: {r['output']}"
+
+        result = "\n".join(r["output"] for r in results if r["output"])
+        return result if result else f"Surface {'shown' if show else 'hidden'} for {model_spec}"
+    except ChimeraXError as e:
+        return f"Error with surface: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def set_view(
+    view: str,
+    model_spec: Optional[str] = None
+) -> str:
+    """
+    Set the camera view.
+
+    Args:
+        view: View name - 'initial', 'front', 'back', 'top', 'bottom', 'left', 'right'
+        model_spec: Optional model to center view on
+
+    Returns:
+        Confirmation message
+
+    Examples:
+        - set_view("initial")
+        - set_view("front", "#1")
+    """
+    try:
+        if view == "initial":
+            cmd = "view"
+        else:
+            cmd = f"view {view}"
+
+        if model_spec:
+            cmd = f"view {validate_spec(model_spec, get_scene())}"
+
+        result = await execute_chimerax_command_async(cmd)
+        return result if result else f"View set to {view}"
+    except ChimeraXError as e:
+        return f"Error setting view: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def select_residues(
+    model_spec: str,
+    residue_range: str,
+    chain: Optional[str] = None
+) -> str:
+    """
+    Select specific residues.
+
+    Args:
+        model_spec: Model specifier
+        residue_range: Residue range (e.g., "1-50", "100", "45,72,91")
+        chain: Optional chain ID
+
+    Returns:
+        Confirmation message
+
+    Examples:
+        - select_residues("#1", "1-50", "A")
+        - select_residues("#1", "100,200,300")
+    """
+    try:
+        spec = validate_spec(join_spec(model_spec, chain, residue_range), get_scene())
+        cmd = f"select {spec}"
+        result = await execute_chimerax_command_async(cmd)
+        return result if result else f"Selected residues {residue_range}"
+    except ChimeraXError as e:
+        return f"Error selecting residues: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def find_clashes(
+    model_spec: str = "all",
+    cutoff: float = 0.6,
+    save_to_file: Optional[str] = None,
+    background: bool = False,
+    structured: bool = True,
+    limit: int = 50,
+    ctx: Context = None
+) -> str:
+    """
+    Find atomic clashes (overlaps).
+
+    Large assemblies can take a while; progress is reported while waiting,
+    or use background=True to get a job handle instead.
+
+    Args:
+        model_spec: Model specifier
+        cutoff: Overlap cutoff in angstroms (negative = allowable overlap)
+        save_to_file: Optional file path to save clash list
+        background: Return a job handle at once (poll with get_job_status)
+        structured: Return JSON (count, overlap stats, worst clashes) instead of log text
+        limit: Maximum number of clashes listed in structured output
+
+    Returns:
+        List of clashes found
+
+    Examples:
+        - find_clashes("#1")
+        - find_clashes("#1", cutoff=-0.4)
+    """
+    path = None
+    try:
+        model_spec = validate_spec(model_spec, get_scene())
+        cmd = f"clashes {model_spec} overlapCutoff {cutoff}"
+        path = save_to_file or (temp_output_path() if structured else None)
+        if path:
+            cmd += f" saveFile {quote_path(path)}"
+
+        def describe(result: str) -> str:
+            if structured:
+                file_text = read_output_file(path, remove=path != save_to_file)
+                return json.dumps(parse_clashes(result, file_text, limit), indent=2)
+            return result if result else "Clash analysis complete (check ChimeraX log)"
+
+        return await run_long_command(
+            cmd, f"Finding clashes in {model_spec}", describe, background, ctx
+        )
+    except ChimeraXError as e:
+        if path and path != save_to_file:
+            read_output_file(path, remove=True)
+        return f"Error finding clashes: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def find_hbonds(
+    model_spec: str = "all",
+    show_distances: bool = True,
+    save_to_file: Optional[str] = None,
+    structured: bool = True,
+    limit: int = 50
+) -> str:
+    """
+    Find hydrogen bonds.
+
+    Args:
+        model_spec: Model specifier
+        show_distances: Show distance labels
+        save_to_file: Optional file path to save H-bond list
+        structured: Return JSON (count, distance stats, shortest H-bonds) instead of log text
+        limit: Maximum number of H-bonds listed in structured output
+
+    Returns:
+        Hydrogen bond information
+
+    Examples:
+        - find_hbonds("#1")
+        - find_hbonds("#1", save_to_file="hbonds.txt")
+    """
+    path = None
+    try:
+        cmd = f"hbonds {validate_spec(model_spec, get_scene())}"
+        if show_distances:
+            cmd += " reveal true"
+        path = save_to_file or (temp_output_path() if structured else None)
+        if path:
+            cmd += f" saveFile {quote_path(path)}"
+
+        result = await execute_chimerax_command_async(cmd)
+        if structured:
+            file_text = read_output_file(path, remove=path != save_to_file)
+            return json.dumps(parse_hbonds(result, file_text, limit), indent=2)
+        return result if result else "H-bond analysis complete"
+    except ChimeraXError as e:
+        if path and path != save_to_file:
+            read_output_file(path, remove=True)
+        return f"Error finding H-bonds: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+async def get_sequence(model_spec: str, chain: Optional[str] = None) -> str:
+    """
+    Get protein/nucleic acid sequence.
+
+    Args:
+        model_spec: Model specifier
+        chain: Optional chain ID
+
+    Returns:
+        Sequence information
+
+    Examples:
+        - get_sequence("#1", "A")
+        - get_sequence("#1")
+    """
+    try:
+        cmd = f"sequence {validate_spec(join_spec(model_spec, chain), get_scene())}"
+        result = await execute_chimerax_command_async(cmd)
+        return budget_output(result) if result else "Sequence viewer opened in ChimeraX"
+    except ChimeraXError as e:
+        return f"Error getting sequence: {str(e)}"
+
+
+@mcp.tool()
+@timed_tool
+def get_connection_stats() -> str:
+    """
+    Get ChimeraX connection statistics.
+
+    Reports how many commands were sent, how many TCP connections were
+    opened, how many requests reused a pooled keep-alive connection and
+    how often read-only queries were answered from the result cache.
+
+    Returns:
+        JSON object with connection statistics
+    """
+    stats = get_client().get_stats()
+    coalescer = get_coalescer()
+    if coalescer is not None:
+        stats["coalescing"] = coalescer.get_stats()
+    return json.dumps(stats, indent=2)
+
+
+@mcp.tool()
+@timed_tool
+def server_stats(format: str = "json", reset: bool = False) -> str:
+    """
+    Get timing metrics for ChimeraX commands and tool calls.
+
+    Per command verb: latency percentiles, connection setup and server
+    time, bytes sent and received, errors, timeouts and new connections.
+    Per tool: call latency percentiles and errors. Use this to tell slow
+    connections, slow ChimeraX commands and large responses apart.
+
+    Args:
+        format: 'json', or 'prometheus' for the Prometheus text format
+        reset: Clear the metrics after reading them
+
+    Returns:
+        Metrics as JSON or Prometheus text
+    """
+    if format == "prometheus":
+        text = server_metrics.to_prometheus()
+    elif format == "json":
+        text = json.dumps(server_metrics.get_stats(), indent=2)
+    else:
+        return f"Error: unknown format '{format}' (use 'json' or 'prometheus')"
+    if reset:
+        server_metrics.reset()
+    return budget_output(text)
+
+
+@mcp.tool()
+@timed_tool
+async def run_job(commands: List[str], stop_on_error: bool = True) -> str:
+    """
+    Run an independent batch of commands on an idle ChimeraX instance.
+
+    Use this for self-contained work (open, analyze, save, close) that can
+    run in parallel with other jobs when several ChimeraX instances are
+    configured. Jobs start from whatever state the chosen instance is in,
+    so they should open everything they need and close it when done.
+
+    Args:
+        commands: List of ChimeraX commands, executed in order
+        stop_on_error: Stop at the first failing command
+
+    Returns:
+        JSON object with the instance used and per-command results
+
+    Examples:
+        - run_job(["open 1ubq", "hbonds #1", "close #1"])
+    """
+    try:
+        return json.dumps(await execute_job_async(commands, stop_on_error), indent=2)
+    except ChimeraXError as e:
+        return f"Error: {str(e)}"
+
+
+# Placeholders available in process_structures command templates
+DEFAULT_STRUCTURE_SCRIPT = ["open {id} from {source} id {model}", "close {model}"]
+STRUCTURE_MODEL_BASE = 1000
+
+
+def render_structure_script(
+    script: List[str],
+    identifier: str,
+    source: str,
+    index: int
+) -> List[str]:
+    """
+    Fill in the placeholders of a per-structure command script.
+
+    Placeholders: {id} structure identifier, {source} fetch source,
+    {index} position in the identifier list and {model} a model specifier
+    (#1001, #1002, ...) reserved for this structure so scripts running on a
+    shared instance do not touch each other's models.
+
+    Raises:
+        KeyError: If the script uses an unknown placeholder
+    """
+    values = {
+        "id": identifier,
+        "source": source,
+        "index": index,
+        "model": f"#{STRUCTURE_MODEL_BASE + index + 1}",
+    }
+    return [line.format(**values) for line in script]
+
+
+def split_cleanup(commands: List[str]) -> tuple:
+    """
+    Split the trailing close commands off a per-structure script.
+
+    They are run even when an earlier step fails, so a failed structure
+    does not leave its models open on a shared instance.
+    """
+    end = len(commands)
+    while end > 0 and command_verb(commands[end - 1]) == "close":
+        end -= 1
+    return commands[:end], commands[end:]
+
+
+@mcp.tool()
+@timed_tool
+async def process_structures(
+    identifiers: List[str],
+    script: Optional[List[str]] = None,
+    source: str = "pdb",
+    max_concurrency: int = 0,
+    max_output_chars: int = 200,
+    ctx: Context = None
+) -> str:
+    """
+    Run the same command script over many structures in one call.
+
+    Each structure runs as an independent job (see run_job), spread over
+    the configured ChimeraX instances. The script should open, process
+    and close its structure; the default just opens and closes it.
+
+    Args:
+        identifiers: Structure identifiers (PDB IDs, UniProt IDs, ...)
+        script: Command templates run for each structure. Placeholders:
+                {id}, {source}, {index} and {model} (a model specifier
+                reserved for the structure, e.g. "#1001")
+        source: Data source used for {source} - 'pdb', 'alphafold', 'emdb'
+        max_concurrency: Structures processed at once (0 or more than the
+                         instances = one per instance)
+        max_output_chars: Truncate each command's output to this length
+
+    Returns:
+        JSON object with a summary and one compact entry per structure
+
+    Examples:
+        - process_structures(["1ubq", "1tup"], [
+              "open {id} from {source} id {model}",
+              "hbonds {model}",
+              "save {id}.png width 800 height 600",
+              "close {model}"])
+    """
+    script = script or DEFAULT_STRUCTURE_SCRIPT
+    try:
+        jobs = [
+            render_structure_script(script, identifier, source, i)
+            for i, identifier in enumerate(identifiers)
+        ]
+    except (KeyError, IndexError, ValueError) as e:
+        return f"Error in script template: {str(e)}"
+
+    workers = len(get_pool().workers)
+    # More than one structure per instance would only queue jobs
+    concurrency = min(max_concurrency, workers) if max_concurrency > 0 else workers
+    semaphore = asyncio.Semaphore(concurrency)
+    finished = 0
+
+    async def process(identifier: str, commands: List[str]) -> Dict[str, Any]:
+        nonlocal finished
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                steps, cleanup = split_cleanup(commands)
+                job = await execute_job_async(steps, cleanup=cleanup)
+            except ChimeraXError as e:
+                entry = {"id": identifier, "status": "error", "error": str(e)}
+            else:
+                failed = [r for r in job["results"] if r["status"] == "error"]
+                entry = {
+                    "id": identifier,
+                    "status": "error" if failed else "ok",
+                    "instance": job["instance"],
+                }
+                if failed:
+                    entry["failed_command"] = failed[0]["command"]
+                    entry["error"] = failed[0]["output"][:max_output_chars]
+                outputs = {
+                    r["command"]: r["output"][:max_output_chars]
+                    for r in job["results"] if r["status"] == "ok" and r["output"]
+                }
+                if outputs:
+                    entry["output"] = outputs
+            entry["seconds"] = round(time.monotonic() - start, 3)
+
+        finished += 1
+        if ctx is not None:
+            await ctx.report_progress(
+                finished, len(jobs), f"{identifier}: {entry['status']}"
+            )
+        return entry
 
-        result = execute_chimerax_command(cmd)
-        return result if result else f"Successfully colored {model_spec} using {color_scheme}"
-    except ChimeraXError as e:
-        return f"Error coloring structure: {str(e)}"
+    start = time.monotonic()
+    entries = await asyncio.gather(*(
+        process(identifier, commands) for identifier, commands in zip(identifiers, jobs)
+    ))
+    ok = sum(1 for e in entries if e["status"] == "ok")
+    summary = {
+        "total": len(entries),
+        "ok": ok,
+        "failed": len(entries) - ok,
+        "seconds": round(time.monotonic() - start, 3),
+    }
+    return json.dumps({"summary": summary, "structures": entries}, indent=2)
 
 
 @mcp.tool()
-def show_style(
-    model_spec: str,
-    style: str = "cartoon",
-    show: bool = True
+@timed_tool
+async def warm_structure_cache(
+    identifiers: List[str],
+    source: str = "pdb",
+    max_concurrency: int = 4
 ) -> str:
     """
-    Change molecular representation style.
+    Download structures into the local cache ahead of time.
+
+    Later open_structure calls for these entries open the local files
+    instead of fetching them. Needs the structure cache, which is on by
+    default when ChimeraX runs on this machine.
 
     Args:
-        model_spec: Model specifier (e.g., "#1", "#1:1-100")
-        style: Display style - 'cartoon', 'stick', 'sphere', 'ball', 'surface'
-        show: True to show, False to hide
+        identifiers: Structure identifiers (PDB IDs, UniProt IDs, EMDB IDs)
+        source: Archive - 'pdb', 'alphafold' or 'emdb'
+        max_concurrency: Downloads running at once, at most half the
+                         server's worker threads so other tools stay responsive
 
     Returns:
-        Confirmation message
+        JSON object with each entry's status (cached, downloaded or error)
+        and the cache statistics
 
     Examples:
-        - show_style("#1", "cartoon")
-        - show_style("#1:1-50", "stick")
-        - show_style("#1", "atoms", False)  # Hide atoms
+        - warm_structure_cache(["1ubq", "1tup", "4hhb"])
     """
-    try:
-        action = "show" if show else "hide"
-        cmd = f"{action} {model_spec} {style}"
+    cache = get_structure_cache()
+    if cache is None:
+        return STRUCTURE_CACHE_OFF
+    if source not in ARCHIVE_SOURCES:
+        return f"Error: Unknown source '{source}' (use {', '.join(ARCHIVE_SOURCES)})"
 
-        result = execute_chimerax_command(cmd)
-        return result if result else f"Successfully changed style for {model_spec}"
-    except ChimeraXError as e:
-        return f"Error changing style: {str(e)}"
+    loop = asyncio.get_running_loop()
+    timeout = float(load_config()["job_timeout"])
+    threads = sum(i.client.pool_size for i in get_pool().instances)
+    semaphore = asyncio.Semaphore(max(min(max_concurrency, threads // 2), 1))
+
+    async def warm(identifier: str) -> Dict[str, Any]:
+        async with semaphore:
+            if cache.contains(source, identifier):
+                return {"id": identifier, "status": "cached"}
+            try:
+                path = await loop.run_in_executor(
+                    get_executor(), cache.fetch, source, identifier, timeout
+                )
+            except ChimeraXError as e:
+                return {"id": identifier, "status": "error", "error": str(e)}
+            return {"id": identifier, "status": "downloaded", "bytes": path.stat().st_size}
+
+    entries = await asyncio.gather(*(warm(identifier) for identifier in identifiers))
+    return json.dumps({"structures": entries, "cache": cache.get_stats()}, indent=2)
 
 
 @mcp.tool()
-def measure_distance(
-    atom1: str,
-    atom2: str,
-    model_spec: str = "#1"
-) -> str:
+@timed_tool
+def prefetch_structures(identifiers: List[str], source: str = "pdb") -> str:
     """
-    Measure distance between two atoms.
+    Start downloading structures that will be opened later.
+
+    Returns at once; downloads continue in the background while other work
+    proceeds. open_structure on a prefetched entry opens the local file,
+    waiting for its download if it is still running. Needs the structure
+    cache, which is on by default when ChimeraX runs on this machine.
 
     Args:
-        atom1: First atom specifier (e.g., ":45@CA", ":45@CA")
-        atom2: Second atom specifier
-        model_spec: Model containing the atoms
+        identifiers: Structure identifiers, in the order they will be needed
+        source: Archive - 'pdb', 'alphafold' or 'emdb'
 
     Returns:
-        Distance in angstroms
+        JSON object with how many entries were queued and the queue state
 
     Examples:
-        - measure_distance(":45@CA", ":72@CA")  # Distance between CA atoms
-        - measure_distance(":100@NZ", ":150@OE1", "#1")
+        - prefetch_structures(["1tup", "4hhb", "2lyz"])
     """
-    try:
-        cmd = f"distance {model_spec}{atom1} {model_spec}{atom2}"
-        result = execute_chimerax_command(cmd)
-        return result if result else "Distance measured (check ChimeraX for result)"
-    except ChimeraXError as e:
-        return f"Error measuring distance: {str(e)}"
+    prefetcher = get_prefetcher()
+    if prefetcher is None:
+        return STRUCTURE_CACHE_OFF
+    if source not in ARCHIVE_SOURCES:
+        return f"Error: Unknown source '{source}' (use {', '.join(ARCHIVE_SOURCES)})"
+
+    queued = prefetcher.submit(source, identifiers)
+    return json.dumps({"queued": queued, "status": prefetcher.get_status()}, indent=2)
 
 
 @mcp.tool()
-def align_structures(
-    mobile_spec: str,
-    reference_spec: str,
-    method: str = "matchmaker"
-) -> str:
+@timed_tool
+def get_prefetch_status() -> str:
     """
-    Align one structure to another.
+    Show the background download queue.
+
+    Returns:
+        JSON object with queued and downloading entries, counts of finished
+        downloads and errors for failed ones
+    """
+    prefetcher = get_prefetcher()
+    if prefetcher is None:
+        return STRUCTURE_CACHE_OFF
+    return json.dumps(prefetcher.get_status(), indent=2)
+
+
+@mcp.tool()
+@timed_tool
+def get_output_page(handle: str, offset: int = 0, limit: Optional[int] = None) -> str:
+    """
+    Read part of a large output that was truncated.
+
+    Tools that produce more than max_output_chars characters return only
+    the beginning plus a handle; use this to page through the rest.
 
     Args:
-        mobile_spec: Model to move (e.g., "#2")
-        reference_spec: Reference model (e.g., "#1")
-        method: Alignment method - 'matchmaker' (sequence-based) or 'align' (current view)
+        handle: Handle from the truncation note
+        offset: Character offset to start reading from
+        limit: Number of characters to return (default: max_output_chars)
 
     Returns:
-        Alignment statistics (RMSD, etc.)
+        JSON object with the requested text, total size and the offset of
+        the next page (null at the end)
 
     Examples:
-        - align_structures("#2", "#1")  # Align model 2 to model 1
-        - align_structures("#2", "#1", "align")
+        - get_output_page("3f9a1c2b7d", offset=8000)
     """
-    try:
-        if method == "matchmaker":
-            cmd = f"matchmaker {mobile_spec} to {reference_spec}"
-        else:
-            cmd = f"align {mobile_spec} to {reference_spec}"
+    text = get_output_store().get(handle)
+    if text is None:
+        return f"Error: Unknown or expired output handle {handle}"
 
-        result = execute_chimerax_command(cmd)
-        return result if result else f"Successfully aligned {mobile_spec} to {reference_spec}"
-    except ChimeraXError as e:
-        return f"Error aligning structures: {str(e)}"
+    if limit is None or limit <= 0:
+        limit = int(load_config()["max_output_chars"])
+    offset = max(offset, 0)
+    end = min(offset + limit, len(text))
+    return json.dumps({
+        "handle": handle,
+        "offset": offset,
+        "total": len(text),
+        "next_offset": end if end < len(text) else None,
+        "text": text[offset:end],
+    }, indent=2)
 
 
 @mcp.tool()
-def get_model_info(model_spec: str = "all") -> str:
+@timed_tool
+def get_job_status(job_id: Optional[str] = None) -> str:
     """
-    Get information about loaded models.
+    Check on background jobs started with background=True.
 
     Args:
-        model_spec: Model specifier (e.g., "#1", "all")
+        job_id: Job handle returned when the job started (omit to list all jobs)
 
     Returns:
-        Model information including atoms, residues, chains
-
-    Examples:
-        - get_model_info("#1")
-        - get_model_info("all")
+        JSON object with the job's stage, status (running, done, failed or
+        cancelled), elapsed seconds and, once finished, its result or error
     """
-    try:
-        cmd = f"info models {model_spec}"
-        result = execute_chimerax_command(cmd)
-        return result if result else "No models loaded"
-    except ChimeraXError as e:
-        return f"Error getting model info: {str(e)}"
+    if job_id is None:
+        return json.dumps(background_jobs.list(), indent=2)
+
+    job = background_jobs.get(job_id)
+    if job is None:
+        return f"Error: Unknown job {job_id}"
+    return json.dumps(job.to_dict(), indent=2)
 
 
 @mcp.tool()
-def show_surface(
-    model_spec: str,
-    show: bool = True,
-    transparency: int = 0,
-    color: Optional[str] = None
-) -> str:
+@timed_tool
+def cancel_job(job_id: str) -> str:
     """
-    Show or hide molecular surface.
+    Cancel a background job.
+
+    A command ChimeraX has already started keeps running inside ChimeraX;
+    cancelling stops the server from waiting for it and discards its result.
 
     Args:
-        model_spec: Model specifier
-        show: True to show, False to hide
-        transparency: Transparency level (0-100, 0=opaque, 100=fully transparent)
-        color: Optional surface color
+        job_id: Job handle returned when the job started
 
     Returns:
-        Confirmation message
+        JSON object with the job's final state
+    """
+    job = background_jobs.cancel(job_id)
+    if job is None:
+        return f"Error: Unknown job {job_id}"
+    return json.dumps(job.to_dict(), indent=2)
 
-    Examples:
-        - show_surface("#1")
-        - show_surface("#1", transparency=50, color="blue")
-        - show_surface("#1", show=False)  # Hide surface
+
+def render_frame_commands(frame: Dict[str, Any]) -> List[str]:
     """
-    try:
-        if show:
-            cmd = f"surface {model_spec}"
-            if transparency > 0:
-                cmd += f" transparency {transparency}"
-            if color:
-                execute_chimerax_command(cmd)
-                cmd = f"color {model_spec} {color} target surfaces"
-        else:
-            cmd = f"surface {model_spec} hide"
+    Build the scene-changing commands of a render_series frame.
 
-        result = execute_chimerax_command(cmd)
-        return result if result else f"Surface {'shown' if show else 'hidden'} for {model_spec}"
-    except ChimeraXError as e:
-        return f"Error with surface: {str(e)}"
+    Frame keys: 'view' (set_view name), 'turn' ("y 30" or degrees about y),
+    'show' and 'hide' (lists of model specs) and 'commands' (extra
+    ChimeraX commands), applied in that order.
+    """
+    commands = []
+    view = frame.get("view")
+    if view:
+        commands.append("view" if view == "initial" else f"view {view}")
+    turn = frame.get("turn")
+    if turn:
+        commands.append(f"turn y {turn}" if isinstance(turn, (int, float)) else f"turn {turn}")
+    commands.extend(f"show {spec} models" for spec in frame.get("show", []))
+    commands.extend(f"hide {spec} models" for spec in frame.get("hide", []))
+    commands.extend(frame.get("commands", []))
+    return commands
 
 
 @mcp.tool()
-def set_view(
-    view: str,
-    model_spec: Optional[str] = None
+@timed_tool
+async def render_series(
+    frames: List[Dict[str, Any]],
+    width: int = 1920,
+    height: int = 1080,
+    supersample: int = 3,
+    transparent_background: bool = False,
+    parallel: bool = False,
+    setup_commands: Optional[List[str]] = None,
+    ctx: Context = None
 ) -> str:
     """
-    Set the camera view.
+    Render a series of images (turntables, multi-view panels) in one call.
+
+    Each frame changes the scene and saves one image, sent to ChimeraX as a
+    single batched request. Frame changes accumulate like a script: frame 3
+    starts from the scene left by frame 2.
+
+    By default frames render in the current session. With parallel=True
+    the frames are split into contiguous chunks across the worker
+    instances (see run_job); each worker first runs setup_commands to
+    build the scene and replays earlier frames' changes to catch up.
 
     Args:
-        view: View name - 'initial', 'front', 'back', 'top', 'bottom', 'left', 'right'
-        model_spec: Optional model to center view on
+        frames: Frame specs, each with 'output' (image path) and optionally
+                'view' ('initial', 'front', ...), 'turn' ("y 30" or degrees
+                about y), 'show'/'hide' (lists of model specs) and
+                'commands' (extra ChimeraX commands)
+        width: Image width in pixels
+        height: Image height in pixels
+        supersample: Supersampling level for antialiasing (1-4)
+        transparent_background: Use transparent background
+        parallel: Fan frames out across worker instances
+        setup_commands: Commands that build the scene on each worker
+                        (parallel mode only), e.g. ["open 1ubq", "cartoon"]
 
     Returns:
-        Confirmation message
+        JSON object with per-frame status, instance and render time
 
     Examples:
-        - set_view("initial")
-        - set_view("front", "#1")
+        - render_series([{"turn": 10, "output": f"turn_{i:03}.png"} for i in range(36)])
+        - render_series([{"view": "initial", "output": "a.png"},
+                         {"hide": ["#2"], "output": "b.png"}], width=800, height=600)
     """
-    try:
-        if view == "initial":
-            cmd = "view"
+    for frame in frames:
+        if not frame.get("output"):
+            return "Error: Every frame needs an 'output' image path"
+
+    save_options = f" width {width} height {height} supersample {supersample}"
+    if transparent_background:
+        save_options += " transparentBackground true"
+    timeout = float(load_config()["job_timeout"])
+    done = 0
+    loop = asyncio.get_running_loop()
+
+    def render(client: ChimeraXClient, index: int) -> Dict[str, Any]:
+        frame = frames[index]
+        commands = render_frame_commands(frame)
+        commands.append(f"save {quote_path(frame['output'])}{save_options}")
+        start = time.monotonic()
+        entry = {"frame": index, "output": frame["output"], "instance": client.base_url}
+        try:
+            results = client.execute_batch(commands, read_timeout=timeout)
+        except ChimeraXError as e:
+            entry.update(status="error", error=str(e))
         else:
-            cmd = f"view {view}"
+            failed = [r for r in results if r["status"] == "error"]
+            entry["status"] = "error" if failed else "ok"
+            if failed:
+                entry["error"] = f"{failed[0]['command']}: {failed[0]['output']}"
+        entry["seconds"] = round(time.monotonic() - start, 3)
+        return entry
 
-        if model_spec:
-            execute_chimerax_command(f"view {model_spec}")
+    def render_chunk(instance: ChimeraXInstance, indices: List[int]) -> List[Dict[str, Any]]:
+        catch_up = list(setup_commands or [])
+        for earlier in range(indices[0]):
+            catch_up.extend(render_frame_commands(frames[earlier]))
+        if catch_up:
+            results = instance.client.execute_batch(catch_up, read_timeout=timeout)
+            failed = [r for r in results if r["status"] == "error"]
+            if failed:
+                error = f"Setup failed at {failed[0]['command']}: {failed[0]['output']}"
+                return [
+                    {"frame": i, "output": frames[i]["output"], "instance": instance.url,
+                     "status": "error", "error": error, "seconds": 0.0}
+                    for i in indices
+                ]
+        return [render(instance.client, i) for i in indices]
+
+    async def report(count: int) -> None:
+        nonlocal done
+        done += count
+        if ctx is not None:
+            await ctx.report_progress(done, len(frames), f"{done}/{len(frames)} frames rendered")
+
+    start = time.monotonic()
+    entries: List[Dict[str, Any]] = []
+    try:
+        if parallel:
+            workers = len(get_pool().workers)
+            size = -(-len(frames) // workers) if frames else 1
+            chunks = [list(range(i, min(i + size, len(frames))))
+                      for i in range(0, len(frames), size)]
+
+            async def run_chunk(indices: List[int]) -> List[Dict[str, Any]]:
+                async with get_pool().acquire_async() as instance:
+                    chunk_entries = await loop.run_in_executor(
+                        get_executor(), render_chunk, instance, indices
+                    )
+                await report(len(chunk_entries))
+                return chunk_entries
+
+            for chunk_entries in await asyncio.gather(*(run_chunk(c) for c in chunks)):
+                entries.extend(chunk_entries)
         else:
-            result = execute_chimerax_command(cmd)
-            return result if result else f"View set to {view}"
+            await loop.run_in_executor(get_executor(), flush_pending_commands)
+            for index in range(len(frames)):
+                entries.append(
+                    await loop.run_in_executor(get_executor(), render, get_client(), index)
+                )
+                await report(1)
     except ChimeraXError as e:
-        return f"Error setting view: {str(e)}"
+        return f"Error rendering series: {str(e)}"
 
+    ok = sum(1 for e in entries if e["status"] == "ok")
+    summary = {
+        "total": len(frames),
+        "ok": ok,
+        "failed": len(entries) - ok,
+        "seconds": round(time.monotonic() - start, 3),
+    }
+    return json.dumps({"summary": summary, "frames": entries}, indent=2)
 
-@mcp.tool()
-def select_residues(
-    model_spec: str,
-    residue_range: str,
-    chain: Optional[str] = None
-) -> str:
+
+_preview_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_preview_lock = threading.Lock()
+
+
+def render_preview(width: int, height: int, image_format: str,
+                   max_dimension: int, quality: int, supersample: int) -> tuple:
     """
-    Select specific residues.
+    Render the session scene to a temporary file and read it back.
 
-    Args:
-        model_spec: Model specifier
-        residue_range: Residue range (e.g., "1-50", "100", "45,72,91")
-        chain: Optional chain ID
+    The size is scaled down to fit max_dimension, keeping the aspect ratio.
+    Images are cached by scene version, so an unchanged scene is not
+    rendered twice.
 
     Returns:
-        Confirmation message
+        (image bytes, cache hit flag)
 
-    Examples:
-        - select_residues("#1", "1-50", "A")
-        - select_residues("#1", "100,200,300")
+    Raises:
+        ChimeraXError: If rendering fails or the image cannot be read
     """
+    flush_pending_commands()
+    client = get_client()
+
+    scale = min(1.0, max_dimension / max(width, height)) if max_dimension > 0 else 1.0
+    width, height = max(int(width * scale), 1), max(int(height * scale), 1)
+    key = (client.base_url, client.scene_version, width, height,
+           image_format, quality, supersample)
+    with _preview_lock:
+        if key in _preview_cache:
+            _preview_cache.move_to_end(key)
+            return _preview_cache[key], True
+
+    path = temp_output_path(f".{image_format}")
+    cmd = f"save {quote_path(path)} width {width} height {height} supersample {supersample}"
+    if image_format == "jpg":
+        cmd += f" quality {quality}"
     try:
-        spec = f"{model_spec}:{residue_range}"
-        if chain:
-            spec += f"/{chain}"
+        client.execute(cmd, float(load_config()["job_timeout"]))
+        data = Path(path).read_bytes()
+    except OSError as e:
+        raise ChimeraXError(f"Could not read rendered image: {str(e)}")
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    if not data:
+        raise ChimeraXError("ChimeraX did not write the preview image")
 
-        cmd = f"select {spec}"
-        result = execute_chimerax_command(cmd)
-        return result if result else f"Selected residues {residue_range}"
-    except ChimeraXError as e:
-        return f"Error selecting residues: {str(e)}"
+    if client.scene_version != key[1]:
+        # The scene changed while rendering; don't cache an ambiguous image
+        return data, False
+
+    with _preview_lock:
+        _preview_cache[key] = data
+        while len(_preview_cache) > int(load_config()["preview_cache_size"]):
+            _preview_cache.popitem(last=False)
+    return data, False
 
 
 @mcp.tool()
-def find_clashes(
-    model_spec: str = "all",
-    cutoff: float = 0.6,
-    save_to_file: Optional[str] = None
-) -> str:
+@timed_tool
+async def preview_image(
+    width: int = 1024,
+    height: int = 768,
+    format: Optional[str] = None,
+    max_dimension: Optional[int] = None,
+    supersample: int = 1
+):
     """
-    Find atomic clashes (overlaps).
+    Render the current view and return it directly as an image.
+
+    Use this to look at the scene; nothing is left on disk. Repeated
+    previews of an unchanged scene are answered from memory.
 
     Args:
-        model_spec: Model specifier
-        cutoff: Overlap cutoff in angstroms (negative = allowable overlap)
-        save_to_file: Optional file path to save clash list
+        width: Image width in pixels
+        height: Image height in pixels
+        format: 'png' or 'jpg' (default: preview_format setting)
+        max_dimension: Scale down so the longest side fits (default:
+                       preview_max_dimension setting, 0 = no limit)
+        supersample: Supersampling level for antialiasing (1-4)
 
     Returns:
-        List of clashes found
+        The rendered image
 
     Examples:
-        - find_clashes("#1")
-        - find_clashes("#1", cutoff=-0.4)
+        - preview_image()
+        - preview_image(1920, 1080, format="jpg", max_dimension=800)
     """
-    try:
-        cmd = f"clashes {model_spec} overlapCutoff {cutoff}"
-        if save_to_file:
-            cmd += f" saveFile {save_to_file}"
+    config = load_config()
+    image_format = (format or config["preview_format"]).lower().lstrip(".")
+    if image_format == "jpeg":
+        image_format = "jpg"
+    if image_format not in ("png", "jpg"):
+        return f"Error: Unsupported preview format '{image_format}' (use png or jpg)"
+    if max_dimension is None:
+        max_dimension = int(config["preview_max_dimension"])
 
-        result = execute_chimerax_command(cmd)
-        return result if result else "Clash analysis complete (check ChimeraX log)"
+    loop = asyncio.get_running_loop()
+    try:
+        data, _ = await loop.run_in_executor(
+            get_executor(), render_preview, width, height, image_format,
+            max_dimension, int(config["preview_quality"]), supersample
+        )
     except ChimeraXError as e:
-        return f"Error finding clashes: {str(e)}"
+        return f"Error rendering preview: {str(e)}"
+    return Image(data=data, format="jpeg" if image_format == "jpg" else "png")
 
 
 @mcp.tool()
-def find_hbonds(
-    model_spec: str = "all",
-    show_distances: bool = True,
-    save_to_file: Optional[str] = None
-) -> str:
+@timed_tool
+def get_instance_status() -> str:
     """
-    Find hydrogen bonds.
+    Get the load on each ChimeraX instance.
 
-    Args:
-        model_spec: Model specifier
-        show_distances: Show distance labels
-        save_to_file: Optional file path to save H-bond list
+    Returns:
+        JSON object with jobs waiting for an instance and, per instance,
+        its role (session or worker), whether it is running a job and how
+        many requests it has in flight; with auto_start_chimerax also the
+        supervisor's restarts, failovers and standby state, and the latest
+        session checkpoint
+    """
+    status = get_pool().get_status()
+    supervisor = get_supervisor()
+    if supervisor is not None:
+        status["supervisor"] = supervisor.get_status()
+    # Only report on checkpoints; asking for status must not start them
+    checkpointer = _checkpointer
+    if checkpointer is not None:
+        status["checkpoints"] = checkpointer.get_status()
+    return json.dumps(status, indent=2)
+
+
+@mcp.tool()
+@timed_tool
+async def reload_config() -> str:
+    """
+    Apply changes to chimerax_mcp_config.json without restarting the server.
+
+    Use after editing the config, e.g. to point the server at ChimeraX on a
+    new port. Commands already running finish with the old settings. The
+    file is also checked for changes every config_watch_interval seconds.
 
     Returns:
-        Hydrogen bond information
+        JSON with the settings that changed, the session ChimeraX URL, what
+        was rebuilt and any settings that only apply after a restart
+    """
+    try:
+        loop = asyncio.get_running_loop()
+        # Not get_executor(): applying the config may replace it
+        result = await loop.run_in_executor(None, apply_config)
+        return json.dumps(result, indent=2)
+    except (ValueError, ChimeraXError) as e:
+        return f"Error reloading config: {str(e)}"
 
-    Examples:
-        - find_hbonds("#1")
-        - find_hbonds("#1", save_to_file="hbonds.txt")
+
+@mcp.tool()
+@timed_tool
+async def checkpoint_session() -> str:
+    """
+    Save a session checkpoint now instead of waiting for the periodic one.
+
+    Returns:
+        JSON with the checkpoint path and creation time
     """
+    checkpointer = get_checkpointer()
+    if checkpointer is None:
+        return "Error saving checkpoint: checkpoints need a ChimeraX running on this machine"
     try:
-        cmd = f"hbonds {model_spec}"
-        if show_distances:
-            cmd += " reveal true"
-        if save_to_file:
-            cmd += f" saveFile {save_to_file}"
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_executor(), flush_pending_commands)
+        info = await loop.run_in_executor(get_executor(), checkpointer.checkpoint)
+        return json.dumps(info, indent=2)
+    except ChimeraXError as e:
+        return f"Error saving checkpoint: {str(e)}"
 
-        result = execute_chimerax_command(cmd)
-        return result if result else "H-bond analysis complete"
+
+@mcp.tool()
+@timed_tool
+async def restore_session() -> str:
+    """
+    Rebuild the scene after ChimeraX restarted or lost its state.
+
+    Opens the latest session checkpoint and replays only the structure,
+    color, style and view commands sent since it was saved, instead of
+    every command of the session.
+
+    Returns:
+        JSON with the checkpoint used, how many commands were replayed,
+        any replay errors and the seconds taken
+    """
+    checkpointer = get_checkpointer()
+    if checkpointer is None:
+        return "Error restoring session: checkpoints need a ChimeraX running on this machine"
+    try:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_executor(), flush_pending_commands)
+        result = await loop.run_in_executor(get_executor(), checkpointer.restore)
+        return budget_output(json.dumps(result, indent=2))
     except ChimeraXError as e:
-        return f"Error finding H-bonds: {str(e)}"
+        return f"Error restoring session: {str(e)}"
+
+
+def journal_commands(entries: List[Dict[str, Any]], exclude_urls=()) -> List[str]:
+    """
+    Command lines from journal entries that ChimeraX ran, in order.
+
+    Failed batches contribute the commands that completed; other failed
+    command lines are left out.
+    """
+    commands = []
+    for entry in entries:
+        if entry.get("url") in exclude_urls:
+            continue
+        if entry.get("status") == "ok":
+            commands.append(entry["command"])
+        elif entry.get("completed"):
+            commands.extend(split_command_line(entry["command"])[:entry["completed"]])
+    return commands
 
 
 @mcp.tool()
-def get_sequence(model_spec: str, chain: Optional[str] = None) -> str:
+@timed_tool
+async def compile_journal(
+    first: int = 1,
+    last: Optional[int] = None,
+    output_path: Optional[str] = None,
+    run: bool = False
+) -> str:
     """
-    Get protein/nucleic acid sequence.
+    Compile a range of the command journal into a minimal ChimeraX script.
+
+    Queries, failed commands and commands overridden later (colors,
+    styles, show/hide, camera moves, anything before `close session`) are
+    left out, so the script rebuilds the scene in one batch instead of
+    many tool calls. Commands sent to `endpoints` instances are skipped.
 
     Args:
-        model_spec: Model specifier
-        chain: Optional chain ID
+        first: Number of the first journal entry to include
+        last: Number of the last entry to include (default: the latest)
+        output_path: Write the script here as a .cxc file ChimeraX can open
+        run: Also run the script now with run_commands
 
     Returns:
-        Sequence information
+        JSON with the entries read, the commands before and after
+        compiling, the script (or its path) and, with run=True, the errors
 
     Examples:
-        - get_sequence("#1", "A")
-        - get_sequence("#1")
+        - compile_journal()  # Whole journal
+        - compile_journal(120, 180, "~/scene.cxc")
+        - compile_journal(120, run=True)  # Replay into the current session
     """
+    client = get_client()
+    if client.journal is None:
+        return "Error compiling journal: the command journal is disabled"
     try:
-        spec = model_spec
-        if chain:
-            spec += f"/{chain}"
-
-        cmd = f"sequence {spec}"
-        result = execute_chimerax_command(cmd)
-        return result if result else "Sequence viewer opened in ChimeraX"
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(get_executor(), client.journal.read, first, last)
+        workers = {instance.url for instance in get_pool().instances[1:]}
+        commands = journal_commands(entries, workers)
+        script = compile_macro(commands)
+        result: Dict[str, Any] = {
+            "entries": len(entries),
+            "first": entries[0]["seq"] if entries else None,
+            "last": entries[-1]["seq"] if entries else None,
+            "commands_in": sum(len(split_command_line(c)) for c in commands),
+            "commands_out": len(script),
+        }
+        if output_path:
+            path = Path(output_path).expanduser()
+            path.write_text("".join(f"{command}\n" for command in script), encoding="utf-8")
+            result["script_path"] = str(path)
+        else:
+            result["script"] = script
+        if run and script:
+            results = await loop.run_in_executor(
+                get_executor(), execute_chimerax_commands, script, False
+            )
+            result["errors"] = [r for r in results if r["status"] == "error"]
+        return budget_output(json.dumps(result, indent=2))
+    except OSError as e:
+        return f"Error compiling journal: cannot write {output_path}: {e}"
     except ChimeraXError as e:
-        return f"Error getting sequence: {str(e)}"
+        return f"Error compiling journal: {str(e)}"
 
 
 # Add resources for common molecular structures
+@mcp.resource("chimerax://scene")
+async def get_scene_resource() -> str:
+    """
+    Models open in ChimeraX: ids, names, types, chains and atom/residue counts.
+    Kept by the server and synced with ChimeraX when it may be out of date.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        state = await loop.run_in_executor(get_executor(), get_scene().get)
+    except ChimeraXError as e:
+        state = dict(get_scene().snapshot(), last_error=str(e))
+    return json.dumps(state, indent=2)
+
+
 @mcp.resource("pdb://{pdb_id}")
 def get_pdb_info(pdb_id: str) -> str:
     """
@@ -627,6 +5401,41 @@ def get_alphafold_info(uniprot_id: str) -> str:
     return f"AlphaFold Prediction: {uniprot_id.upper()}\nUse open_structure('{uniprot_id}', 'alphafold') to load this prediction."
 
 
+def start_background_services() -> None:
+    """
+    Start config file watching, periodic session checkpoints and, if
+    configured, the ChimeraX supervisor.
+
+    Runs on its own thread, so failures are printed to stderr, which MCP
+    clients keep as the server log; the tools keep working without the
+    services.
+    """
+    try:
+        ConfigWatcher(config_path(), float(load_config()["config_watch_interval"])).start()
+        supervisor = get_supervisor()
+        checkpointer = get_checkpointer()
+        if supervisor is not None:
+            if checkpointer is not None and load_config()["restore_after_restart"]:
+                supervisor.on_recover = checkpointer.restore
+            supervisor.start()
+            atexit.register(supervisor.stop)
+    except Exception:
+        print("ChimeraX MCP: could not start background services", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+
+
+def main():
+    """
+    Run the MCP server.
+
+    Configuration, the HTTP stack and background services are set up on a
+    separate thread, so the server answers initialize and list_tools
+    without waiting for them; MCP clients time out slow servers.
+    """
+    threading.Thread(target=start_background_services, daemon=True).start()
+    mcp.run()
+
+
 if __name__ == "__main__":
     # Run the MCP server
-    mcp.run()
+    main()
@@ -12,13 +12,14 @@ a = Analysis(
         'mcp.server',
         'mcp.server.fastmcp',
         'requests',
+        'urllib3',
         'urllib.parse',
         'typing',
     ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['tkinter'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -38,7 +39,8 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    # UPX-packed files are decompressed on every launch, which slows startup
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,
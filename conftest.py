@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Shared test setup.
+
+The server keeps its journal, checkpoints and structure cache under
+~/.chimerax_mcp, so every test runs with HOME pointing at a temporary
+directory. Servers started as subprocesses inherit it.
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_home(monkeypatch, tmp_path_factory):
+    home = tmp_path_factory.mktemp("home")
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("USERPROFILE", str(home))
+    return home
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Fake ChimeraX REST server for testing.
+
+Emulates the `/run?command=...` endpoint of `remotecontrol rest start` well
+enough to exercise the MCP server without a real ChimeraX installation.
+Commands are recorded so tests can check exactly what was sent.
+
+Usage:
+    python fake_chimerax_server.py [port] [--latency SECONDS]
+    python fake_chimerax_server.py --cmd "remotecontrol rest start port 5900"
+
+The second form takes the arguments the MCP server launches ChimeraX with,
+so the script can stand in for the ChimeraX executable.
+"""
+
+import argparse
+import re
+import shlex
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+
+class FakeChimeraXHandler(BaseHTTPRequestHandler):
+    """Request handler answering `/run` like the ChimeraX REST server."""
+
+    # Keep connections alive so clients can reuse them
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY the
+    # body waits for the client's delayed ACK (~40 ms) on keep-alive connections
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path != "/run":
+            self._reply(404, "Not found")
+            return
+
+        command = parse_qs(parsed.query).get("command", [""])[0]
+        self.server.connections.add(self.client_address)
+        status, text = self.server.run_command(command)
+        self._reply(status, text)
+
+    def _reply(self, status: int, text: str):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep test output quiet
+        pass
+
+
+class FakeChimeraXServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the fake ChimeraX state.
+
+    Attributes:
+        commands: Every command line received, in order
+        connections: Distinct client (host, port) pairs seen
+        delays: Seconds to sleep before answering, keyed by command verb
+        latency: Seconds to sleep before answering any request
+        responses: Log text returned, keyed by full command or command verb
+        file_outputs: Text written to the command's output file (`save`
+                      path or `saveFile` option), keyed by command verb
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, delays: Optional[Dict[str, float]] = None,
+                 latency: float = 0.0):
+        super().__init__(("127.0.0.1", port), FakeChimeraXHandler)
+        self.commands: List[str] = []
+        self.delays: Dict[str, float] = dict(delays or {})
+        self.latency = latency
+        self.responses: Dict[str, str] = {}
+        self.file_outputs: Dict[str, str] = {}
+        self.connections = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def run_command(self, command: str):
+        """
+        Produce the (status, text) reply for a command line.
+
+        Commands starting with `fail` return an HTTP 400 error, `version`
+        returns a version string and `echo` returns its argument; everything
+        else succeeds silently. Command lines may hold several `;`-separated
+        commands.
+        """
+        with self._lock:
+            self.commands.append(command)
+        if self.latency:
+            time.sleep(self.latency)
+
+        # Like ChimeraX, run `;`-separated commands until one fails
+        outputs = []
+        for part in command.split(";"):
+            verb, _, rest = part.strip().partition(" ")
+            if verb in self.delays:
+                time.sleep(self.delays[verb])
+            if verb == "fail":
+                outputs.append(f"Unknown command: {part.strip()}")
+                return 400, "\n".join(outputs)
+            if verb == "version":
+                outputs.append("UCSF ChimeraX version: 1.6.1 (fake)")
+            elif verb == "echo":
+                outputs.append(rest)
+            elif part.strip() in self.responses:
+                outputs.append(self.responses[part.strip()])
+            elif verb in self.responses:
+                outputs.append(self.responses[verb])
+            if verb in self.file_outputs:
+                # `save <path> ...` or `<verb> ... saveFile <path>`
+                args = rest.split("saveFile", 1)[1] if "saveFile" in rest else rest
+                with open(shlex.split(args)[0], "w", encoding="utf-8") as f:
+                    f.write(self.file_outputs[verb])
+        return 200, "\n".join(o for o in outputs if o)
+
+    def handle_error(self, request, client_address):
+        # Clients that timed out have closed the connection before the reply
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def start(self) -> "FakeChimeraXServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake ChimeraX REST server")
+    parser.add_argument("port", type=int, nargs="?", default=5900)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds to wait before answering each request")
+    parser.add_argument("--cmd", default="", help="ChimeraX startup command")
+    args, _ = parser.parse_known_args()
+    match = re.search(r"remotecontrol rest start port (\d+)", args.cmd)
+    server = FakeChimeraXServer(int(match.group(1)) if match else args.port,
+                                latency=args.latency)
+    print(f"Fake ChimeraX REST server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -4,6 +4,7 @@ Full integration test for ChimeraX MCP Server.
 Tests all major functionality end-to-end.
 """
 
+import asyncio
 import sys
 from chimerax_mcp_server import (
     open_structure, close_models, color_structure, show_style,
@@ -22,7 +23,7 @@ def run_full_test():
     # Test 1: Open structure
     print("\n[1/8] Opening PDB structure 1ubq...")
     try:
-        result = open_structure("1ubq", "pdb")
+        result = asyncio.run(open_structure("1ubq", "pdb"))
         if "ubiquitin" in result.lower() or "successfully" in result.lower():
             print("  [PASS] Structure opened")
             tests_passed += 1
@@ -36,7 +37,7 @@ def run_full_test():
     # Test 2: Get model info
     print("\n[2/8] Getting model information...")
     try:
-        result = get_model_info("#1")
+        result = asyncio.run(get_model_info("#1"))
         if "1ubq" in result.lower() or "atomicstructure" in result.lower():
             print(f"  [PASS] {result[:60]}...")
             tests_passed += 1
@@ -50,7 +51,7 @@ def run_full_test():
     # Test 3: Color by chain
     print("\n[3/8] Coloring by chain...")
     try:
-        result = color_structure("#1", "bychain")
+        result = asyncio.run(color_structure("#1", "bychain"))
         if "success" in result.lower():
             print("  [PASS] Colored successfully")
             tests_passed += 1
@@ -64,7 +65,7 @@ def run_full_test():
     # Test 4: Show as cartoon
     print("\n[4/8] Showing cartoon representation...")
     try:
-        result = show_style("#1", "cartoon")
+        result = asyncio.run(show_style("#1", "cartoon"))
         if "success" in result.lower():
             print("  [PASS] Style changed successfully")
             tests_passed += 1
@@ -78,8 +79,8 @@ def run_full_test():
     # Test 5: Find hydrogen bonds
     print("\n[5/8] Finding hydrogen bonds...")
     try:
-        result = find_hbonds("#1", show_distances=False)
-        if "hydrogen bond" in result.lower() or "complete" in result.lower():
+        result = asyncio.run(find_hbonds("#1", show_distances=False))
+        if '"count"' in result or "hydrogen bond" in result.lower():
             print(f"  [PASS] {result[:60]}...")
             tests_passed += 1
         else:
@@ -92,7 +93,7 @@ def run_full_test():
     # Test 6: Measure distance
     print("\n[6/8] Measuring distance between residues...")
     try:
-        result = measure_distance(":10@CA", ":20@CA", "#1")
+        result = asyncio.run(measure_distance(":10@CA", ":20@CA", "#1"))
         if "distance" in result.lower() or "å" in result or "angstrom" in result.lower():
             print(f"  [PASS] Distance measured")
             tests_passed += 1
@@ -106,7 +107,7 @@ def run_full_test():
     # Test 7: Save image
     print("\n[7/8] Saving image...")
     try:
-        result = save_image("integration_test.png", 800, 600)
+        result = asyncio.run(save_image("integration_test.png", 800, 600))
         if "saved" in result.lower():
             print("  [PASS] Image saved")
             tests_passed += 1
@@ -120,7 +121,7 @@ def run_full_test():
     # Test 8: Close model
     print("\n[8/8] Closing model...")
     try:
-        result = close_models("#1")
+        result = asyncio.run(close_models("#1"))
         if "success" in result.lower() or "closed" in result.lower():
             print("  [PASS] Model closed")
             tests_passed += 1
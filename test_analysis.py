@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for structured results from find_hbonds, find_clashes and measure_distance.
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, InstancePool
+from fake_chimerax_server import FakeChimeraXServer
+
+HBONDS_FILE = """\
+Finding intermodel H-bonds
+Finding intramodel H-bonds
+Constraints relaxed by 0.4 angstroms and 20 degrees
+Models used:
+\t1 1ubq
+
+3 H-bonds
+H-bond donor, acceptor, hydrogen, D..A dist, D-H..A dist:
+/A LYS 6 N     /A THR 66 O    no hydrogen  2.920  N/A
+/A ILE 13 N    /A LEU 15 O    /A ILE 13 H  3.101  2.234
+#1/A GLN 2 N   #1/A GLU 64 O  no hydrogen  2.801  N/A
+"""
+
+CLASHES_FILE = """\
+Allowed overlap: 0.6
+H-bond overlap reduction: 0.4
+Ignore contacts between atoms separated by 4 bonds or less
+Detect intra-residue contacts: False
+Detect intra-molecule contacts: True
+
+2 clashes
+atom1  atom2  overlap  distance
+/A LEU 8 CD1   /A THR 9 N     0.613  2.887
+/A ARG 72 NH1  /A ASP 39 OD2  0.952  2.248
+"""
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeChimeraXServer().start()
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([ChimeraXClient(fake.url)]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    yield fake
+    fake.stop()
+
+
+def test_parse_hbonds_file():
+    """H-bond lines become donor/acceptor records, shortest first"""
+    result = chimerax_mcp_server.parse_hbonds("3 hydrogen bonds found", HBONDS_FILE, limit=2)
+    assert result["count"] == 3
+    assert result["listed"] == 2
+    assert result["distance"] == {"min": 2.801, "max": 3.101, "mean": 2.941}
+    first = result["hbonds"][0]
+    assert first == {
+        "donor": "#1/A GLN 2 N", "acceptor": "#1/A GLU 64 O",
+        "hydrogen": None, "distance": 2.801, "dha_distance": None,
+    }
+
+
+def test_parse_clashes_without_file():
+    """Without the saved file only the count from the log is reported"""
+    result = chimerax_mcp_server.parse_clashes("2 clashes", None)
+    assert result["count"] == 2
+
+
+def test_fallback_log_is_paged(monkeypatch):
+    """A long log returned in place of the saved file is kept to the budget"""
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "max_output_chars", 100)
+    log = "12 H-bonds\n" + "/A LYS 6 N  /A THR 66 O\n" * 50
+    result = chimerax_mcp_server.parse_hbonds(log, None)
+    assert result["count"] == 12
+    assert result["log"].startswith(log[:100])
+    assert "get_output_page(" in result["log"]
+
+
+def test_parse_distance():
+    """The distance log line is parsed into atoms and a number"""
+    measured = chimerax_mcp_server.parse_distance(
+        "Distance between /A LYS 6 NZ and /A GLU 64 OE1: 2.806Å"
+    )
+    assert measured == {"atom1": "/A LYS 6 NZ", "atom2": "/A GLU 64 OE1", "distance": 2.806}
+    assert chimerax_mcp_server.parse_distance("nothing here") is None
+
+
+def test_find_hbonds_structured(server):
+    """find_hbonds reads ChimeraX's saved file and removes the temp copy"""
+    server.file_outputs["hbonds"] = HBONDS_FILE
+    result = json.loads(asyncio.run(chimerax_mcp_server.find_hbonds("#1")))
+    assert result["count"] == 3
+
+    path = server.commands[0].split("saveFile ", 1)[1]
+    assert not os.path.exists(path)
+
+
+def test_find_clashes_structured(server, tmp_path):
+    """A user-supplied saveFile is parsed and kept"""
+    server.file_outputs["clashes"] = CLASHES_FILE
+    path = str(tmp_path / "clashes.txt")
+    result = json.loads(asyncio.run(chimerax_mcp_server.find_clashes("#1", save_to_file=path)))
+
+    assert result["count"] == 2
+    assert result["clashes"][0]["atom1"] == "/A ARG 72 NH1"
+    assert result["overlap"]["max"] == 0.952
+    assert os.path.exists(path)
+
+
+def test_measure_distance_text_mode(server):
+    """structured=False keeps the raw ChimeraX output"""
+    server.responses["distance"] = "Distance between /A LYS 6 NZ and /A GLU 64 OE1: 2.806Å"
+    structured = json.loads(asyncio.run(chimerax_mcp_server.measure_distance(":6@NZ", ":64@OE1")))
+    assert structured["distance"] == 2.806
+
+    text = asyncio.run(chimerax_mcp_server.measure_distance(":6@NZ", ":64@OE1", structured=False))
+    assert text.startswith("Distance between")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark harness.
+"""
+
+import threading
+
+import benchmark
+import chimerax_mcp_server
+
+
+def test_direct_scenarios():
+    """Every in-process scenario runs and reports latency and memory"""
+    results = benchmark.run_benchmarks(latency=0, response_bytes=5000,
+                                       iterations=20, clients=4, stdio=False)
+    scenarios = {r["scenario"]: r for r in results["scenarios"]}
+    assert set(scenarios) == {
+        "single_call", "cached_query", "large_response", "batch", "concurrent"
+    }
+    assert scenarios["batch"]["ops"] == 20
+    assert scenarios["concurrent"]["calls"] == 20
+    for result in scenarios.values():
+        assert result["p50_ms"] <= result["p99_ms"]
+        assert result["peak_kb"] > 0
+    assert results["settings"]["response_bytes"] == 5000
+
+
+def test_compare_flags_regressions():
+    """Slower percentiles or lower throughput beyond the tolerance are reported"""
+    def run(p50, p99, rate):
+        return {"scenarios": [{"scenario": "single_call", "p50_ms": p50,
+                               "p99_ms": p99, "ops_per_sec": rate}]}
+
+    baseline = run(1.0, 2.0, 1000)
+    assert benchmark.compare(run(1.1, 2.1, 950), baseline) == []
+    regressions = benchmark.compare(run(1.5, 2.0, 700), baseline)
+    assert regressions == [
+        "single_call: p50_ms 1.0 -> 1.5",
+        "single_call: ops_per_sec 1000 -> 700",
+    ]
+
+
+def test_module_state_is_restored():
+    """A run leaves the server's config, pool and threads as it found them"""
+    config = dict(chimerax_mcp_server.DEFAULT_CONFIG)
+    state = (chimerax_mcp_server._pool, chimerax_mcp_server._executor)
+    threads = set(threading.enumerate())
+    benchmark.run_benchmarks(latency=0, response_bytes=100, iterations=5,
+                             clients=2, stdio=False)
+    assert chimerax_mcp_server.DEFAULT_CONFIG == config
+    assert (chimerax_mcp_server._pool, chimerax_mcp_server._executor) == state
+    leaked = [t for t in set(threading.enumerate()) - threads if t.name.startswith("chimerax")]
+    assert leaked == []
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for session checkpoints and restore.
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, InstancePool, SessionCheckpointer, SessionLog
+from fake_chimerax_server import FakeChimeraXServer
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    fake = FakeChimeraXServer().start()
+    fake.file_outputs["save"] = "session"
+    client = ChimeraXClient(fake.url, session_log=SessionLog())
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([client]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setattr(chimerax_mcp_server, "_checkpointer", None)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "structure_cache_mb", 0)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "scene_sync_interval", 0)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "checkpoint_interval", 0)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "checkpoint_dir", str(tmp_path))
+    yield fake
+    fake.stop()
+
+
+def test_session_log_keeps_scene_changes():
+    """Neutral commands are left out and visual commands replace earlier ones"""
+    log = SessionLog()
+    log.record("open 1ubq ; echo marker")
+    log.record("color #1 red")
+    log.record("info models")
+    log.record("color #1 blue")
+    log.record("select :10")
+    log.record("color sel green")
+    log.record("select :20")
+    log.record("color sel green")
+    assert log.commands() == [
+        "open 1ubq", "color #1 blue", "select :10", "color sel green",
+        "select :20", "color sel green",
+    ]
+
+    mark = log.mark()
+    log.record("style #1 stick")
+    log.trim(mark)
+    assert log.commands() == ["style #1 stick"]
+    with log.suspended():
+        log.record("close")
+    assert len(log) == 1
+
+
+def test_checkpoint_and_restore(server, tmp_path):
+    """Restore opens the latest checkpoint and replays only the tail"""
+    client = chimerax_mcp_server.get_client()
+    checkpointer = SessionCheckpointer(client, tmp_path, interval=0, keep=2)
+    client.execute("open 1ubq")
+    client.execute("color #1 red")
+
+    first = checkpointer.checkpoint()
+    assert len(client.session_log) == 0
+    client.execute("style #1 stick")
+    client.execute_batch(["cartoon hide", "fail here", "color #1 blue"], stop_on_error=False)
+    checkpointer.checkpoint()
+    client.execute("turn y 90")
+    latest = checkpointer.checkpoint()
+    # Only the two newest checkpoints are kept
+    assert len(list(tmp_path.iterdir())) == 2
+    assert not Path(first["path"]).exists() and Path(latest["path"]).exists()
+
+    client.execute("show #1 atoms")
+    client.execute("hide #1 atoms")
+    server.commands.clear()
+    result = checkpointer.restore()
+    assert result["checkpoint"] == latest["path"]
+    assert result["replayed"] == 1 and result["errors"] == []
+    assert server.commands[0] == f"open {latest['path']}"
+    assert server.commands[1].startswith("hide #1 atoms ; echo")
+    # The replay is not logged a second time
+    assert client.session_log.commands() == ["hide #1 atoms"]
+
+
+def test_restore_without_checkpoint_replays_everything(server, tmp_path):
+    """Without a checkpoint the session is closed and the whole log replayed"""
+    client = chimerax_mcp_server.get_client()
+    checkpointer = SessionCheckpointer(client, tmp_path, interval=0)
+    client.execute("open 1ubq")
+    server.commands.clear()
+
+    result = checkpointer.restore()
+    assert result["checkpoint"] is None and result["replayed"] == 1
+    assert server.commands[0] == "close session"
+
+
+def test_periodic_checkpoint_after_many_changes(server, tmp_path):
+    """Enough logged changes trigger a checkpoint before the interval"""
+    client = chimerax_mcp_server.get_client()
+    checkpointer = SessionCheckpointer(client, tmp_path, interval=60, max_commands=3)
+    checkpointer.start()
+    try:
+        for n in range(3):
+            client.execute(f"open structure{n}.pdb")
+        deadline = time.monotonic() + 5
+        while checkpointer.checkpoints == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        checkpointer.stop()
+    assert checkpointer.checkpoints == 1
+    assert len(client.session_log) == 0
+
+
+def test_tools(server):
+    """checkpoint_session and restore_session report what they did"""
+    asyncio.run(chimerax_mcp_server.open_structure("1ubq"))
+    saved = json.loads(asyncio.run(chimerax_mcp_server.checkpoint_session()))
+    asyncio.run(chimerax_mcp_server.color_structure("#1", "red"))
+
+    result = json.loads(asyncio.run(chimerax_mcp_server.restore_session()))
+    assert result["checkpoint"] == saved["path"]
+    assert result["replayed"] == 1
+
+    status = json.loads(chimerax_mcp_server.get_instance_status())
+    assert status["checkpoints"]["restores"] == 1
+
+
+def test_status_does_not_start_checkpoints(server):
+    """get_instance_status reports checkpoints only once they exist"""
+    status = json.loads(chimerax_mcp_server.get_instance_status())
+    assert "checkpoints" not in status
+    assert chimerax_mcp_server._checkpointer is None
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Tests for the ChimeraX REST client.
+
+Runs against fake_chimerax_server.py, so no ChimeraX installation is needed.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, ChimeraXError
+from fake_chimerax_server import FakeChimeraXServer
+
+
+@pytest.fixture
+def server():
+    fake = FakeChimeraXServer().start()
+    yield fake
+    fake.stop()
+
+
+def test_run_returns_output(server):
+    """Commands are sent to /run and their text is returned"""
+    client = ChimeraXClient(server.url)
+    assert client.run("version").startswith("UCSF ChimeraX")
+    assert client.run("echo hello world") == "hello world"
+    assert server.commands == ["version", "echo hello world"]
+
+
+def test_connections_are_reused(server):
+    """Consecutive commands share one keep-alive connection"""
+    client = ChimeraXClient(server.url, pool_size=2)
+    for _ in range(10):
+        client.run("version")
+
+    stats = client.get_stats()
+    assert stats["commands_sent"] == 10
+    assert stats["http_requests"] == 10
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 9
+    assert len(server.connections) == 1
+
+
+def test_command_error_raises(server):
+    """HTTP errors from ChimeraX become ChimeraXError"""
+    client = ChimeraXClient(server.url)
+    with pytest.raises(ChimeraXError):
+        client.run("fail now")
+    assert client.get_stats()["errors"] == 1
+
+
+def test_connection_refused():
+    """An unreachable server gives the usual connection message"""
+    client = ChimeraXClient("http://127.0.0.1:9", connect_timeout=1)
+    with pytest.raises(ChimeraXError, match="Cannot connect to ChimeraX"):
+        client.run("version")
+
+
+def test_config_overrides(tmp_path, monkeypatch):
+    """Pool and timeout settings are read from chimerax_mcp_config.json"""
+    config_file = tmp_path / "chimerax_mcp_config.json"
+    config_file.write_text(json.dumps({
+        "port": 6000, "pool_size": 8, "read_timeout": 120, "unknown": 1
+    }))
+    monkeypatch.setattr(chimerax_mcp_server, "__file__", str(tmp_path / "server.py"))
+
+    config = chimerax_mcp_server.load_config()
+    assert config["port"] == 6000
+    assert config["pool_size"] == 8
+    assert config["read_timeout"] == 120
+    assert config["connect_timeout"] == chimerax_mcp_server.DEFAULT_CONFIG["connect_timeout"]
+    assert "unknown" not in config
+
+
+@pytest.fixture
+def shared_client(server, monkeypatch):
+    """Point the module-level client used by the MCP tools at the fake server"""
+    pool = chimerax_mcp_server.InstancePool([ChimeraXClient(server.url)])
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", pool)
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "structure_cache_mb", 0)
+    return server
+
+
+def test_async_tools_do_not_block(shared_client):
+    """A slow open does not hold up a quick query running alongside it"""
+    shared_client.delays["open"] = 0.5
+    finished = []
+
+    async def call(name, coro):
+        await coro
+        finished.append(name)
+
+    async def main():
+        await asyncio.gather(
+            call("open", chimerax_mcp_server.open_structure("1ubq")),
+            call("info", chimerax_mcp_server.get_model_info()),
+        )
+
+    asyncio.run(main())
+    assert finished == ["info", "open"]
+
+
+def test_async_command_errors(shared_client):
+    """Tool handlers still turn ChimeraX errors into messages"""
+    result = asyncio.run(chimerax_mcp_server.run_command("fail"))
+    assert result.startswith("Error:")
+
+
+def test_batch_single_request(shared_client):
+    """A batch goes out as one command line and output is split per command"""
+    results = chimerax_mcp_server.execute_chimerax_commands(
+        ["version", "color #1 red", "echo done"]
+    )
+    assert len(shared_client.commands) == 1
+    assert [r["status"] for r in results] == ["ok", "ok", "ok"]
+    assert results[0]["output"].startswith("UCSF ChimeraX")
+    assert results[1]["output"] == ""
+    assert results[2]["output"] == "done"
+
+
+def test_batch_stop_on_error(shared_client):
+    """By default commands after a failure are skipped"""
+    results = chimerax_mcp_server.execute_chimerax_commands(
+        ["echo one", "fail here", "echo three"]
+    )
+    assert [r["status"] for r in results] == ["ok", "error", "skipped"]
+    assert "Unknown command: fail here" in results[1]["output"]
+    assert len(shared_client.commands) == 1
+
+
+def test_batch_continue_on_error(shared_client):
+    """With stop_on_error=False the remaining commands are resent"""
+    results = chimerax_mcp_server.execute_chimerax_commands(
+        ["echo one", "fail here", "echo three"], stop_on_error=False
+    )
+    assert [r["status"] for r in results] == ["ok", "error", "ok"]
+    assert results[2]["output"] == "three"
+    assert len(shared_client.commands) == 2
+
+
+def test_run_commands_tool(shared_client):
+    """The run_commands tool reports a summary and per-command results"""
+    result = json.loads(asyncio.run(chimerax_mcp_server.run_commands(["version", "fail"])))
+    assert result["summary"] == {"ok": 1, "error": 1, "skipped": 0}
+
+
+def test_cache_read_only_queries(shared_client):
+    """Repeated queries are answered from the cache until the scene changes"""
+    execute = chimerax_mcp_server.execute_chimerax_command
+    assert execute("version").startswith("UCSF")
+    assert execute("version").startswith("UCSF")
+    execute("info  models")
+    execute("info models")
+    assert shared_client.commands == ["version", "info  models"]
+
+    execute("view")
+    execute("info models")
+    assert len(shared_client.commands) == 3
+
+    execute("open 1ubq")
+    execute("info models")
+    assert shared_client.commands[-2:] == ["open 1ubq", "info models"]
+
+    stats = chimerax_mcp_server.get_client().cache.get_stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 3
+
+
+def test_moving_models_invalidates_cache(shared_client):
+    """Coordinates queried after moving a model are not answered from the cache"""
+    execute = chimerax_mcp_server.execute_chimerax_command
+    execute("info atoms #1@CA")
+    execute("move x 10")
+    execute("info atoms #1@CA")
+    assert shared_client.commands.count("info atoms #1@CA") == 1
+
+    execute("move x 10 models #1")
+    execute("info atoms #1@CA")
+    assert shared_client.commands.count("info atoms #1@CA") == 2
+
+
+def test_cache_bounds():
+    """Entries expire after the TTL and the LRU entry is evicted when full"""
+    cache = chimerax_mcp_server.ResultCache(max_size=2, ttl=60)
+    for command in ("info a", "info b", "info c"):
+        cache.store(command, command, cache.lookup(command)[1])
+    assert cache.lookup("info a")[0] is None
+    assert cache.lookup("info c")[0] == "info c"
+
+    cache.ttl = 0
+    time.sleep(0.01)
+    assert cache.lookup("info c")[0] is None
+
+
+def test_cache_skips_batches_and_stale_results():
+    """Multi-command lines are not cached and invalidation beats late stores"""
+    cache = chimerax_mcp_server.ResultCache()
+    assert not cache.is_cacheable("info models ; echo x")
+    assert cache.invalidates("info models ; close")
+
+    assert not cache.invalidates("turn y 90 ; view ; zoom 2 ; view matrix camera 1,0,0,0")
+    assert cache.invalidates("turn y 90 models #1")
+    assert cache.invalidates("view matrix models #1,1,0,0,5")
+    assert cache.invalidates("view front")
+
+    _, generation = cache.lookup("info models")
+    cache.invalidate()
+    cache.store("info models", "stale", generation)
+    assert cache.lookup("info models")[0] is None
+
+
+def test_coalesce_keys():
+    """Only commands overwritten by a later command share a key"""
+    key = chimerax_mcp_server.coalesce_key
+    assert key("color #1 red") == key("color #1 bychain")
+    assert key("color #1 red") != key("color #1 red target c")
+    assert key("show #1 atoms") == key("hide #1 atoms")
+    assert key("show #1 atoms") != key("show #1 cartoons")
+    assert key("color red") is None
+    assert key("open 1ubq") is None
+    assert key("color #1 red ; close") is None
+    # Partial schemes recolor only some atoms
+    assert key("color #1 byhetero") is None
+    assert key("color #1 fromatoms target c") is None
+
+
+def test_coalescing_drops_superseded_commands(shared_client, monkeypatch):
+    """Buffered visual commands are flushed as one batch before a query"""
+    client = chimerax_mcp_server.get_client()
+    coalescer = chimerax_mcp_server.CommandCoalescer(
+        60, lambda commands: client.execute_batch(commands, stop_on_error=False)
+    )
+    monkeypatch.setattr(chimerax_mcp_server, "_coalescer", coalescer)
+
+    asyncio.run(chimerax_mcp_server.color_structure("#1", "red"))
+    asyncio.run(chimerax_mcp_server.show_style("#1", "atoms"))
+    asyncio.run(chimerax_mcp_server.color_structure("#1", "bychain"))
+    assert shared_client.commands == []
+
+    asyncio.run(chimerax_mcp_server.get_model_info("#1"))
+    assert len(shared_client.commands) == 2
+    batch = shared_client.commands[0]
+    assert "show #1 atoms" in batch and "color #1 bychain" in batch
+    assert "color #1 red" not in batch
+    assert shared_client.commands[1] == "info models #1"
+    assert coalescer.get_stats()["dropped"] == 1
+
+
+def test_partial_color_keeps_earlier_color(shared_client, monkeypatch):
+    """A byhetero recolor is sent after the full color it refines"""
+    client = chimerax_mcp_server.get_client()
+    coalescer = chimerax_mcp_server.CommandCoalescer(
+        60, lambda commands: client.execute_batch(commands, stop_on_error=False)
+    )
+    monkeypatch.setattr(chimerax_mcp_server, "_coalescer", coalescer)
+
+    asyncio.run(chimerax_mcp_server.color_structure("#1", "red"))
+    asyncio.run(chimerax_mcp_server.color_structure("#1", "byhetero"))
+    coalescer.flush()
+    sent = " ; ".join(shared_client.commands)
+    assert sent.index("color #1 red") < sent.index("color #1 byhetero")
+    assert chimerax_mcp_server.compile_macro(["color #1 red", "color #1 byhetero"]) == [
+        "color #1 red", "color #1 byhetero"
+    ]
+
+
+def test_job_on_session_instance_flushes_coalescer(shared_client, monkeypatch):
+    """A job sharing the only instance runs after pending visual commands"""
+    client = chimerax_mcp_server.get_client()
+    coalescer = chimerax_mcp_server.CommandCoalescer(
+        60, lambda commands: client.execute_batch(commands, stop_on_error=False)
+    )
+    monkeypatch.setattr(chimerax_mcp_server, "_coalescer", coalescer)
+
+    asyncio.run(chimerax_mcp_server.color_structure("#1", "red"))
+    asyncio.run(chimerax_mcp_server.run_job(["save x.png"]))
+    assert len(shared_client.commands) == 2
+    assert shared_client.commands[0].startswith("color #1 red")
+    assert shared_client.commands[1].startswith("save x.png")
+
+
+def test_coalescing_window_and_errors(shared_client, monkeypatch):
+    """The window flushes on its own and deferred failures are reported later"""
+    client = chimerax_mcp_server.get_client()
+    coalescer = chimerax_mcp_server.CommandCoalescer(
+        0.05, lambda commands: client.execute_batch(["fail " + c for c in commands], False)
+    )
+    monkeypatch.setattr(chimerax_mcp_server, "_coalescer", coalescer)
+
+    chimerax_mcp_server.execute_chimerax_command("color #1 red")
+    time.sleep(0.3)
+    assert len(shared_client.commands) == 1
+
+    result = chimerax_mcp_server.execute_chimerax_command("version")
+    assert "Deferred command 'fail color #1 red' failed" in result
+    assert result.endswith("(fake)")
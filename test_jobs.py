@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for long-running tools: progress notifications and background jobs.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, InstancePool
+from fake_chimerax_server import FakeChimeraXServer
+
+
+class RecordingContext:
+    """Stands in for the MCP Context, recording progress notifications"""
+
+    def __init__(self):
+        self.progress = []
+
+    async def report_progress(self, progress, total=None, message=None):
+        self.progress.append((progress, total, message))
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeChimeraXServer().start()
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([ChimeraXClient(fake.url)]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setattr(chimerax_mcp_server, "background_jobs",
+                        chimerax_mcp_server.BackgroundJobManager())
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "progress_interval", 0.1)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "structure_cache_mb", 0)
+    yield fake
+    fake.stop()
+
+
+def test_progress_while_waiting(server):
+    """A slow render sends elapsed-time progress notifications"""
+    server.delays["save"] = 0.35
+    ctx = RecordingContext()
+    result = asyncio.run(chimerax_mcp_server.save_image("out.png", ctx=ctx))
+
+    assert result == "Image saved to out.png"
+    assert len(ctx.progress) >= 2
+    assert all("Rendering out.png" in message for _, _, message in ctx.progress)
+    assert ctx.progress[-1][0] > ctx.progress[0][0]
+
+
+def test_background_job_lifecycle(server):
+    """Background jobs return a handle and can be polled until done"""
+    server.delays["open"] = 0.2
+    message = asyncio.run(chimerax_mcp_server.open_structure("1ubq", background=True))
+    job_id = message.split()[3]
+
+    status = json.loads(chimerax_mcp_server.get_job_status(job_id))
+    assert status["status"] == "running"
+    assert status["stage"] == "Opening 1ubq"
+
+    time.sleep(0.4)
+    status = json.loads(chimerax_mcp_server.get_job_status(job_id))
+    assert status["status"] == "done"
+    assert status["result"] == "Successfully opened 1ubq from pdb"
+    assert len(json.loads(chimerax_mcp_server.get_job_status())) == 1
+
+
+def test_background_job_failure(server):
+    """Errors from ChimeraX are reported on the job"""
+    job = chimerax_mcp_server.background_jobs.submit(
+        "Failing", chimerax_mcp_server.execute_chimerax_command, "fail"
+    )
+    job.future.result()
+    assert job.to_dict()["status"] == "failed"
+    assert "error" in job.to_dict()
+
+
+def test_cancel_job(server):
+    """Cancelled jobs discard their result"""
+    server.delays["clashes"] = 0.3
+    message = asyncio.run(chimerax_mcp_server.find_clashes("#1", background=True))
+    job_id = message.split()[3]
+
+    cancelled = json.loads(chimerax_mcp_server.cancel_job(job_id))
+    assert cancelled["status"] == "cancelled"
+    time.sleep(0.4)
+    status = json.loads(chimerax_mcp_server.get_job_status(job_id))
+    assert status["status"] == "cancelled"
+    assert "result" not in status
+    assert chimerax_mcp_server.cancel_job("nope").startswith("Error")
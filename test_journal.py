@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for the command journal and macro compilation.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import (
+    ChimeraXClient, ChimeraXError, CommandJournal, InstancePool, compile_macro
+)
+from fake_chimerax_server import FakeChimeraXServer
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    fake = FakeChimeraXServer().start()
+    client = ChimeraXClient(fake.url, retries=0, journal=CommandJournal(tmp_path / "journal.jsonl"))
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([client]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "structure_cache_mb", 0)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "scene_sync_interval", 0)
+    yield fake
+    fake.stop()
+
+
+def test_compile_macro_drops_superseded_commands():
+    """Queries, overridden visuals and camera moves are left out"""
+    history = [
+        "open 1abc",
+        "close session",
+        "open 1ubq ; info models",
+        "color #1 red",
+        "style #1 stick",
+        "color #1 blue ; style #1 sphere",
+        "turn y 90",
+        "view name front",
+        "move x 5 models #1",
+        "view orient",
+        "turn x 10",
+        "save ~/scene.png",
+    ]
+    assert compile_macro(history) == [
+        "close session",
+        "open 1ubq",
+        "color #1 blue",
+        "style #1 sphere",
+        "view name front",
+        "move x 5 models #1",
+        "view orient",
+        "turn x 10",
+    ]
+
+
+def test_journal_records_commands(server, tmp_path):
+    """Commands sent are journaled with status, timing and batch progress"""
+    client = chimerax_mcp_server.get_client()
+    client.execute("open 1ubq")
+    client.execute("version")
+    client.execute("version")  # Cached, so not sent
+    with pytest.raises(ChimeraXError):
+        client.execute("fail")
+    client.execute_batch(["color #1 red", "fail now", "style #1 stick"], stop_on_error=False)
+
+    entries = client.journal.read()
+    assert [(e["seq"], e["command"], e["status"]) for e in entries] == [
+        (1, "open 1ubq", "ok"),
+        (2, "version", "ok"),
+        (3, "fail", "error"),
+        (4, "color #1 red ; fail now ; style #1 stick", "error"),
+        (5, "style #1 stick", "ok"),
+    ]
+    assert entries[3]["completed"] == 1
+    assert all(e["url"] == server.url and e["seconds"] >= 0 for e in entries)
+
+    # A new journal on the same file carries on numbering
+    journal = CommandJournal(tmp_path / "journal.jsonl")
+    journal.record("close", server.url, "ok", 0.01)
+    assert journal.read(6)[0]["seq"] == 6
+    assert [e["seq"] for e in journal.read(2, 3)] == [2, 3]
+
+
+def test_internal_traffic_is_not_journaled(server, tmp_path):
+    """Scene syncs and checkpoint saves and restores stay out of the journal"""
+    server.file_outputs["save"] = "session"
+    client = ChimeraXClient(server.url, session_log=chimerax_mcp_server.SessionLog(),
+                            journal=CommandJournal(tmp_path / "internal.jsonl"))
+    client.execute("open 1ubq")
+    client.scene.sync()
+    checkpointer = chimerax_mcp_server.SessionCheckpointer(
+        client, tmp_path / "checkpoints", interval=0
+    )
+    checkpointer.checkpoint()
+    checkpointer.restore()
+    assert [e["command"] for e in client.journal.read()] == ["open 1ubq"]
+
+
+def test_journal_rotates(tmp_path):
+    """A full journal moves to <name>.1 and numbering carries on"""
+    path = tmp_path / "journal.jsonl"
+    journal = CommandJournal(path, max_bytes=1000)
+    for n in range(30):
+        journal.record(f"open {n}", "http://127.0.0.1:1", "ok", 0.01)
+    old = tmp_path / "journal.jsonl.1"
+    assert old.exists() and old.stat().st_size < 1200
+    assert path.stat().st_size < 1000
+
+    # Ranges span both files; entries from earlier rotations are gone
+    entries = journal.read()
+    assert [e["seq"] for e in entries] == list(range(entries[0]["seq"], 31))
+    assert entries[0]["seq"] > 1
+    assert [e["seq"] for e in journal.read(28, 29)] == [28, 29]
+    assert CommandJournal(path, max_bytes=1000)._last_seq() == 30
+
+
+def test_compile_journal_tool(server, tmp_path):
+    """compile_journal writes a minimal script and can replay it"""
+    async def build_scene():
+        await chimerax_mcp_server.open_structure("1ubq")
+        await chimerax_mcp_server.color_structure("#1", "red")
+        await chimerax_mcp_server.get_model_info("#1")
+        await chimerax_mcp_server.color_structure("#1", "green")
+        await chimerax_mcp_server.run_commands(["style #1 stick", "fail", "show #1 atoms"], False)
+
+    asyncio.run(build_scene())
+    script = tmp_path / "scene.cxc"
+    result = json.loads(asyncio.run(chimerax_mcp_server.compile_journal(output_path=str(script))))
+    assert result["commands_out"] < result["commands_in"]
+    lines = script.read_text().splitlines()
+    assert lines[-3:] == ["color #1 green", "style #1 stick", "show #1 atoms"]
+    assert not any(line.startswith(("info", "color #1 red", "fail")) for line in lines)
+
+    server.commands.clear()
+    result = json.loads(asyncio.run(chimerax_mcp_server.compile_journal(first=2, run=True)))
+    assert result["first"] == 2 and result["errors"] == []
+    assert len(server.commands) == 1
+    # Entry 1 (the open) is outside the range
+    assert server.commands[0].startswith("color #1 green ; echo")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for command and tool timing metrics.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, ChimeraXError, InstancePool, ServerMetrics
+from fake_chimerax_server import FakeChimeraXServer
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeChimeraXServer().start()
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([ChimeraXClient(fake.url)]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "scene_sync_interval", 0)
+    chimerax_mcp_server.server_metrics.reset()
+    yield fake
+    fake.stop()
+
+
+def test_command_metrics(server):
+    """Commands are timed per verb with bytes, connections and errors"""
+    metrics = ServerMetrics()
+    client = ChimeraXClient(server.url, metrics=metrics)
+    server.delays["open"] = 0.05
+    client.run("open 1ubq")
+    client.run("echo " + "x" * 1000)
+    client.run("echo hi ; version")
+    with pytest.raises(ChimeraXError):
+        client.run("fail")
+
+    stats = metrics.get_stats()["commands"]
+    assert set(stats) == {"open", "echo", "batch", "fail"}
+    assert stats["open"]["latency"]["p50_ms"] >= 50
+    assert stats["open"]["server"]["p50_ms"] >= 50
+    assert stats["open"]["connections_opened"] == 1
+    assert stats["echo"]["connections_opened"] == 0
+    assert stats["echo"]["bytes_received"] == 1000
+    assert stats["fail"]["errors"] == 1
+
+
+def test_timeouts_counted(server):
+    """Read timeouts are counted separately from errors"""
+    metrics = ServerMetrics()
+    client = ChimeraXClient(server.url, read_timeout=0.05, metrics=metrics)
+    server.delays["wait"] = 0.3
+    with pytest.raises(ChimeraXError, match="timed out"):
+        client.run("wait 10")
+    assert metrics.get_stats()["commands"]["wait"]["timeouts"] == 1
+
+
+def test_tool_metrics_and_stats_tool(server):
+    """Tool calls are timed and server_stats reports JSON or Prometheus text"""
+    asyncio.run(chimerax_mcp_server.run_command("version"))
+    asyncio.run(chimerax_mcp_server.run_command("fail"))
+
+    stats = json.loads(chimerax_mcp_server.server_stats())
+    assert stats["tools"]["run_command"]["count"] == 2
+    assert stats["tools"]["run_command"]["errors"] == 1
+    assert stats["commands"]["version"]["latency"]["count"] == 1
+
+    text = chimerax_mcp_server.server_stats("prometheus", reset=True)
+    assert '# TYPE chimerax_mcp_command_seconds histogram' in text
+    assert 'chimerax_mcp_command_seconds_bucket{verb="version",le="+Inf"} 1' in text
+    assert 'chimerax_mcp_tool_errors_total{tool="run_command"} 1' in text
+    assert json.loads(chimerax_mcp_server.server_stats())["commands"] == {}
+
+
+def test_trace_file(server, tmp_path):
+    """With a trace file every command and tool call is logged as JSON"""
+    trace = tmp_path / "trace.jsonl"
+    chimerax_mcp_server.server_metrics.trace_file = str(trace)
+    try:
+        asyncio.run(chimerax_mcp_server.run_command("echo traced"))
+    finally:
+        chimerax_mcp_server.server_metrics.trace_file = ""
+
+    records = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert [r["type"] for r in records] == ["command", "tool"]
+    assert records[0]["command"] == "echo traced"
+    assert records[0]["bytes_received"] == len("traced")
+    assert records[1]["tool"] == "run_command"
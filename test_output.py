@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for output budgeting and paged retrieval of large results.
+"""
+
+import asyncio
+import json
+import re
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, InstancePool, OutputStore
+from fake_chimerax_server import FakeChimeraXServer
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeChimeraXServer().start()
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([ChimeraXClient(fake.url)]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setattr(chimerax_mcp_server, "_output_store", OutputStore())
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "max_output_chars", 100)
+    yield fake
+    fake.stop()
+
+
+def test_small_output_unchanged(server):
+    """Output within budget is returned as is"""
+    assert asyncio.run(chimerax_mcp_server.run_command("echo hi")) == "hi"
+
+
+def test_large_output_is_paged(server):
+    """Oversized output returns a head and can be paged through by handle"""
+    full = "\n".join(f"atom {i}" for i in range(100))
+    server.responses["info"] = full
+    result = asyncio.run(chimerax_mcp_server.run_command("info atoms"))
+
+    assert result.startswith(full[:100])
+    assert f"showing 100 of {len(full)} characters, 100 lines" in result
+    handle = re.search(r"get_output_page\('(\w+)'", result).group(1)
+
+    pages, offset = [full[:100]], 100
+    while offset is not None:
+        page = json.loads(chimerax_mcp_server.get_output_page(handle, offset, 250))
+        pages.append(page["text"])
+        offset = page["next_offset"]
+    assert "".join(pages) == full
+
+
+def test_run_commands_budgets_each_output(server):
+    """Each batched command's output gets its own budget"""
+    server.responses["info"] = "x" * 500
+    result = json.loads(asyncio.run(chimerax_mcp_server.run_commands(["info", "echo ok"])))
+    assert "output truncated" in result["results"][0]["output"]
+    assert result["results"][1]["output"] == "ok"
+
+
+def test_store_evicts_least_recently_used():
+    """The store stays within its size bound, evicting the LRU output"""
+    store = OutputStore(max_chars=25)
+    first = store.put("a" * 10)
+    second = store.put("b" * 10)
+    store.get(first)
+    store.put("c" * 10)
+    assert store.get(second) is None
+    assert store.get(first) == "a" * 10
+    assert chimerax_mcp_server.get_output_page("missing").startswith("Error")
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Tests for running jobs across several ChimeraX instances.
+
+Each instance is a fake_chimerax_server.py server on its own port.
+"""
+
+import asyncio
+import contextlib
+import json
+import threading
+import time
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, InstancePool
+from fake_chimerax_server import FakeChimeraXServer
+
+
+@pytest.fixture
+def servers(monkeypatch):
+    fakes = [FakeChimeraXServer().start() for _ in range(3)]
+    pool = InstancePool([ChimeraXClient(fake.url) for fake in fakes])
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", pool)
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    yield fakes
+    for fake in fakes:
+        fake.stop()
+
+
+def test_endpoint_urls():
+    """Ports and URLs from the config become base URLs"""
+    assert chimerax_mcp_server.endpoint_url(5901) == "http://127.0.0.1:5901"
+    assert chimerax_mcp_server.endpoint_url("5902") == "http://127.0.0.1:5902"
+    assert chimerax_mcp_server.endpoint_url("http://host:6000/") == "http://host:6000"
+
+
+def test_session_commands_are_pinned(servers):
+    """Regular tool commands always go to the session instance"""
+    for _ in range(5):
+        asyncio.run(chimerax_mcp_server.run_command("color #1 red"))
+    assert len(servers[0].commands) == 5
+    assert servers[1].commands == servers[2].commands == []
+
+
+def test_jobs_spread_over_idle_workers(servers):
+    """Concurrent jobs run in parallel on the worker instances"""
+    for fake in servers:
+        fake.delays["open"] = 0.3
+
+    async def main():
+        return await asyncio.gather(*(
+            chimerax_mcp_server.run_job([f"open {pdb}", "close"])
+            for pdb in ("1ubq", "2ubq", "3ubq", "4ubq")
+        ))
+
+    start = time.monotonic()
+    results = [json.loads(r) for r in asyncio.run(main())]
+    elapsed = time.monotonic() - start
+
+    assert servers[0].commands == []
+    assert len(servers[1].commands) == len(servers[2].commands) == 2
+    assert {r["instance"] for r in results} == {servers[1].url, servers[2].url}
+    assert elapsed < 1.0
+
+
+def test_queued_jobs_leave_threads_for_session(monkeypatch):
+    """Jobs waiting for a worker do not hold the threads session tools need"""
+    fakes = [FakeChimeraXServer().start() for _ in range(2)]
+    pool = InstancePool([ChimeraXClient(fake.url, pool_size=1) for fake in fakes])
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", pool)
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    fakes[1].delays["open"] = 0.5
+
+    async def main():
+        jobs = [asyncio.ensure_future(chimerax_mcp_server.run_job([f"open {n}"]))
+                for n in range(3)]
+        await asyncio.sleep(0.1)
+        start = time.monotonic()
+        await chimerax_mcp_server.run_command("version")
+        elapsed = time.monotonic() - start
+        await asyncio.gather(*jobs)
+        return elapsed
+
+    try:
+        assert asyncio.run(main()) < 0.3
+        assert len(fakes[1].commands) == 3
+    finally:
+        for fake in fakes:
+            fake.stop()
+
+
+def test_instance_status_reports_queue_depth(servers):
+    """Busy instances and waiting jobs show up in the status"""
+    servers[1].delays["open"] = servers[2].delays["open"] = 0.3
+    threads = [
+        threading.Thread(target=chimerax_mcp_server.execute_job, args=(["open x"],))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+
+    status = json.loads(chimerax_mcp_server.get_instance_status())
+    for thread in threads:
+        thread.join()
+
+    assert status["jobs_waiting"] == 1
+    roles = [i["role"] for i in status["instances"]]
+    assert roles == ["session", "worker", "worker"]
+    assert [i["queue_depth"] for i in status["instances"]] == [0, 1, 1]
+    assert all(i["busy"] for i in status["instances"][1:])
+
+
+def test_process_structures(servers):
+    """Each structure runs its rendered script as one job"""
+    result = json.loads(asyncio.run(chimerax_mcp_server.process_structures(
+        ["1ubq", "2ubq", "3ubq"],
+        ["open {id} from {source} id {model}", "echo done {index}", "close {model}"],
+    )))
+
+    assert result["summary"]["total"] == 3
+    assert result["summary"]["ok"] == 3
+    first = result["structures"][0]
+    assert first["id"] == "1ubq"
+    assert first["output"] == {"echo done 0": "done 0"}
+
+    sent = servers[1].commands + servers[2].commands
+    assert len(sent) == 3
+    assert any(c.startswith("open 1ubq from pdb id #1001 ;") for c in sent)
+    assert servers[0].commands == []
+
+
+def test_process_structures_concurrency_is_clamped(servers, monkeypatch):
+    """Asking for more concurrency than instances queues no extra jobs"""
+    pool = chimerax_mcp_server.get_pool()
+    acquire_async = pool.acquire_async
+    active, peak = 0, 0
+
+    @contextlib.asynccontextmanager
+    async def counting_acquire():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        try:
+            async with acquire_async() as instance:
+                yield instance
+        finally:
+            active -= 1
+
+    monkeypatch.setattr(pool, "acquire_async", counting_acquire)
+    result = json.loads(asyncio.run(chimerax_mcp_server.process_structures(
+        [f"{n}ubq" for n in range(6)], max_concurrency=50
+    )))
+    assert result["summary"]["ok"] == 6
+    assert peak == 2
+
+
+def test_process_structures_reports_failures(servers):
+    """A failing command marks only its own structure as failed"""
+    result = json.loads(asyncio.run(chimerax_mcp_server.process_structures(
+        ["echo", "fail"], ["{id} {index}"], max_concurrency=1
+    )))
+    assert result["summary"]["ok"] == 1
+    assert result["summary"]["failed"] == 1
+    assert result["structures"][1]["failed_command"] == "fail 1"
+
+
+def test_failed_structure_is_closed(servers):
+    """Trailing close steps run even after an earlier step fails"""
+    result = json.loads(asyncio.run(chimerax_mcp_server.process_structures(
+        ["1ubq"], ["open {id} id {model}", "fail {index}", "color {model} red", "close {model}"]
+    )))
+    entry = result["structures"][0]
+    assert entry["status"] == "error" and entry["failed_command"] == "fail 0"
+
+    # The close skipped by the failure is sent again on its own
+    sent = servers[1].commands + servers[2].commands
+    assert len(sent) == 2
+    assert sent[0].startswith("open 1ubq id #1001 ;")
+    assert sent[1].startswith("close #1001 ;")
+
+
+def test_process_structures_template_error(servers):
+    """Unknown placeholders are rejected before anything is sent"""
+    result = asyncio.run(chimerax_mcp_server.process_structures(["1ubq"], ["open {pdb}"]))
+    assert result.startswith("Error in script template")
+    assert all(fake.commands == [] for fake in servers)
+
+
+def test_render_frame_commands():
+    """Frame specs turn into view/turn/visibility commands in order"""
+    commands = chimerax_mcp_server.render_frame_commands({
+        "view": "initial", "turn": 30, "show": ["#1"], "hide": ["#2"],
+        "commands": ["lighting soft"], "output": "x.png",
+    })
+    assert commands == ["view", "turn y 30", "show #1 models", "hide #2 models", "lighting soft"]
+    assert chimerax_mcp_server.render_frame_commands({"turn": "x 90"}) == ["turn x 90"]
+
+
+def test_render_series_in_session(servers):
+    """Each frame is one request to the session instance"""
+    frames = [{"turn": 120, "output": f"frame{i}.png"} for i in range(3)]
+    result = json.loads(asyncio.run(chimerax_mcp_server.render_series(frames, 200, 100, 1)))
+
+    assert result["summary"]["ok"] == 3
+    assert [f["frame"] for f in result["frames"]] == [0, 1, 2]
+    assert all("seconds" in f for f in result["frames"])
+    assert len(servers[0].commands) == 3
+    assert servers[0].commands[1].startswith(
+        "turn y 120 ; echo"
+    )
+    assert "save frame1.png width 200 height 100 supersample 1" in servers[0].commands[1]
+
+
+def test_render_series_parallel(servers):
+    """Parallel frames split over workers, which set up and catch up first"""
+    frames = [{"turn": 90, "output": f"f{i}.png"} for i in range(4)]
+    result = json.loads(asyncio.run(chimerax_mcp_server.render_series(
+        frames, parallel=True, setup_commands=["open 1ubq"]
+    )))
+
+    assert result["summary"]["ok"] == 4
+    assert servers[0].commands == []
+    second = next(fake.commands for fake in servers[1:] if "f2.png" in " ".join(fake.commands))
+    # Worker rendering frames 2-3 replays the turns of frames 0-1 after setup
+    assert second[0].startswith("open 1ubq")
+    assert second[0].count("turn y 90") == 2
+    assert {f["instance"] for f in result["frames"]} == {servers[1].url, servers[2].url}
+
+
+def test_render_series_requires_output(servers):
+    """Frames without an output path are rejected up front"""
+    result = asyncio.run(chimerax_mcp_server.render_series([{"turn": 10}]))
+    assert result.startswith("Error")
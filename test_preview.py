@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for inline image previews.
+"""
+
+import asyncio
+import base64
+import os
+from collections import OrderedDict
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, InstancePool
+from fake_chimerax_server import FakeChimeraXServer
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeChimeraXServer().start()
+    fake.file_outputs["save"] = "FAKE-IMAGE-BYTES"
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([ChimeraXClient(fake.url)]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setattr(chimerax_mcp_server, "_preview_cache", OrderedDict())
+    yield fake
+    fake.stop()
+
+
+def test_preview_returns_image_and_cleans_up(server):
+    """The rendered file is returned as image content and then removed"""
+    image = asyncio.run(chimerax_mcp_server.preview_image(2048, 1024))
+    content = image.to_image_content()
+    assert content.mimeType == "image/png"
+    assert base64.b64decode(content.data) == b"FAKE-IMAGE-BYTES"
+
+    command = server.commands[0]
+    assert " width 1024 height 512 supersample 1" in command
+    path = command.split()[1]
+    assert path.endswith(".png")
+    assert not os.path.exists(path)
+
+
+def test_preview_cached_until_scene_changes(server):
+    """Unchanged scenes reuse the last preview; any scene change re-renders"""
+    asyncio.run(chimerax_mcp_server.preview_image())
+    asyncio.run(chimerax_mcp_server.preview_image())
+    asyncio.run(chimerax_mcp_server.get_model_info())
+    asyncio.run(chimerax_mcp_server.preview_image())
+    assert sum(c.startswith("save ") for c in server.commands) == 1
+
+    asyncio.run(chimerax_mcp_server.run_command("turn y 30"))
+    asyncio.run(chimerax_mcp_server.preview_image())
+    assert sum(c.startswith("save ") for c in server.commands) == 2
+
+
+def test_preview_jpeg_and_errors(server):
+    """JPEG previews pass a quality setting, bad formats are rejected"""
+    image = asyncio.run(chimerax_mcp_server.preview_image(format="jpeg", max_dimension=0))
+    assert image.to_image_content().mimeType == "image/jpeg"
+    assert "width 1024 height 768" in server.commands[-1]
+    assert " quality 85" in server.commands[-1]
+
+    result = asyncio.run(chimerax_mcp_server.preview_image(format="gif"))
+    assert result.startswith("Error")
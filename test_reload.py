@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Tests for reloading the configuration while the server runs.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ConfigWatcher, apply_config, get_client
+from fake_chimerax_server import FakeChimeraXServer
+
+
+@pytest.fixture
+def config(monkeypatch, tmp_path):
+    """Config file in tmp_path, with nothing built from an earlier one."""
+    path = tmp_path / "chimerax_mcp_config.json"
+    monkeypatch.setattr(chimerax_mcp_server, "config_path", lambda: path)
+    monkeypatch.delenv("CHIMERAX_URL", raising=False)
+    for name in ("_pool", "_coalescer", "_executor", "CHIMERAX_URL", "_supervisor",
+                 "_checkpointer", "_structure_cache", "_prefetcher"):
+        monkeypatch.setattr(chimerax_mcp_server, name, None)
+    monkeypatch.setattr(chimerax_mcp_server, "_pool_config", {})
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "structure_cache_mb", 0)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "scene_sync_interval", 0)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "journal", False)
+
+    def write(**settings):
+        path.write_text(json.dumps(settings))
+
+    return write
+
+
+@pytest.fixture
+def servers():
+    started = [FakeChimeraXServer().start(), FakeChimeraXServer().start()]
+    yield started
+    for server in started:
+        server.stop()
+
+
+def test_new_port_takes_effect(config, servers):
+    """After a port change later commands go to the new ChimeraX"""
+    first, second = servers
+    config(port=first.port)
+    asyncio.run(chimerax_mcp_server.run_command("echo one"))
+
+    config(port=second.port)
+    result = json.loads(asyncio.run(chimerax_mcp_server.reload_config()))
+    assert result["changed"] == ["port"]
+    assert result["rebuilt"] == ["pool"]
+    assert result["session_url"] == second.url
+
+    asyncio.run(chimerax_mcp_server.run_command("echo two"))
+    assert first.commands == ["echo one"]
+    assert second.commands == ["echo two"]
+
+
+def test_in_flight_request_finishes_on_old_settings(config, servers):
+    """A request running during a reload completes on the old client"""
+    first, second = servers
+    first.delays["wait"] = 0.3
+    config(port=first.port, read_timeout=30)
+    old = get_client()
+    results = []
+    request = threading.Thread(target=lambda: results.append(old.execute("wait 1")))
+    request.start()
+    time.sleep(0.1)
+
+    config(port=second.port, read_timeout=12)
+    apply_config()
+    new = get_client()
+    assert new is not old and new.read_timeout == 12
+    assert old.in_flight == 1 and old.read_timeout == 30
+    request.join(5)
+    assert results == [""]
+    assert first.commands == ["wait 1"] and second.commands == []
+
+
+def test_same_instance_keeps_session_log(config, servers):
+    """Rebuilding for the same ChimeraX keeps the command log"""
+    config(port=servers[0].port, cache_size=16)
+    old = get_client()
+    old.execute("open 1ubq")
+
+    config(port=servers[0].port, cache_size=32)
+    result = apply_config()
+    assert result["changed"] == ["cache_size"]
+    assert get_client() is not old
+    assert get_client().session_log is old.session_log
+    assert get_client().session_log.commands() == ["open 1ubq"]
+
+    # Settings read on each use need no rebuild
+    config(port=servers[0].port, cache_size=32, max_output_chars=500)
+    assert apply_config()["rebuilt"] == []
+
+
+def test_rebuilt_pool_keeps_journal(config, servers, tmp_path):
+    """A rebuilt pool writes to the same journal, so numbering carries on"""
+    journal_file = str(tmp_path / "journal.jsonl")
+    config(port=servers[0].port, journal=True, journal_file=journal_file)
+    old = get_client()
+    old.execute("open 1ubq")
+
+    config(port=servers[1].port, journal=True, journal_file=journal_file)
+    apply_config()
+    get_client().execute("open 2ubq")
+    old.execute("color #1 red")  # A request finishing on the old pool
+    assert get_client().journal is old.journal
+    assert [e["seq"] for e in old.journal.read()] == [1, 2, 3]
+
+
+def test_watcher_skips_unreadable_file(config, servers, tmp_path):
+    """The watcher applies saved changes but not a half-written file"""
+    config(port=servers[0].port)
+    get_client()
+    watcher = ConfigWatcher(tmp_path / "chimerax_mcp_config.json", interval=0)
+    assert not watcher.check()
+
+    (tmp_path / "chimerax_mcp_config.json").write_text('{"port": ')
+    assert not watcher.check()
+    assert "Cannot read" in watcher.last_error
+    assert get_client().base_url == servers[0].url
+
+    config(port=servers[1].port)
+    assert watcher.check()
+    assert watcher.last_result["changed"] == ["port"]
+    assert get_client().base_url == servers[1].url
+
+
+def test_watcher_skips_wrong_types(config, servers, tmp_path):
+    """Settings of the wrong type are reported and leave the pool as it was"""
+    config(port=servers[0].port)
+    old = get_client()
+    watcher = ConfigWatcher(tmp_path / "chimerax_mcp_config.json", interval=0)
+
+    config(port=servers[1].port, verb_timeouts=None)
+    assert not watcher.check()
+    assert "verb_timeouts must be dict" in watcher.last_error
+    config(port=servers[1].port, pool_size="8")
+    assert not watcher.check()
+    assert "pool_size must be int" in watcher.last_error
+    assert get_client() is old
+
+    config(port=servers[1].port, pool_size=8)
+    assert watcher.check()
+    assert watcher.last_error is None
+    assert get_client().base_url == servers[1].url
+
+
+def test_watcher_survives_apply_errors(tmp_path):
+    """Unexpected errors while applying are recorded and the thread keeps running"""
+    path = tmp_path / "chimerax_mcp_config.json"
+    calls = []
+
+    def apply():
+        calls.append(path.read_text())
+        if len(calls) == 1:
+            raise AttributeError("boom")
+        return {"changed": ["pool_size"]}
+
+    watcher = ConfigWatcher(path, interval=0.02, apply=apply)
+    watcher.start()
+    try:
+        path.write_text('{"pool_size": 1}')
+        deadline = time.monotonic() + 5
+        while watcher.last_error is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert watcher.last_error == "AttributeError: boom"
+        assert watcher._thread.is_alive()
+
+        path.write_text('{"pool_size": 2}')
+        while watcher.reloads == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert watcher.reloads == 1 and watcher.last_error is None
+    finally:
+        watcher.stop()
+
+
+def test_concurrent_reloads_build_one_pool(config, servers, monkeypatch):
+    """Two reloads at once do not both rebuild from the same old pool"""
+    config(port=servers[0].port)
+    old = get_client()
+    build_pool = chimerax_mcp_server.build_pool
+    builds = []
+
+    def slow_build_pool(*args, **kwargs):
+        builds.append(args[1])
+        time.sleep(0.2)
+        return build_pool(*args, **kwargs)
+
+    monkeypatch.setattr(chimerax_mcp_server, "build_pool", slow_build_pool)
+    config(port=servers[1].port)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(apply_config()))
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert builds == [servers[1].url]
+    assert sorted(r["rebuilt"] for r in results) == [[], ["pool"]]
+    assert get_client() is not old and get_client().base_url == servers[1].url
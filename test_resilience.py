@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for connection retries and the circuit breaker.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import (
+    ChimeraXClient, ChimeraXConnectionError, ChimeraXUnavailableError, InstancePool,
+)
+from fake_chimerax_server import FakeChimeraXServer
+
+
+@pytest.fixture
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def servers():
+    started = []
+    yield started
+    for server in started:
+        server.stop()
+
+
+def start_server(port, servers):
+    server = FakeChimeraXServer(port).start()
+    servers.append(server)
+    return server
+
+
+def test_only_read_only_commands_are_retried(free_port):
+    """Queries are resent after connection errors, scene changes are not"""
+    client = ChimeraXClient(f"http://127.0.0.1:{free_port}", retries=2,
+                            retry_backoff=0.01, breaker_threshold=100)
+    with pytest.raises(ChimeraXConnectionError, match="Cannot connect"):
+        client.run("info models")
+    assert client.get_stats()["commands_sent"] == 3
+    assert client.get_stats()["retries"] == 2
+
+    with pytest.raises(ChimeraXConnectionError):
+        client.run("open 1ubq")
+    assert client.get_stats()["commands_sent"] == 4
+
+
+def test_retry_rides_out_restart(free_port, servers):
+    """A query sent while ChimeraX restarts succeeds once it is back"""
+    client = ChimeraXClient(f"http://127.0.0.1:{free_port}", retries=6,
+                            retry_backoff=0.1, breaker_threshold=100)
+    timer = threading.Timer(0.1, start_server, (free_port, servers))
+    timer.start()
+    assert client.run("version").startswith("UCSF ChimeraX")
+    timer.join()
+    assert client.get_stats()["retries"] >= 1
+
+
+def test_breaker_fails_fast_and_recovers(free_port, servers):
+    """Repeated connection errors open the breaker until a probe succeeds"""
+    client = ChimeraXClient(f"http://127.0.0.1:{free_port}", retries=0,
+                            breaker_threshold=2, probe_interval=0.1)
+    for _ in range(2):
+        with pytest.raises(ChimeraXConnectionError):
+            client.run("open 1ubq")
+
+    with pytest.raises(ChimeraXUnavailableError, match=r"retry after \d+ s") as info:
+        client.run("open 1ubq")
+    assert info.value.retry_after <= 0.2
+    assert client.get_stats()["commands_sent"] == 2
+    assert client.get_stats()["breaker"]["state"] == "open"
+
+    server = start_server(free_port, servers)
+    deadline = time.monotonic() + 5
+    while client.breaker.is_open and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert client.run("open 1ubq") == ""
+    assert server.commands[-1] == "open 1ubq"
+    stats = client.get_stats()["breaker"]
+    assert stats["state"] == "closed" and stats["trips"] == 1
+    client.close()
+
+
+def test_tool_reports_unavailable(free_port, monkeypatch):
+    """Tools answer at once with the retry hint while the breaker is open"""
+    client = ChimeraXClient(f"http://127.0.0.1:{free_port}", retries=0,
+                            breaker_threshold=1, probe_interval=30)
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([client]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+
+    assert "Cannot connect" in asyncio.run(chimerax_mcp_server.run_command("open 1ubq"))
+    start = time.monotonic()
+    result = asyncio.run(chimerax_mcp_server.run_command("open 1ubq"))
+    assert time.monotonic() - start < 0.5
+    assert result.startswith("Error: ChimeraX unavailable")
+    assert "retry after" in result
+    client.close()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the scene model shadowing the models open in ChimeraX.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, InstancePool
+from fake_chimerax_server import FakeChimeraXServer
+
+INFO = """2 models
+#1, 1ubq, shown
+660 atoms, 683 bonds, 76 residues, 1 chains (A)
+#2, 2bbv, hidden
+3570 atoms, 3621 bonds, 474 residues, 3 chains (A,B,C)
+#2.1, missing structure, shown, 9 pseudobonds"""
+
+INFO_MODELS = """model id #1 type AtomicStructure name 1ubq
+model id #2 type AtomicStructure name 2bbv
+model id #2.1 type PseudobondGroup name missing structure"""
+
+OPEN_LOG = """1hho title:
+Hemoglobin A (oxy) [more info...]
+
+Chain information for 1hho #3
+---
+Chain | Description | UniProt
+A C | hemoglobin A (oxy) (α chain) | HBA_HUMAN 1-141
+B D | hemoglobin A (oxy) (β chain) | HBB_HUMAN 1-146"""
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeChimeraXServer().start()
+    fake.responses["info"] = INFO
+    fake.responses["info models"] = INFO_MODELS
+    fake.responses["open"] = OPEN_LOG
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([ChimeraXClient(fake.url)]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "structure_cache_mb", 0)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "scene_sync_interval", 0)
+    yield fake
+    fake.stop()
+
+
+def test_parse_scene_info():
+    """Model summaries, counts, chains and types are combined per model"""
+    models = chimerax_mcp_server.parse_scene_info(INFO, INFO_MODELS)
+    assert list(models) == ["#1", "#2", "#2.1"]
+    assert models["#1"]["atoms"] == 660 and models["#1"]["residues"] == 76
+    assert models["#2"]["chains"] == ["A", "B", "C"]
+    assert models["#2"]["shown"] is False
+    assert models["#2.1"]["type"] == "PseudobondGroup"
+    assert models["#2.1"]["atoms"] is None
+
+
+def test_parse_opened_models_and_closed_ids():
+    """Open logs give new models and simple close specs resolve locally"""
+    opened = chimerax_mcp_server.parse_opened_models(OPEN_LOG)
+    assert opened["#3"]["name"] == "1hho"
+    assert opened["#3"]["chains"] == ["A", "C", "B", "D"]
+
+    closed = chimerax_mcp_server.closed_model_ids
+    assert closed("close") == []
+    assert closed("close #1,3-4") == ["#1", "#3", "#4"]
+    assert closed("close #2.1") == ["#2.1"]
+    assert closed("close #1/A") is None
+
+
+def test_list_models_syncs_once(server):
+    """Metadata is answered locally until a command may change the models"""
+    for _ in range(3):
+        state = json.loads(asyncio.run(chimerax_mcp_server.list_models()))
+    assert [m["id"] for m in state["models"]] == ["#1", "#2", "#2.1"]
+    assert state["stale"] is False
+    assert len(server.commands) == 1
+
+    asyncio.run(chimerax_mcp_server.color_structure("#1", "red"))
+    asyncio.run(chimerax_mcp_server.list_models())
+    assert len(server.commands) == 2
+
+    asyncio.run(chimerax_mcp_server.list_models(refresh=True))
+    assert len(server.commands) == 3
+
+
+def test_open_and_close_update_shadow(server):
+    """Opened models are known at once and closed models are dropped"""
+    scene = chimerax_mcp_server.get_scene()
+    scene.sync()
+
+    asyncio.run(chimerax_mcp_server.open_structure("1hho"))
+    assert scene.find("#3")["chains"] == ["A", "C", "B", "D"]
+    assert scene.is_stale()
+
+    asyncio.run(chimerax_mcp_server.close_models("#2"))
+    assert scene.find("#2") is None and scene.find("#2.1") is None
+    assert scene.find("#1") is not None
+
+    asyncio.run(chimerax_mcp_server.close_models())
+    assert scene.snapshot()["models"] == []
+
+
+def test_overlapping_change_keeps_shadow_stale(server):
+    """A sync that overlaps a model change does not mark the shadow current"""
+    server.delays["info"] = 0.2
+    scene = chimerax_mcp_server.get_scene()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        sync = loop.run_in_executor(None, scene.sync)
+        await asyncio.sleep(0.05)
+        await chimerax_mcp_server.close_models("#1")
+        await sync
+
+    asyncio.run(main())
+    assert scene.is_stale()
+    assert scene.find("#1") is None
+
+
+def test_scene_resource(server):
+    """The chimerax://scene resource returns the model list as JSON"""
+    state = json.loads(asyncio.run(chimerax_mcp_server.get_scene_resource()))
+    assert state["models"][0]["name"] == "1ubq"
+    assert state["syncs"] == 1
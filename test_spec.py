@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for local atom specifier validation.
+"""
+
+import asyncio
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, InstancePool, SpecError, validate_spec
+from fake_chimerax_server import FakeChimeraXServer
+from test_scene import INFO, INFO_MODELS
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeChimeraXServer().start()
+    fake.responses["info"] = INFO
+    fake.responses["info models"] = INFO_MODELS
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([ChimeraXClient(fake.url)]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "scene_sync_interval", 0)
+    yield fake
+    fake.stop()
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("#1", "#1"),
+    ("  #1,  2 ", "#1,2"),
+    ("#1/A:10-20@CA,CB", "#1/A:10-20@CA,CB"),
+    ("/A:-5-10,45A", "/A:-5-10,45A"),
+    (":ALA,HOH@C1'", ":ALA,HOH@C1'"),
+    ("#1.1-3", "#1.1-3"),
+    ("all", "all"),
+    ("protein & ~solvent", "protein & ~solvent"),
+    ("#1 & :10 :<5", "#1 & :10 :<5"),
+])
+def test_valid_specs(spec, expected):
+    """Well-formed specs pass and are tidied"""
+    assert validate_spec(spec) == expected
+
+
+@pytest.mark.parametrize("spec, message", [
+    ("", "empty"),
+    ("#1; close", "must not contain"),
+    ("#1:", "Invalid residue list"),
+    ("#1:1--", "Invalid residue list"),
+    ("#a", "Invalid model list"),
+    ("/A$", "Invalid chain list"),
+    ("#1:50-10", "runs backwards"),
+    ("(#1 | #2", "unbalanced"),
+])
+def test_invalid_specs(spec, message):
+    """Malformed specs are rejected with a reason"""
+    with pytest.raises(SpecError, match=message):
+        validate_spec(spec)
+
+
+def test_join_and_qualify():
+    """Tool arguments are combined in model/chain/residue order"""
+    assert chimerax_mcp_server.join_spec("#1", "A", "1-50") == "#1/A:1-50"
+    assert chimerax_mcp_server.join_spec("all", "/B") == "/B"
+    assert chimerax_mcp_server.join_spec("#1") == "#1"
+    assert chimerax_mcp_server.qualify_spec("#1", ":45@CA") == "#1:45@CA"
+    assert chimerax_mcp_server.qualify_spec("#1", "#2:45@CA") == "#2:45@CA"
+
+
+def test_checked_against_current_scene(server):
+    """Once the scene model is synced, missing models and chains are rejected"""
+    scene = chimerax_mcp_server.get_scene()
+    assert validate_spec("#5", scene) == "#5"
+
+    scene.sync()
+    assert validate_spec("#2.1", scene) == "#2.1"
+    assert validate_spec("#1/a", scene) == "#1/a"
+    with pytest.raises(SpecError, match=r"Model #5 .* not open \(open models: #1, #2, #2.1\)"):
+        validate_spec("#5", scene)
+    with pytest.raises(SpecError, match="Chain /B .* does not exist"):
+        validate_spec("#1/B", scene)
+    assert validate_spec("/C", scene) == "/C"
+
+
+def test_bad_specs_never_reach_chimerax(server):
+    """Tools answer invalid specs with an error without a REST request"""
+    result = asyncio.run(chimerax_mcp_server.measure_distance(":45", ":72@CA"))
+    assert result.startswith("Error measuring distance:")
+    assert "names no atom" in result
+
+    result = asyncio.run(chimerax_mcp_server.select_residues("#1", "1-", "A"))
+    assert result.startswith("Error selecting residues: Invalid residue list")
+
+    result = asyncio.run(chimerax_mcp_server.find_hbonds("#1;close"))
+    assert result.startswith("Error finding H-bonds:")
+    assert server.commands == []
+
+
+def test_tools_send_normalized_specs(server):
+    """Valid specs are sent in hierarchy order with the model applied once"""
+    asyncio.run(chimerax_mcp_server.select_residues("#1", "1 - 50", "A"))
+    asyncio.run(chimerax_mcp_server.measure_distance("#2:45@CA", ":72@CA", "#1"))
+    assert server.commands == ["select #1/A:1-50", "distance #2:45@CA #1:72@CA"]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for server startup time.
+
+Claude Desktop gives up on MCP servers that are slow to initialize, so the
+server must answer initialize and list_tools without loading its HTTP stack,
+reading its configuration or contacting ChimeraX.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from fake_chimerax_server import FakeChimeraXServer
+
+SERVER = str(Path(__file__).parent / "chimerax_mcp_server.py")
+
+# Seconds from launching the server to the list_tools reply. Most of it
+# is importing mcp itself.
+STARTUP_BUDGET = 5.0
+
+
+def test_import_does_no_setup():
+    """Importing the server leaves requests, config and clients for later"""
+    check = (
+        "import sys, chimerax_mcp_server as m; "
+        "print('requests' in sys.modules, 'urllib3' in sys.modules, m.CHIMERAX_URL, m._pool)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", check], capture_output=True, text=True,
+        cwd=Path(__file__).parent, timeout=60
+    ).stdout.split()
+    assert output == ["False", "False", "None", "None"]
+
+
+def test_background_service_errors_are_logged(monkeypatch, capsys):
+    """A failure on the startup thread is printed to stderr, not lost"""
+    import chimerax_mcp_server
+
+    def broken_config():
+        raise ValueError("Invalid JSON in config file")
+
+    monkeypatch.setattr(chimerax_mcp_server, "load_config", broken_config)
+    chimerax_mcp_server.start_background_services()
+    err = capsys.readouterr().err
+    assert "could not start background services" in err
+    assert "Invalid JSON in config file" in err
+
+
+def test_time_to_initialize():
+    """initialize and list_tools are answered within the startup budget"""
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    server = FakeChimeraXServer().start()
+    params = StdioServerParameters(
+        command=sys.executable, args=[SERVER],
+        env=dict(os.environ, CHIMERAX_URL=server.url),
+    )
+
+    async def start():
+        begin = time.perf_counter()
+        with open(os.devnull, "w") as errlog:
+            async with stdio_client(params, errlog=errlog) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    tools = await session.list_tools()
+                    return time.perf_counter() - begin, tools.tools
+
+    try:
+        elapsed, tools = asyncio.run(start())
+    finally:
+        server.stop()
+    assert any(tool.name == "run_command" for tool in tools)
+    assert elapsed < STARTUP_BUDGET, f"startup took {elapsed:.2f} s"
+    assert server.commands == []
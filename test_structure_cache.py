@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Tests for the local structure file cache.
+
+A local HTTP server stands in for the PDB/AlphaFold/EMDB archives.
+"""
+
+import asyncio
+import functools
+import gzip
+import json
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import chimerax_mcp_server
+from chimerax_mcp_server import ChimeraXClient, InstancePool, StructureCache
+from fake_chimerax_server import FakeChimeraXServer
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        QuietHandler.requests_seen.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Serve files from a directory like a structure archive"""
+    root = tmp_path / "archive"
+    root.mkdir()
+    (root / "1ubq.cif").write_text("data_1UBQ\n" + "ATOM\n" * 100)
+    (root / "2ubq.cif").write_text("data_2UBQ\n" + "ATOM\n" * 100)
+    (root / "copy.cif").write_text("data_1UBQ\n" + "ATOM\n" * 100)
+    (root / "emd_1080.map.gz").write_bytes(gzip.compress(b"MAPDATA" * 50))
+
+    QuietHandler.requests_seen = []
+    httpd = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(root))
+    )
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path, archive):
+    return StructureCache(tmp_path / "cache", 10_000, {
+        "pdb": archive + "/{id}.cif",
+        "emdb": archive + "/emd_{id}.map.gz",
+    })
+
+
+def test_fetch_then_hit(cache):
+    """The first fetch downloads, later ones are served from disk"""
+    path = cache.fetch("pdb", "1UBQ")
+    assert path.read_text().startswith("data_1UBQ")
+    assert cache.fetch("pdb", "1ubq") == path
+    assert QuietHandler.requests_seen == ["/1ubq.cif"]
+    assert cache.get_stats()["downloads"] == 1
+
+
+def test_emdb_maps_are_decompressed(cache):
+    """Gzipped map downloads are stored decompressed"""
+    path = cache.fetch("emdb", "EMD-1080")
+    assert path.suffix == ".map"
+    assert path.read_bytes() == b"MAPDATA" * 50
+
+
+def test_content_addressed_and_lru_eviction(tmp_path, archive):
+    """Identical files share storage and old entries are evicted past the cap"""
+    cache = StructureCache(tmp_path / "cache", 800, {"pdb": archive + "/{id}.cif"})
+    first = cache.fetch("pdb", "1ubq")
+    assert cache.fetch("pdb", "copy") == first
+    assert cache.get_stats()["bytes"] == first.stat().st_size
+
+    cache.fetch("pdb", "2ubq")
+    stats = cache.get_stats()
+    assert stats["bytes"] <= 800
+    assert stats["evictions"] >= 1
+    assert cache.lookup("pdb", "2ubq") is not None
+
+
+def test_index_survives_restart(tmp_path, cache):
+    """A new cache on the same directory still has the entries"""
+    path = cache.fetch("pdb", "1ubq")
+    reopened = StructureCache(tmp_path / "cache", 10_000)
+    assert reopened.lookup("pdb", "1ubq") == path
+
+
+def test_failed_download(cache):
+    """Missing entries raise ChimeraXError and are not cached"""
+    with pytest.raises(chimerax_mcp_server.ChimeraXError):
+        cache.fetch("pdb", "9zzz")
+    assert cache.lookup("pdb", "9zzz") is None
+
+
+def test_open_structure_uses_cache(cache, monkeypatch):
+    """open_structure opens the cached file and warm_structure_cache fills it"""
+    fake = FakeChimeraXServer().start()
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([ChimeraXClient(fake.url)]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setattr(chimerax_mcp_server, "_structure_cache", cache)
+    try:
+        warmed = json.loads(asyncio.run(
+            chimerax_mcp_server.warm_structure_cache(["1ubq", "1ubq", "9zzz"])
+        ))
+        statuses = sorted(e["status"] for e in warmed["structures"])
+        assert statuses.count("error") == 1
+
+        asyncio.run(chimerax_mcp_server.open_structure("1ubq", model_id="#3"))
+        path = cache.lookup("pdb", "1ubq")
+        assert fake.commands == [f"open {path} format mmcif name 1ubq id #3"]
+
+        asyncio.run(chimerax_mcp_server.open_structure("9zzz"))
+        assert fake.commands[-1] == "open 9zzz from pdb"
+    finally:
+        fake.stop()
+
+
+def test_cache_tools_work_with_default_settings(tmp_path, archive, monkeypatch):
+    """The cache is on by default for a local ChimeraX and off for a remote one"""
+    monkeypatch.setattr(chimerax_mcp_server, "_structure_cache", None)
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "structure_cache_dir",
+                        str(tmp_path / "cache"))
+    monkeypatch.setitem(chimerax_mcp_server.DEFAULT_CONFIG, "archive_urls",
+                        {"pdb": archive + "/{id}.cif"})
+
+    remote = InstancePool([ChimeraXClient("http://192.0.2.1:6000")])
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", remote)
+    result = asyncio.run(chimerax_mcp_server.warm_structure_cache(["1ubq"]))
+    assert result == chimerax_mcp_server.STRUCTURE_CACHE_OFF
+
+    local = InstancePool([ChimeraXClient("http://127.0.0.1:6000")])
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", local)
+    result = json.loads(asyncio.run(chimerax_mcp_server.warm_structure_cache(["1ubq"])))
+    assert result["structures"][0]["status"] == "downloaded"
+
+
+def test_background_open_does_not_wait_for_download(cache, monkeypatch):
+    """The download runs inside the background job, not before it starts"""
+    fake = FakeChimeraXServer().start()
+    monkeypatch.setattr(chimerax_mcp_server, "_pool", InstancePool([ChimeraXClient(fake.url)]))
+    monkeypatch.setattr(chimerax_mcp_server, "_executor", None)
+    monkeypatch.setattr(chimerax_mcp_server, "_structure_cache", cache)
+    fetch = cache.fetch
+
+    def slow_fetch(*args):
+        time.sleep(0.5)
+        return fetch(*args)
+
+    monkeypatch.setattr(cache, "fetch", slow_fetch)
+    try:
+        start = time.monotonic()
+        message = asyncio.run(chimerax_mcp_server.open_structure("1ubq", background=True))
+        assert time.monotonic() - start < 0.4
+        job_id = message.split()[3]
+        wait_for(lambda: json.loads(
+            chimerax_mcp_server.get_job_status(job_id))["status"] == "done")
+        assert fake.commands == [f"open {cache.lookup('pdb', '1ubq')} format mmcif name 1ubq"]
+    finally:
+        fake.stop()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def test_prefetcher_downloads_in_background(cache):
+    """Queued entries are downloaded, and cached or duplicate ones skipped"""
+    prefetcher = chimerax_mcp_server.StructurePrefetcher(cache, concurrency=2)
+    cache.fetch("pdb", "2ubq")
+
+    # Checking what is already cached does not count as a cache hit
+    counts = (cache.hits, cache.misses)
+    assert prefetcher.submit("pdb", ["2ubq"]) == 0
+    assert (cache.hits, cache.misses) == counts
+
+    assert prefetcher.submit("pdb", ["1ubq", "1UBQ", "2ubq", "9zzz"]) == 2
+    wait_for(lambda: not prefetcher.get_status()["downloading"]
+             and not prefetcher.get_status()["queued"])
+
+    status = prefetcher.get_status()
+    assert status["completed"] == 1
+    assert list(status["failed"]) == ["pdb:9zzz"]
+    assert cache.lookup("pdb", "1ubq") is not None
+
+
+def test_prefetch_tools(cache, monkeypatch):
+    """prefetch_structures returns at once and the status tool shows progress"""
+    monkeypatch.setattr(chimerax_mcp_server, "_structure_cache", cache)
+    monkeypatch.setattr(chimerax_mcp_server, "_prefetcher", None)
+
+    result = json.loads(chimerax_mcp_server.prefetch_structures(["1ubq", "2ubq"]))
+    assert result["queued"] == 2
+    wait_for(lambda: json.loads(chimerax_mcp_server.get_prefetch_status())["completed"] == 2)
+    assert chimerax_mcp_server.prefetch_structures(["x"], "nowhere").startswith("Error")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the ChimeraX supervisor.
+
+fake_chimerax_server.py stands in for the ChimeraX executable: it accepts
+the `--cmd "remotecontrol rest start port N"` the supervisor launches with.
+"""
+
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from chimerax_mcp_server import ChimeraXClient, ChimeraXSupervisor
+
+FAKE_SERVER = str(Path(__file__).parent / "fake_chimerax_server.py")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(condition, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def supervise():
+    started = []
+
+    def make(standby=True):
+        port = free_port()
+        client = ChimeraXClient(ChimeraXSupervisor.url(port), retries=0)
+        supervisor = ChimeraXSupervisor(
+            client, sys.executable, port, free_port() if standby else 0,
+            args=[FAKE_SERVER], interval=0.2, failures=2, startup_timeout=15
+        )
+        started.append(supervisor)
+        supervisor.start()
+        assert wait_for(lambda: supervisor.is_healthy(supervisor.active_port))
+        if standby:
+            assert wait_for(lambda: supervisor.get_status()["standby_ready"])
+        return supervisor
+
+    yield make
+    for supervisor in started:
+        for process in supervisor.processes.values():
+            if sys.platform != "win32":
+                os.kill(process.pid, signal.SIGCONT)
+        supervisor.stop()
+
+
+def test_launches_with_rest_server(supervise):
+    """ChimeraX is started with the REST server on the session port"""
+    supervisor = supervise(standby=False)
+    assert supervisor.command(5900)[-2:] == ["--cmd", "remotecontrol rest start port 5900"]
+    assert supervisor.client.run("version").startswith("UCSF ChimeraX")
+    assert supervisor.get_status()["active_managed"]
+
+
+def test_restart_after_crash(supervise):
+    """Without a standby a crashed ChimeraX is started again on its port"""
+    supervisor = supervise(standby=False)
+    port = supervisor.active_port
+    supervisor.processes[port].kill()
+
+    assert wait_for(lambda: supervisor.restarts == 1)
+    assert supervisor.active_port == port
+    assert supervisor.client.run("echo back") == "back"
+
+
+def test_failover_to_standby(supervise):
+    """A crash switches the session client to the warm standby at once"""
+    supervisor = supervise()
+    old_port, standby_port = supervisor.active_port, supervisor.standby_port
+    supervisor.client.scene.record_output("open x", "Chain information for x #1\nA | protein")
+    supervisor.processes[old_port].kill()
+
+    assert wait_for(lambda: supervisor.failovers == 1)
+    assert supervisor.client.base_url.endswith(f":{standby_port}")
+    assert supervisor.client.run("echo standby") == "standby"
+    assert supervisor.client.scene.find("#1") is None
+
+    # A new standby replaces the failed instance
+    assert wait_for(lambda: supervisor.get_status()["standby_ready"])
+    assert supervisor.standby_port == old_port
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs SIGSTOP")
+def test_hung_instance_is_replaced(supervise):
+    """An instance that stops answering is replaced after failed checks"""
+    supervisor = supervise()
+    hung_port = supervisor.active_port
+    os.kill(supervisor.processes[hung_port].pid, signal.SIGSTOP)
+
+    assert wait_for(lambda: supervisor.failovers == 1)
+    assert supervisor.active_port != hung_port
+    assert supervisor.client.run("echo ok") == "ok"
+
+
+def test_failed_restart_is_not_counted():
+    """A ChimeraX that does not come up is not counted as a restart"""
+    port = free_port()
+    client = ChimeraXClient(ChimeraXSupervisor.url(port), retries=0)
+    supervisor = ChimeraXSupervisor(
+        client, sys.executable, port, args=["-c", "pass"], startup_timeout=5
+    )
+    recovered = []
+    supervisor.on_recover = lambda: recovered.append(True)
+
+    supervisor.recover()
+    assert supervisor.restarts == 0 and recovered == []
+    assert supervisor.last_recover_error == f"ChimeraX did not start on port {port}"
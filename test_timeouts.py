@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for per-verb and adaptive read timeouts.
+"""
+
+import time
+
+import pytest
+
+from chimerax_mcp_server import ChimeraXClient, ChimeraXError, ServerMetrics, TimeoutPolicy
+from fake_chimerax_server import FakeChimeraXServer
+
+
+@pytest.fixture
+def server():
+    fake = FakeChimeraXServer().start()
+    yield fake
+    fake.stop()
+
+
+def test_configured_budgets():
+    """Listed verbs get their own budget and batches the sum of their parts"""
+    policy = TimeoutPolicy(30, {"version": 5, "open": 300, "save": 120}, metrics=ServerMetrics())
+    assert policy.for_command("version") == 5
+    assert policy.for_command("color #1 red") == 30
+    assert policy.for_command("open 1ubq ; echo m:0 ; save x.png ; echo m:1") == 420
+    assert policy.for_command("echo a ; echo b") == 30
+
+
+def test_adaptive_budgets():
+    """With enough history the budget follows recent durations within bounds"""
+    metrics = ServerMetrics()
+    policy = TimeoutPolicy(30, {"open": 300}, adaptive=True, factor=4,
+                           min_timeout=2, max_timeout=600, metrics=metrics)
+    for _ in range(19):
+        metrics.record_command("open big", "", "ok", 100.0, 0, 100.0, 0, 0)
+        metrics.record_command("info", "", "ok", 0.01, 0, 0.01, 0, 0)
+    assert policy.for_verb("open") == 300
+
+    metrics.record_command("open big", "", "ok", 100.0, 0, 100.0, 0, 0)
+    metrics.record_command("info", "", "ok", 0.01, 0, 0.01, 0, 0)
+    assert policy.for_verb("open") == 400
+    assert policy.for_verb("info") == 2
+    assert policy.get_stats()["verbs"]["info"] == 2
+
+    metrics.record_command("open huge", "", "ok", 1000.0, 0, 1000.0, 0, 0)
+    assert policy.for_verb("open") == 600
+
+
+def test_adaptive_keeps_configured_floor():
+    """Quick history never lowers a verb below its verb_timeouts entry"""
+    metrics = ServerMetrics()
+    policy = TimeoutPolicy(30, {"open": 300, "save": 900}, adaptive=True, factor=4,
+                           min_timeout=2, max_timeout=600, metrics=metrics)
+    for _ in range(20):
+        metrics.record_command("open 1ubq", "", "ok", 0.1, 0, 0.1, 0, 0)
+        metrics.record_command("save x.png", "", "ok", 0.1, 0, 0.1, 0, 0)
+        metrics.record_command("color #1 red", "", "ok", 0.1, 0, 0.1, 0, 0)
+    assert policy.for_verb("open") == 300
+    assert policy.for_verb("save") == 900
+    assert policy.for_verb("color") == 2
+
+
+def test_client_uses_verb_budget(server):
+    """A wedged quick query fails after its own budget, not the default"""
+    server.delays["version"] = 1.0
+    policy = TimeoutPolicy(30, {"version": 0.1}, metrics=ServerMetrics())
+    client = ChimeraXClient(server.url, timeouts=policy)
+
+    start = time.monotonic()
+    with pytest.raises(ChimeraXError, match="timed out after 0.1 seconds"):
+        client.run("version")
+    assert time.monotonic() - start < 0.8
+    assert client.run("echo ok") == "ok"
+    assert client.get_stats()["timeouts"]["verbs"]["version"] == 0.1
+
+
+def test_adaptive_client_fails_fast(server):
+    """Once a verb is known to be quick, a hang is cut short"""
+    metrics = ServerMetrics()
+    policy = TimeoutPolicy(30, {}, adaptive=True, min_timeout=0.2, metrics=metrics)
+    client = ChimeraXClient(server.url, metrics=metrics, timeouts=policy)
+    for _ in range(20):
+        client.run("info models")
+
+    server.delays["info"] = 1.0
+    start = time.monotonic()
+    with pytest.raises(ChimeraXError, match="timed out"):
+        client.run("info models")
+    assert time.monotonic() - start < 0.8